@@ -10,6 +10,7 @@ It generates visualizations to show the optimization progress and effectiveness.
 import os
 import sys
 import json
+import time
 import argparse
 import shutil
 
@@ -20,9 +21,19 @@ from peba_core.config import (
     BASE_OPTIMIZATION_PATH,
     BASE_EVALUATION_PATH,
     METRICS,
-    METRIC_NAMES
+    METRIC_NAMES,
+    OPTIMIZATION_WATCH_INTERVAL_SECONDS,
+    DEFAULT_RUN_LOADER_PROCESSES,
+    BOOTSTRAP_RESAMPLES,
+    BOOTSTRAP_SEED
 )
-from peba_core.utils.data_loader import load_optimization_run_data
+from peba_core.utils.data_loader import (
+    load_optimization_run_data,
+    load_optimization_runs_parallel,
+    find_json_file
+)
+from peba_core.utils.experiment_store import ExperimentStore
+from peba_core.utils.behavior_matrix import build_behavior_matrices
 from peba_core.utils.metrics import calculate_statistics
 from peba_core.utils.visualization import (
     create_metrics_over_iterations_plot,
@@ -40,10 +51,16 @@ from peba_core.utils.report_generator import (
 class OptimizationAnalyzer:
     """Main class for optimization analysis workflow."""
     
-    def __init__(self, optimization_runs: list, output_dir: str = None):
+    def __init__(self, optimization_runs: list, output_dir: str = None, use_store: bool = False,
+                 workers: int = 1, bootstrap_resamples: int = BOOTSTRAP_RESAMPLES,
+                 bootstrap_seed: int = BOOTSTRAP_SEED):
         """Initialize the optimization analyzer."""
         self.optimization_runs = optimization_runs
         self.output_dir = output_dir or self._generate_default_output_dir()
+        self.use_store = use_store
+        self.workers = workers
+        self.bootstrap_resamples = bootstrap_resamples
+        self.bootstrap_seed = bootstrap_seed
         
     def _generate_default_output_dir(self):
         """Generate default output directory name."""
@@ -68,7 +85,21 @@ class OptimizationAnalyzer:
         """Load optimization data from all specified runs."""
         print(f"Loading optimization data from {len(self.optimization_runs)} runs...")
         
-        optimization_data = load_optimization_run_data(self.optimization_runs, BASE_OPTIMIZATION_PATH)
+        if self.use_store:
+            # Only iterations added or changed since the last run are read from disk
+            store = ExperimentStore()
+            try:
+                ingested = store.ingest_runs(self.optimization_runs, BASE_OPTIMIZATION_PATH)
+                print(f"Experiment store: ingested {ingested} new or changed iterations")
+                optimization_data = store.get_optimization_run_data(self.optimization_runs)
+            finally:
+                store.close()
+        elif self.workers > 1:
+            optimization_data = load_optimization_runs_parallel(
+                self.optimization_runs, BASE_OPTIMIZATION_PATH, self.workers
+            )
+        else:
+            optimization_data = load_optimization_run_data(self.optimization_runs, BASE_OPTIMIZATION_PATH)
         
         if not optimization_data:
             raise ValueError("No valid optimization data found.")
@@ -79,11 +110,12 @@ class OptimizationAnalyzer:
         """Analyze optimization runs and calculate statistics."""
         print("Calculating statistics across optimization runs...")
         
-        metrics_stats, behavior_stats = calculate_statistics(optimization_data)
+        metrics_stats, behavior_stats = calculate_statistics(optimization_data, self.bootstrap_resamples,
+                                                             seed=self.bootstrap_seed)
         
         return metrics_stats, behavior_stats
     
-    def generate_visualizations(self, optimization_data, metrics_stats, behavior_stats):
+    def generate_visualizations(self, optimization_data, metrics_stats, behavior_stats, behavior_matrices=None):
         """Generate all visualization plots."""
         print("Generating visualizations...")
         
@@ -106,16 +138,17 @@ class OptimizationAnalyzer:
         
         # Generate Sankey diagrams
         print("  - Generating behavior Sankey diagrams...")
-        sankey_paths = create_sankey_diagram(optimization_data, self.output_dir)
+        sankey_paths = create_sankey_diagram(optimization_data, self.output_dir, behavior_matrices)
         plot_paths.extend(sankey_paths)
         
         return plot_paths
     
-    def analyze_effectiveness(self, optimization_data):
+    def analyze_effectiveness(self, optimization_data, behavior_matrices=None):
         """Analyze optimization effectiveness."""
         print("Analyzing optimization effectiveness...")
         
-        effectiveness_results = calculate_optimization_effectiveness(optimization_data, BASE_OPTIMIZATION_PATH)
+        effectiveness_results = calculate_optimization_effectiveness(optimization_data, BASE_OPTIMIZATION_PATH,
+                                                                     behavior_matrices)
         
         # Save individual effectiveness results
         for run_name, result in effectiveness_results.items():
@@ -143,16 +176,10 @@ class OptimizationAnalyzer:
         combined_by_target = {category: {"total": 0, "success": 0} for category in BEHAVIOR_CATEGORIES}
         
         for result in effectiveness_results.values():
-            for category, rate in result["summary"]["success_rates_by_target"].items():
+            for category, counts in result["summary"]["adjustments_by_target"].items():
                 if category in combined_by_target:
-                    # Extract the actual counts and add them
-                    target_stats = result["summary"]["success_rates_by_target"][category]
-                    # Approximate total from rate - this is a simplification
-                    total_for_category = result["summary"]["total_adjustments"] * 0.1  # rough estimate
-                    success_for_category = rate * total_for_category
-                    
-                    combined_by_target[category]["total"] += total_for_category
-                    combined_by_target[category]["success"] += success_for_category
+                    combined_by_target[category]["total"] += counts["total"]
+                    combined_by_target[category]["success"] += counts["success"]
         
         # Calculate combined rates
         combined_rates_by_target = {}
@@ -164,7 +191,8 @@ class OptimizationAnalyzer:
             "total_adjustments": combined_total,
             "successful_adjustments": combined_success,
             "overall_success_rate": combined_rate,
-            "success_rates_by_target": combined_rates_by_target
+            "success_rates_by_target": combined_rates_by_target,
+            "adjustments_by_target": combined_by_target
         }
         
         # Save combined data
@@ -230,17 +258,71 @@ class OptimizationAnalyzer:
         # Setup output directory
         self._setup_output_directory()
         
+        return self._run_analysis()
+    
+    def _iteration_snapshot(self):
+        """Get the size and modification time of every iteration analysis of the analyzed runs."""
+        snapshot = {}
+        for run_name in self.optimization_runs:
+            run_path = os.path.join(BASE_OPTIMIZATION_PATH, run_name)
+            if not os.path.isdir(run_path):
+                continue
+            
+            for folder in os.listdir(run_path):
+                analysis_path = find_json_file(os.path.join(run_path, folder, "behavior_analysis.json"))
+                if folder.startswith("Iteration_") and analysis_path:
+                    stat = os.stat(analysis_path)
+                    snapshot[analysis_path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+    
+    def watch(self, interval: float = OPTIMIZATION_WATCH_INTERVAL_SECONDS):
+        """
+        Monitor running optimizations, refreshing statistics and plots whenever an iteration is analyzed.
+        
+        Args:
+            interval: Seconds between checks for new or changed iterations
+        """
+        print(f"Watching optimization runs: {self.optimization_runs} (checking every {interval:.0f}s, Ctrl+C to stop)")
+        print(f"Output directory: {self.output_dir}")
+        
+        self._setup_output_directory()
+        
+        # Refreshes rely on the in-process iteration cache, which worker processes would bypass
+        self.workers = 1
+        
+        last_snapshot = None
+        try:
+            while True:
+                snapshot = self._iteration_snapshot()
+                if snapshot and snapshot != last_snapshot:
+                    print(f"\n[{time.strftime('%H:%M:%S')}] {len(snapshot)} analyzed iterations, refreshing...")
+                    try:
+                        # Iterations parsed by earlier refreshes are reused; only new ones are read
+                        self._run_analysis()
+                    except ValueError as e:
+                        print(f"Waiting for data: {e}")
+                    last_snapshot = snapshot
+                
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+    
+    def _run_analysis(self):
+        """Load, analyze and report on the optimization runs into the output directory."""
         # Load optimization data
         optimization_data = self.load_data()
         
         # Analyze runs
         metrics_stats, behavior_stats = self.analyze_runs(optimization_data)
         
+        # Encode agent behaviors once for the Sankey diagrams and the effectiveness analysis
+        behavior_matrices = build_behavior_matrices(optimization_data)
+        
         # Generate visualizations
-        plot_paths = self.generate_visualizations(optimization_data, metrics_stats, behavior_stats)
+        plot_paths = self.generate_visualizations(optimization_data, metrics_stats, behavior_stats, behavior_matrices)
         
         # Analyze effectiveness
-        effectiveness_results = self.analyze_effectiveness(optimization_data)
+        effectiveness_results = self.analyze_effectiveness(optimization_data, behavior_matrices)
         
         # Generate reports
         report_paths = self.generate_reports(optimization_data, metrics_stats, behavior_stats)
@@ -272,15 +354,35 @@ def main():
                         help='List of optimization run folder names to analyze')
     parser.add_argument('--output', type=str, default=None,
                         help='Custom output directory for analysis results')
+    parser.add_argument('--store', action='store_true', default=False,
+                        help='Load runs through the SQLite experiment store (ingesting only new or changed iterations)')
+    parser.add_argument('--watch', action='store_true', default=False,
+                        help='Keep running and refresh statistics and plots as new iterations are analyzed')
+    parser.add_argument('--interval', type=float, default=OPTIMIZATION_WATCH_INTERVAL_SECONDS,
+                        help='Seconds between checks for new iterations in watch mode')
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f'Load runs in parallel worker processes (e.g. {DEFAULT_RUN_LOADER_PROCESSES}); 1 loads them in this process')
+    parser.add_argument('--bootstrap', type=int, default=BOOTSTRAP_RESAMPLES,
+                        help='Bootstrap resamples for confidence intervals of the metrics (0 disables them)')
+    parser.add_argument('--seed', type=int, default=BOOTSTRAP_SEED,
+                        help='Seed of the bootstrap resampling, so reruns and watch-mode refreshes draw the same intervals')
     args = parser.parse_args()
     
     try:
         # Initialize the analyzer
         analyzer = OptimizationAnalyzer(
             optimization_runs=args.runs,
-            output_dir=args.output
+            output_dir=args.output,
+            use_store=args.store,
+            workers=args.workers,
+            bootstrap_resamples=args.bootstrap,
+            bootstrap_seed=args.seed
         )
         
+        if args.watch:
+            analyzer.watch(args.interval)
+            return 0
+        
         # Run the complete analysis
         results = analyzer.run_complete_analysis()
         
@@ -8,12 +8,13 @@ with ground truth distribution using various metrics.
 """
 
 import os
+import re
 import sys
 import json
 import time
+import hashlib
 import argparse
-import multiprocessing
-from functools import partial
+import asyncio
 from tqdm import tqdm
 
 # Add the peba_core package to the path
@@ -23,25 +24,44 @@ from peba_core.config import (
     BASE_SIMULATION_PATH,
     DEFAULT_SIMULATION_FOLDER,
     BEHAVIOR_CATEGORIES,
+    BEHAVIOR_DESCRIPTIONS,
     GROUND_TRUTH_DISTRIBUTION,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_CLASSIFICATION_PACK_SIZE,
+    BATCH_POLL_INTERVAL_SECONDS,
+    BATCH_INPUT_FILE_NAME,
+    AGENT_LOG_CLASSIFICATION_FIELDS,
+    CLASSIFICATION_OPENAI_CONFIG,
+    CASCADE_CLASSIFICATION_OPENAI_CONFIG,
+    CASCADE_AMBIGUITY_MARKERS,
     DEBUG
 )
 from peba_core.utils.data_loader import (
+    load_json_file,
+    find_json_file,
     load_simulation_data,
     find_simulation_folders,
     get_agent_context,
-    parse_token_usage_log
+    compute_agent_input_hash
 )
 from peba_core.utils.metrics import (
     calculate_distribution_metrics,
-    calculate_topk_distribution,
-    calculate_behavior_counts
+    calculate_distribution_metrics_many,
+    calculate_topk_distributions,
+    calculate_behavior_counts,
+    calculate_cascade_statistics
 )
 from peba_core.utils.visualization import (
     create_behavior_comparison_plot,
     create_topk_distributions_plot
 )
-from peba_core.utils.llm_client import LLMClient
+from peba_core.utils.usage_table import get_simulation_usage
+from peba_core.utils.llm_client import (
+    LLMClient,
+    merge_token_usage,
+    CLASSIFICATION_SYSTEM_PROMPT,
+    PACKED_CLASSIFICATION_SYSTEM_PROMPT
+)
 from peba_core.utils.report_generator import (
     generate_human_comparison_data,
     generate_label_studio_data,
@@ -52,9 +72,189 @@ from peba_core.utils.report_generator import (
 class BehaviorClassifier:
     """Main class for behavior classification workflow."""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, max_concurrency=DEFAULT_MAX_CONCURRENT_REQUESTS, use_cache=True,
+                 pack_size=DEFAULT_CLASSIFICATION_PACK_SIZE, cascade=False, reuse_results=True):
         """Initialize the behavior classifier."""
-        self.llm_client = LLMClient(api_key)
+        self.llm_client = LLMClient(api_key, use_cache=use_cache)
+        self.max_concurrency = max(1, max_concurrency)
+        self.pack_size = max(1, pack_size)
+        
+        # With the cascade enabled every agent is classified by the small model first
+        self.cascade = cascade
+        self.first_tier_config = CASCADE_CLASSIFICATION_OPENAI_CONFIG if cascade else CLASSIFICATION_OPENAI_CONFIG
+        
+        # Previous results are only reused when they were produced with the same prompt and models
+        self.reuse_results = reuse_results
+        self.classifier_fingerprint = self._compute_classifier_fingerprint()
+    
+    def _compute_classifier_fingerprint(self):
+        """Identify the prompt and model settings that produced a classification."""
+        settings = {
+            "system_prompt": CLASSIFICATION_SYSTEM_PROMPT,
+            "packed_system_prompt": PACKED_CLASSIFICATION_SYSTEM_PROMPT,
+            "pack_size": self.pack_size,
+            "first_tier_config": self.first_tier_config,
+            "large_model_config": CLASSIFICATION_OPENAI_CONFIG,
+            "cascade": self.cascade
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    
+    def find_previous_analyses(self, simulation_dir, base_output_dir, reuse_from=None):
+        """
+        List previous behavior analyses whose results may be reused.
+        
+        Args:
+            simulation_dir: Folder of the simulation being classified
+            base_output_dir: Folder the new behavior_analysis.json is written to
+            reuse_from: Optional explicit analysis file or folder to reuse results from
+            
+        Returns:
+            List of candidate behavior_analysis.json paths, most relevant first
+        """
+        if reuse_from:
+            candidates = [reuse_from]
+        else:
+            # A rerun on the same folder, then the previous iteration of an optimization run
+            candidates = [base_output_dir]
+            simulation_dir = os.path.normpath(simulation_dir)
+            match = re.match(r"Iteration_(\d+)$", os.path.basename(simulation_dir))
+            if match:
+                candidates.append(os.path.join(os.path.dirname(simulation_dir), f"Iteration_{int(match.group(1)) - 1}"))
+        
+        return [
+            os.path.join(candidate, "behavior_analysis.json") if os.path.isdir(candidate) else candidate
+            for candidate in candidates
+        ]
+    
+    def load_previous_results(self, analysis_paths):
+        """
+        Load agent results from previous behavior analyses produced with the same classifier settings.
+        
+        Args:
+            analysis_paths: Candidate behavior_analysis.json paths, most relevant first
+            
+        Returns:
+            Dictionary mapping agent names to their previous result entries
+        """
+        previous_results = {}
+        for analysis_path in analysis_paths:
+            if not find_json_file(analysis_path):
+                continue
+            
+            analysis = load_json_file(analysis_path)
+            if not analysis or analysis.get("classifier_fingerprint") != self.classifier_fingerprint:
+                continue
+            
+            for agent_name, entry in analysis.get("agents", {}).items():
+                if entry.get("input_hash") and agent_name not in previous_results:
+                    previous_results[agent_name] = entry
+        
+        return previous_results
+    
+    def _reuse_previous_results(self, agent_data_dict, previous_results):
+        """
+        Split agents into those whose inputs are unchanged since a previous classification and the rest.
+        
+        Returns:
+            Tuple of (reused_agents, pending_agent_data, input_hashes)
+        """
+        reused_agents = {}
+        pending_agent_data = {}
+        input_hashes = {}
+        
+        for agent_name, agent_data in agent_data_dict.items():
+            input_hash = compute_agent_input_hash(agent_data)
+            input_hashes[agent_name] = input_hash
+            
+            previous = previous_results.get(agent_name)
+            if (previous and previous["input_hash"] == input_hash
+                    and previous.get("behavior", {}).get("classification") not in (None, "ERROR")):
+                reused_agents[agent_name] = {
+                    "persona": previous.get("persona", {}),
+                    "behavior": dict(previous["behavior"], reused=True),
+                    "input_hash": input_hash
+                }
+            else:
+                pending_agent_data[agent_name] = agent_data
+        
+        return reused_agents, pending_agent_data, input_hashes
+    
+    def _escalation_reason(self, behavior_result):
+        """Return why a small-model classification should be escalated, or None to keep it."""
+        classification = behavior_result.get("classification")
+        if classification == "UNKNOWN":
+            # Not enough data to classify; the large model would not do better
+            return None
+        if classification not in BEHAVIOR_DESCRIPTIONS:
+            return f"invalid classification ({classification})"
+        
+        ranking = behavior_result.get("ranking")
+        if (not isinstance(ranking, list) or not all(isinstance(category, str) for category in ranking)
+                or sorted(ranking) != sorted(BEHAVIOR_DESCRIPTIONS)):
+            return "incomplete ranking"
+        if ranking[0] != classification:
+            return "ranking disagrees with classification"
+        
+        reasoning = str(behavior_result.get("reasoning", "")).lower()
+        for marker in CASCADE_AMBIGUITY_MARKERS:
+            if marker in reasoning:
+                return f"hedged reasoning ('{marker}')"
+        
+        return None
+    
+    def _record_cascade_tier(self, small_result, large_result=None, reason=None):
+        """Record which cascade tier decided an agent, charging it for the requests of both tiers."""
+        if large_result is None:
+            small_result["cascade"] = {"tier": "small", "model": CASCADE_CLASSIFICATION_OPENAI_CONFIG["model"]}
+            return small_result
+        
+        large_result["cascade"] = {
+            "tier": "large",
+            "model": CLASSIFICATION_OPENAI_CONFIG["model"],
+            "escalation_reason": reason,
+            "small_model_classification": small_result.get("classification"),
+            "small_model_ranking": small_result.get("ranking", []),
+            "small_model_token_usage": small_result.get("token_usage")
+        }
+        large_result["token_usage"] = merge_token_usage(small_result.get("token_usage"), large_result.get("token_usage"))
+        return large_result
+    
+    @staticmethod
+    def _split_token_usage_by_model(behavior, token_usage):
+        """Attribute the token usage charged to an agent to the models that produced it."""
+        cascade = behavior.get("cascade")
+        if not cascade:
+            return {CLASSIFICATION_OPENAI_CONFIG["model"]: token_usage}
+        if cascade["tier"] == "small":
+            return {cascade["model"]: token_usage}
+        
+        # Escalated agents carry the merged usage of both tiers; the small model's part is recorded separately
+        small_usage = dict(cascade.get("small_model_token_usage") or {})
+        small_usage["request_share"] = small_usage.get("request_share", 0 if small_usage.get("cache_hit") else 1)
+        large_usage = {
+            key: token_usage.get(key, 0) - small_usage.get(key, 0)
+            for key in ("prompt_tokens", "cached_tokens", "completion_tokens", "total_tokens", "request_share")
+        }
+        return {CASCADE_CLASSIFICATION_OPENAI_CONFIG["model"]: small_usage, cascade["model"]: large_usage}
+    
+    def _escalate_if_ambiguous(self, agent_data, context, small_result):
+        """Reclassify an agent with the large model if the small model's answer is ambiguous."""
+        reason = self._escalation_reason(small_result)
+        if reason is None:
+            return self._record_cascade_tier(small_result)
+        
+        large_result = self.llm_client.classify_agent_behavior(agent_data, context)
+        return self._record_cascade_tier(small_result, large_result, reason)
+    
+    async def _escalate_if_ambiguous_async(self, agent_data, context, small_result, semaphore):
+        """Asynchronous variant of _escalate_if_ambiguous."""
+        reason = self._escalation_reason(small_result)
+        if reason is None:
+            return self._record_cascade_tier(small_result)
+        
+        async with semaphore:
+            large_result = await self.llm_client.classify_agent_behavior_async(agent_data, context)
+        return self._record_cascade_tier(small_result, large_result, reason)
         
     def process_agent(self, agent_data_tuple):
         """Process a single agent for behavior classification."""
@@ -65,7 +265,9 @@ class BehaviorClassifier:
             context = get_agent_context(agent_data)
             
             # Classify behavior using LLM
-            behavior_result = self.llm_client.classify_agent_behavior(agent_data, context)
+            behavior_result = self.llm_client.classify_agent_behavior(agent_data, context, self.first_tier_config)
+            if self.cascade:
+                behavior_result = self._escalate_if_ambiguous(agent_data, context, behavior_result)
             
             return {
                 "agent_name": agent_name,
@@ -77,45 +279,121 @@ class BehaviorClassifier:
                 print(f"Error processing agent {agent_name}: {e}")
             return None
     
-    def classify_simulation(self, agent_data_dict):
-        """Classify behaviors for all agents in a simulation."""
-        # Prepare agent tasks for parallel processing
-        agent_tasks = list(agent_data_dict.items())
+    async def process_agent_async(self, agent_data_tuple, semaphore):
+        """Process a single agent for behavior classification without blocking the event loop."""
+        agent_name, agent_data = agent_data_tuple
         
-        if not agent_tasks:
+        try:
+            # Get agent context
+            context = get_agent_context(agent_data)
+            
+            # Classify behavior using LLM, holding a slot only while the request is in flight
+            async with semaphore:
+                behavior_result = await self.llm_client.classify_agent_behavior_async(agent_data, context, self.first_tier_config)
+            if self.cascade:
+                behavior_result = await self._escalate_if_ambiguous_async(agent_data, context, behavior_result, semaphore)
+            
+            return {
+                "agent_name": agent_name,
+                "persona": behavior_result.get("persona", {}),
+                "behavior": behavior_result
+            }
+        except Exception as e:
+            if DEBUG:
+                print(f"Error processing agent {agent_name}: {e}")
+            return None
+    
+    async def process_agent_pack_async(self, agent_data_tuples, semaphore):
+        """Classify a pack of agents with a single request without blocking the event loop."""
+        try:
+            # Get agent contexts
+            agents = [(agent_data, get_agent_context(agent_data)) for _, agent_data in agent_data_tuples]
+            
+            # Classify the whole pack, holding a slot only while the request is in flight
+            async with semaphore:
+                behavior_results = await self.llm_client.classify_agents_packed_async(agents, self.first_tier_config)
+            if self.cascade:
+                behavior_results = await asyncio.gather(*[
+                    self._escalate_if_ambiguous_async(agent_data, context, behavior_result, semaphore)
+                    for (agent_data, context), behavior_result in zip(agents, behavior_results)
+                ])
+            
+            return [
+                {
+                    "agent_name": agent_name,
+                    "persona": behavior_result.get("persona", {}),
+                    "behavior": behavior_result
+                }
+                for (agent_name, _), behavior_result in zip(agent_data_tuples, behavior_results)
+            ]
+        except Exception as e:
+            if DEBUG:
+                print(f"Error processing agents {', '.join(name for name, _ in agent_data_tuples)}: {e}")
+            return [None] * len(agent_data_tuples)
+    
+    async def _classify_agents_async(self, agent_tasks):
+        """Classify all agent tasks concurrently with a bounded number of in-flight requests."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.pack_size > 1:
+            coroutines = [
+                self.process_agent_pack_async(agent_tasks[start:start + self.pack_size], semaphore)
+                for start in range(0, len(agent_tasks), self.pack_size)
+            ]
+        else:
+            coroutines = [self.process_agent_async(task, semaphore) for task in agent_tasks]
+        
+        results = []
+        with tqdm(total=len(agent_tasks), desc="Processing agents") as progress:
+            for future in asyncio.as_completed(coroutines):
+                result = await future
+                pack_results = result if isinstance(result, list) else [result]
+                results.extend(pack_results)
+                progress.update(len(pack_results))
+        
+        return results
+    
+    def classify_simulation(self, agent_data_dict, previous_results=None):
+        """Classify behaviors for all agents in a simulation, reusing unchanged previous results."""
+        if not agent_data_dict:
             print("No agent data found for classification.")
             return {}
         
-        print(f"Classifying behaviors for {len(agent_tasks)} agents...")
+        reused_agents, pending_agent_data, input_hashes = self._reuse_previous_results(
+            agent_data_dict, previous_results or {}
+        )
+        if reused_agents:
+            print(f"Reusing {len(reused_agents)}/{len(agent_data_dict)} previous classifications (agent logs unchanged).")
         
-        # Try parallel processing, fall back to sequential on Windows pickle issues
-        try:
-            # Process agents in parallel
-            with multiprocessing.Pool(processes=multiprocessing.cpu_count()) as pool:
-                results = list(tqdm(pool.imap(self.process_agent, agent_tasks), total=len(agent_tasks)))
-        except Exception as e:
-            print(f"Parallel processing failed ({e}), falling back to sequential processing...")
-            # Fall back to sequential processing
-            results = []
-            for task in tqdm(agent_tasks, desc="Processing agents"):
-                result = self.process_agent(task)
-                results.append(result)
+        # Prepare agent tasks for concurrent processing
+        agent_tasks = list(pending_agent_data.items())
+        results = []
+        
+        if agent_tasks:
+            print(f"Classifying behaviors for {len(agent_tasks)} agents "
+                  f"(max {self.max_concurrency} concurrent requests, {self.pack_size} agents per request)...")
+            
+            results = asyncio.run(self._classify_agents_async(agent_tasks))
         
         # Filter out None results (failed processing)
         valid_results = [r for r in results if r is not None]
         
-        if not valid_results:
+        if not valid_results and not reused_agents:
             print("No valid classification results obtained.")
             return {}
         
-        # Organize results by agent
+        # Organize results by agent, keeping the original agent order
+        results_by_agent = {result["agent_name"]: result for result in valid_results}
         classified_agents = {}
-        for result in valid_results:
-            agent_name = result["agent_name"]
-            classified_agents[agent_name] = {
-                "persona": result["persona"],
-                "behavior": result["behavior"]
-            }
+        for agent_name in agent_data_dict:
+            if agent_name in reused_agents:
+                classified_agents[agent_name] = reused_agents[agent_name]
+            elif agent_name in results_by_agent:
+                result = results_by_agent[agent_name]
+                classified_agents[agent_name] = {
+                    "persona": result["persona"],
+                    "behavior": result["behavior"],
+                    "input_hash": input_hashes[agent_name]
+                }
         
         return classified_agents
     
@@ -129,6 +407,7 @@ class BehaviorClassifier:
         analysis_data = {
             "simulation_id": simulation_id,
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "classifier_fingerprint": self.classifier_fingerprint,
             "agents": classified_agents,
             "statistics": {
                 "total_agents": len(classified_agents),
@@ -137,20 +416,60 @@ class BehaviorClassifier:
         }
         
         # Track token usage
-        total_token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        total_token_usage = {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
         total_requests = 0
+        total_attempts = 0
+        failed_requests = 0
+        cache_hits = 0
+        reused_results = 0
+        token_usage_by_model = {}
         
         for agent_data in classified_agents.values():
-            if "token_usage" in agent_data.get("behavior", {}):
-                token_usage = agent_data["behavior"]["token_usage"]
+            behavior = agent_data.get("behavior", {})
+            if behavior.get("reused"):
+                # Classified in an earlier run; its tokens were already counted there
+                reused_results += 1
+                continue
+            
+            token_usage = behavior.get("token_usage")
+            if token_usage:
+                if token_usage.get("cache_hit"):
+                    cache_hits += 1
+                    continue
                 total_token_usage["prompt_tokens"] += token_usage.get("prompt_tokens", 0)
+                total_token_usage["cached_tokens"] += token_usage.get("cached_tokens", 0)
                 total_token_usage["completion_tokens"] += token_usage.get("completion_tokens", 0)
                 total_token_usage["total_tokens"] += token_usage.get("total_tokens", 0)
-                total_requests += 1
+                # Agents classified in a packed request carry their share of that request
+                total_attempts += token_usage.get("attempts", 1)
+                total_requests += token_usage.get("request_share", 1)
+                if token_usage.get("failed"):
+                    # Gave up after all attempts (counted above) without a response
+                    failed_requests += 1
+                
+                # Per-model totals, so each model's tokens can be priced at its own rates
+                for model, model_usage in self._split_token_usage_by_model(behavior, token_usage).items():
+                    model_totals = token_usage_by_model.setdefault(
+                        model, {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+                    )
+                    model_totals["requests"] += model_usage.get("request_share", 1)
+                    for key in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+                        model_totals[key] += model_usage.get(key, 0)
+        
+        cascade_stats = calculate_cascade_statistics(classified_agents)
+        if cascade_stats:
+            analysis_data["statistics"]["cascade"] = cascade_stats
         
         analysis_data["statistics"]["api_usage"] = {
-            "total_requests": total_requests,
-            "token_usage": total_token_usage
+            "total_requests": round(total_requests),
+            "total_attempts": round(total_attempts),
+            "failed_requests": failed_requests,
+            "cache_hits": cache_hits,
+            "reused_results": reused_results,
+            "token_usage": total_token_usage,
+            "token_usage_by_model": {
+                model: {**usage, "requests": round(usage["requests"])} for model, usage in token_usage_by_model.items()
+            }
         }
         
         # Create plots directory
@@ -161,12 +480,10 @@ class BehaviorClassifier:
         
         # Calculate and visualize top-k distributions
         k_values = [1, 2, 3, 4, 5, 6]
-        topk_metrics = {}
-        for k in k_values:
-            topk_dist = calculate_topk_distribution(classified_agents, k=k)
-            topk_metrics[k] = calculate_distribution_metrics(topk_dist, GROUND_TRUTH_DISTRIBUTION)
+        topk_dists = calculate_topk_distributions(classified_agents, k_values)
+        topk_metrics = dict(zip(k_values, calculate_distribution_metrics_many(list(topk_dists.values()), GROUND_TRUTH_DISTRIBUTION)))
         
-        create_topk_distributions_plot(classified_agents, plots_dir, k_values)
+        create_topk_distributions_plot(classified_agents, plots_dir, k_values, topk_dists, topk_metrics)
         
         # Calculate distribution metrics
         total_observed = sum(behavior_counts.values())
@@ -179,44 +496,144 @@ class BehaviorClassifier:
         
         return analysis_data
     
-    def process_simulation(self, simulation_path, output_path=None, direct_path=False):
-        """Process a single simulation folder."""
+    def _load_simulation(self, simulation_path, output_path=None, direct_path=False):
+        """Load a simulation's agent data and resolve its input and output folders."""
         print(f"Processing simulation: {simulation_path}")
         
-        # Load simulation data
+        # Load simulation data as compact records, skipping log fields classification does not use
         agent_logs_folder, agent_data = load_simulation_data(
             simulation_path, 
             BASE_SIMULATION_PATH, 
             DEFAULT_SIMULATION_FOLDER, 
-            direct_path
+            direct_path,
+            fields=AGENT_LOG_CLASSIFICATION_FIELDS,
+            records=True
         )
         
         if not agent_data:
             print(f"Error: Could not load agent data from {simulation_path}")
-            return False
+            return None
         
         print(f"Found {len(agent_data)} agent files.")
         
-        # Set output paths
+        # Set input and output paths
         if direct_path:
-            base_output_dir = simulation_path
+            simulation_dir = simulation_path
         else:
-            base_output_dir = os.path.join(BASE_SIMULATION_PATH, DEFAULT_SIMULATION_FOLDER, simulation_path)
+            simulation_dir = os.path.join(BASE_SIMULATION_PATH, DEFAULT_SIMULATION_FOLDER, simulation_path)
+        
+        base_output_dir = output_path if output_path else simulation_dir
+        
+        return agent_data, simulation_dir, base_output_dir
+    
+    def process_simulation(self, simulation_path, output_path=None, direct_path=False, reuse_from=None):
+        """Process a single simulation folder."""
+        loaded = self._load_simulation(simulation_path, output_path, direct_path)
+        if not loaded:
+            return False
+        
+        agent_data, simulation_dir, base_output_dir = loaded
         
-        if output_path:
-            base_output_dir = output_path
+        previous_results = {}
+        if self.reuse_results:
+            previous_results = self.load_previous_results(
+                self.find_previous_analyses(simulation_dir, base_output_dir, reuse_from)
+            )
         
         # Classify agent behaviors
-        classified_agents = self.classify_simulation(agent_data)
+        classified_agents = self.classify_simulation(agent_data, previous_results)
+        
+        return self.save_simulation_results(classified_agents, agent_data, simulation_dir, base_output_dir)
+    
+    def process_simulations_batch_api(self, simulations, batch_file_path, poll_interval=BATCH_POLL_INTERVAL_SECONDS):
+        """
+        Classify one or more simulations with a single Batch API submission.
+        
+        Args:
+            simulations: List of (simulation_path, output_path, direct_path) tuples
+            batch_file_path: Path where the batch input JSONL file is written
+            poll_interval: Seconds to wait between batch status checks
+            
+        Returns:
+            Number of simulations processed successfully
+        """
+        loaded_simulations = []
+        agent_items = {}
+        total_reused = 0
+        
+        for sim_index, (simulation_path, output_path, direct_path) in enumerate(simulations):
+            loaded = self._load_simulation(simulation_path, output_path, direct_path)
+            if not loaded:
+                continue
+            
+            agent_data, simulation_dir, base_output_dir = loaded
+            
+            previous_results = {}
+            if self.reuse_results:
+                previous_results = self.load_previous_results(self.find_previous_analyses(simulation_dir, base_output_dir))
+            reused_agents, pending_agent_data, input_hashes = self._reuse_previous_results(agent_data, previous_results)
+            total_reused += len(reused_agents)
+            
+            for agent_name, data in pending_agent_data.items():
+                agent_items[f"sim{sim_index}-{agent_name}"] = (data, get_agent_context(data))
+            
+            loaded_simulations.append((sim_index, loaded, reused_agents, input_hashes))
+        
+        if not loaded_simulations:
+            print("No agent data found for classification.")
+            return 0
         
+        if total_reused:
+            print(f"Reusing {total_reused} previous classifications (agent logs unchanged).")
+        
+        batch_results = {}
+        if agent_items:
+            print(f"Classifying behaviors for {len(agent_items)} agents from "
+                  f"{len(loaded_simulations)} simulations via the Batch API...")
+            
+            batch_results = self.llm_client.classify_agents_batch(agent_items, batch_file_path, poll_interval)
+        
+        # Merge the batch results back into per-simulation analyses
+        success_count = 0
+        for sim_index, (agent_data, simulation_dir, base_output_dir), reused_agents, input_hashes in loaded_simulations:
+            classified_agents = {}
+            for agent_name in agent_data:
+                if agent_name in reused_agents:
+                    classified_agents[agent_name] = reused_agents[agent_name]
+                    continue
+                
+                behavior_result = batch_results.get(f"sim{sim_index}-{agent_name}")
+                if behavior_result:
+                    classified_agents[agent_name] = {
+                        "persona": behavior_result.get("persona", {}),
+                        "behavior": behavior_result,
+                        "input_hash": input_hashes[agent_name]
+                    }
+            
+            print(f"\n{'='*50}")
+            print(f"Results for simulation: {simulation_dir}")
+            print(f"{'='*50}")
+            
+            if self.save_simulation_results(classified_agents, agent_data, simulation_dir, base_output_dir):
+                success_count += 1
+        
+        return success_count
+    
+    def save_simulation_results(self, classified_agents, agent_data, simulation_dir, base_output_dir):
+        """Analyze classified agents of a simulation and save all result files."""
         if not classified_agents:
             print("No agents were successfully classified.")
             return False
         
         # Analyze and create visualizations
-        simulation_id = os.path.basename(simulation_path)
+        simulation_id = os.path.basename(simulation_dir)
         analysis_data = self.analyze_and_visualize(classified_agents, base_output_dir, simulation_id)
         
+        # Unity token usage of the simulation (TokenUsage.txt or simulation_metadata.json, split per agent)
+        unity_token_usage = get_simulation_usage(simulation_dir)
+        if unity_token_usage:
+            analysis_data["statistics"]["unity_api_usage"] = unity_token_usage
+        
         # Save analysis results
         output_file = os.path.join(base_output_dir, "behavior_analysis.json")
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -235,17 +652,6 @@ class BehaviorClassifier:
         generate_human_comparison_data(classified_agents, human_comparison_file, get_context_from_logs)
         generate_label_studio_data(classified_agents, label_studio_file, get_context_from_logs)
         
-        # Try to load Unity token usage if available
-        unity_token_usage = None
-        if direct_path:
-            token_log_path = os.path.join(simulation_path, "TokenUsage.txt")
-        else:
-            token_log_path = os.path.join(BASE_SIMULATION_PATH, DEFAULT_SIMULATION_FOLDER, simulation_path, "TokenUsage.txt")
-        
-        unity_token_usage = parse_token_usage_log(token_log_path)
-        if unity_token_usage:
-            analysis_data["statistics"]["unity_api_usage"] = unity_token_usage
-        
         # Print summary
         behavior_counts = calculate_behavior_counts(classified_agents)
         distribution_metrics = analysis_data["statistics"]["distribution_metrics"]
@@ -257,7 +663,9 @@ class BehaviorClassifier:
             distribution_metrics=distribution_metrics,
             topk_metrics=topk_metrics,
             token_usage=api_usage["token_usage"],
-            unity_token_usage=unity_token_usage
+            unity_token_usage=unity_token_usage,
+            cache_stats=self.llm_client.cache.stats() if self.llm_client.cache else None,
+            cascade_stats=analysis_data["statistics"].get("cascade")
         )
         
         print(f"\nResults saved to: {output_file}")
@@ -275,10 +683,31 @@ def main():
                         help='Treat folder argument as a direct path to the simulation folder')
     parser.add_argument('--output', type=str, default=None,
                         help='Custom output directory for results')
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENT_REQUESTS,
+                        help='Maximum number of classification requests in flight at once')
+    parser.add_argument('--no-cache', action='store_true', default=False,
+                        help='Always query the LLM instead of reusing cached classification responses')
+    parser.add_argument('--pack-size', type=int, default=DEFAULT_CLASSIFICATION_PACK_SIZE,
+                        help='Number of agents classified per request (shares one copy of the category rubric)')
+    parser.add_argument('--cascade', action='store_true', default=False,
+                        help='Classify with a small model first and escalate only ambiguous agents to the large model')
+    parser.add_argument('--no-reuse', action='store_true', default=False,
+                        help='Reclassify every agent instead of reusing results of agents whose logs are unchanged')
+    parser.add_argument('--reuse-from', type=str, default=None,
+                        help='Previous behavior_analysis.json (or its folder) to reuse unchanged agent results from')
+    parser.add_argument('--batch-api', action='store_true', default=False,
+                        help='Submit all classification requests as one Batch API job instead of interactive calls')
+    parser.add_argument('--poll-interval', type=float, default=BATCH_POLL_INTERVAL_SECONDS,
+                        help='Seconds between Batch API status checks (with --batch-api)')
     args = parser.parse_args()
     
     # Initialize the behavior classifier
-    classifier = BehaviorClassifier()
+    if args.cascade and args.batch_api:
+        print("Warning: --cascade is not supported with --batch-api; all agents use the large model")
+    
+    classifier = BehaviorClassifier(max_concurrency=args.max_concurrency, use_cache=not args.no_cache,
+                                    pack_size=args.pack_size, cascade=args.cascade and not args.batch_api,
+                                    reuse_results=not args.no_reuse)
     
     if args.direct_path:
         # Direct path mode - use the provided path directly
@@ -287,7 +716,13 @@ def main():
             return 1
         
         print(f"Processing simulation at direct path: {args.folder}")
-        success = classifier.process_simulation(args.folder, args.output, direct_path=True)
+        if args.batch_api:
+            batch_file_path = os.path.join(args.output or args.folder, BATCH_INPUT_FILE_NAME)
+            success = classifier.process_simulations_batch_api(
+                [(args.folder, args.output, True)], batch_file_path, args.poll_interval
+            ) > 0
+        else:
+            success = classifier.process_simulation(args.folder, args.output, direct_path=True, reuse_from=args.reuse_from)
         return 0 if success else 1
         
     elif args.batch:
@@ -306,6 +741,19 @@ def main():
             
         print(f"Found {len(simulation_folders)} simulation folders to process.")
         
+        if args.batch_api:
+            simulations = [
+                (os.path.join(batch_folder, sim_folder), 
+                 os.path.join(args.output, sim_folder) if args.output else None, 
+                 True)
+                for sim_folder in simulation_folders
+            ]
+            batch_file_path = os.path.join(args.output or batch_folder, BATCH_INPUT_FILE_NAME)
+            success_count = classifier.process_simulations_batch_api(simulations, batch_file_path, args.poll_interval)
+            
+            print(f"\nBatch processing complete: {success_count}/{len(simulation_folders)} simulations processed successfully.")
+            return 0
+        
         success_count = 0
         for sim_folder in simulation_folders:
             print(f"\n{'='*50}")
@@ -323,7 +771,14 @@ def main():
         
     else:
         # Single simulation mode
-        success = classifier.process_simulation(args.folder, args.output)
+        if args.batch_api:
+            simulation_dir = os.path.join(BASE_SIMULATION_PATH, DEFAULT_SIMULATION_FOLDER, args.folder)
+            batch_file_path = os.path.join(args.output or simulation_dir, BATCH_INPUT_FILE_NAME)
+            success = classifier.process_simulations_batch_api(
+                [(args.folder, args.output, False)], batch_file_path, args.poll_interval
+            ) > 0
+        else:
+            success = classifier.process_simulation(args.folder, args.output, reuse_from=args.reuse_from)
         return 0 if success else 1
 
 
@@ -19,6 +19,9 @@ BASE_OPTIMIZATION_PATH = os.path.join(BASE_SIMULATION_PATH, "OptimizationRuns")
 # Base path where evaluation results will be stored
 BASE_EVALUATION_PATH = os.path.join(BASE_SIMULATION_PATH, "EvaluationResults")
 
+# SQLite index of optimization runs used for fast cross-run queries
+EXPERIMENT_STORE_PATH = os.path.join(BASE_EVALUATION_PATH, "experiments.sqlite")
+
 # Default simulation logs folder
 DEFAULT_SIMULATION_FOLDER = "SimulationLogs"
 
@@ -65,6 +68,29 @@ BEHAVIOR_DESCRIPTIONS = {
     "FIGHT": "Actively attempting to confront, disarm, or incapacitate the shooter, typically as a last resort when no other options are viable."
 }
 
+# Agent log fields needed for classification; everything else (notably the per-tick trajectory)
+# is skipped while parsing AgentLogs/*.json
+AGENT_LOG_CLASSIFICATION_FIELDS = [
+    "persona",
+    "memories",
+    "actions",
+    "observations",
+    "final_status"
+]
+
+# Columnar (Parquet) cache of simulation logs, stored inside each simulation folder
+COLUMNAR_CACHE_FOLDER = "ColumnarCache"
+# Bump when the table layout changes so existing caches are rebuilt
+COLUMNAR_CACHE_VERSION = 2
+
+# Compression of archived JSON logs ('gz' or 'zst'; zst requires zstandard)
+LOG_COMPRESSION_FORMAT = "gz"
+LOG_COMPRESSION_LEVELS = {"gz": 6, "zst": 10}
+
+# Memory-mapped NumPy store of agent, shooter and human trajectories, stored inside each simulation folder
+TRAJECTORY_STORE_FOLDER = "TrajectoryStore"
+TRAJECTORY_STORE_VERSION = 1
+
 # ======= METRICS CONFIGURATIONS =======
 # Metrics to track for optimization analysis
 METRICS = [
@@ -82,6 +108,13 @@ METRIC_NAMES = {
     "tvd": "Total Variation Distance"
 }
 
+# Bootstrap confidence intervals (agents resampled within each iteration)
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_METRICS = ["kl_divergence", "js_divergence", "tvd"]
+# Seed of the resampling, so repeated analyses (and watch-mode refreshes) draw the same intervals
+BOOTSTRAP_SEED = 0
+
 # ======= API CONFIGURATIONS =======
 # Default OpenAI model configurations
 DEFAULT_OPENAI_CONFIG = {
@@ -98,6 +131,29 @@ CLASSIFICATION_OPENAI_CONFIG = {
     "response_format": {"type": "json_object"}
 }
 
+# First tier of the classification cascade: a small model whose confident answers are kept;
+# ambiguous agents are escalated to CLASSIFICATION_OPENAI_CONFIG
+CASCADE_CLASSIFICATION_OPENAI_CONFIG = {
+    "model": "gpt-4.1-mini",
+    "temperature": 0.0,
+    "max_tokens": 1000,
+    "response_format": {"type": "json_object"}
+}
+
+# Phrases in the small model's reasoning that mark a classification as ambiguous
+CASCADE_AMBIGUITY_MARKERS = [
+    "ambiguous",
+    "unclear",
+    "uncertain",
+    "not clear",
+    "hard to determine",
+    "difficult to determine",
+    "could also",
+    "might also",
+    "borderline",
+    "mixed signals"
+]
+
 # Persona optimization specific OpenAI configuration
 PERSONA_OPTIMIZATION_CONFIG = {
     "model": "gpt-4.1",
@@ -106,6 +162,34 @@ PERSONA_OPTIMIZATION_CONFIG = {
     "response_format": {"type": "json_object"}
 }
 
+# Persistent response cache for deterministic (temperature 0) LLM calls
+LLM_CACHE_PATH = os.path.join(BASE_SIMULATION_PATH, "LLMCache", "responses.sqlite")
+LLM_CACHE_MAX_SIZE_MB = 512
+LLM_CACHE_MAX_AGE_DAYS = 90
+
+# Initial per-model rate limits; adjusted at runtime from the provider's x-ratelimit-* headers
+DEFAULT_RATE_LIMIT_RPM = 500
+DEFAULT_RATE_LIMIT_TPM = 200000
+
+# Retry policy for transient API failures (429, 5xx, timeouts)
+LLM_MAX_RETRIES = 5
+LLM_RETRY_BASE_DELAY = 1.0
+LLM_RETRY_MAX_DELAY = 60.0
+
+# Consecutive provider failures that pause all workers, and for how long
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_COOLDOWN_SECONDS = 30
+
+# Batch API settings for offline (non-interactive) classification
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL_SECONDS = 30
+BATCH_INPUT_FILE_NAME = "classification_batch.jsonl"
+
+# Packed classification: agents classified per request (sharing one copy of the category rubric)
+# and completion tokens reserved for each of them
+DEFAULT_CLASSIFICATION_PACK_SIZE = 1
+PACKED_CLASSIFICATION_TOKENS_PER_AGENT = 300
+
 # ======= VISUALIZATION CONFIGURATIONS =======
 # Color map for behavior categories
 BEHAVIOR_COLORS = {
@@ -140,6 +224,18 @@ DEFAULT_DPI = 300
 DEFAULT_MAX_WORKERS = 32
 DEFAULT_BATCH_SIZE = 50
 
+# Threads used to read JSON files (agent logs, iteration analyses) concurrently
+DEFAULT_LOADER_WORKERS = 16
+
+# Worker processes used to load several optimization runs in parallel
+DEFAULT_RUN_LOADER_PROCESSES = 4
+
+# Maximum number of LLM requests kept in flight by the asyncio classification engine
+DEFAULT_MAX_CONCURRENT_REQUESTS = 64
+
+# Seconds between checks for new iterations in analyze_optimization.py --watch
+OPTIMIZATION_WATCH_INTERVAL_SECONDS = 30
+
 # ======= DEBUG SETTINGS =======
 DEBUG = True
 VERBOSE = False
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+"""
+Typed agent log records for PEBA-PEvo framework.
+
+This module mirrors the classes serialized by the Unity AgentLogger (AgentLog and its
+LoggedAction, LoggedObservation, LoggedMemory and LoggedPosition entries) as slotted Python
+classes. A slotted record takes a fraction of the memory of the equivalent dictionary, which
+adds up over tens of thousands of actions, observations and trajectory samples.
+
+Records keep a dictionary-compatible interface (record["time"], record.get("plan", ""),
+"key" in record, keys()/items()), so code written against the decoded JSON keeps working.
+Fields missing from the log stay unset and read as missing, and unknown fields are kept,
+so to_dict() reproduces the original JSON object.
+"""
+
+from typing import Dict, Any, List, Tuple, Iterator, Optional
+
+
+class LogRecord:
+    """Base class of slotted log records with dictionary-style access."""
+    
+    __slots__ = ("_extra",)
+    
+    # Known fields, stored in slots; any other field goes to _extra
+    FIELDS: Tuple[str, ...] = ()
+    
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogRecord":
+        """
+        Build a record from a decoded JSON object.
+        
+        Args:
+            data: Decoded JSON object
+            
+        Returns:
+            Record holding the same fields
+        """
+        record = cls.__new__(cls)
+        for key, value in data.items():
+            record[key] = cls._convert_field(key, value)
+        return record
+    
+    @classmethod
+    def _convert_field(cls, key: str, value: Any) -> Any:
+        """Convert a nested field into records (overridden by records with nested entries)."""
+        return value
+    
+    def __setitem__(self, key: str, value: Any):
+        if key in self.FIELDS:
+            object.__setattr__(self, key, value)
+            return
+        try:
+            self._extra[key] = value
+        except AttributeError:
+            self._extra = {key: value}
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            if key in self.FIELDS:
+                return getattr(self, key)
+            return self._extra[key]
+        except (AttributeError, KeyError):
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a field, or default if the log does not contain it."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+    
+    def keys(self) -> List[str]:
+        """Names of the fields present in the log."""
+        present = [field for field in self.FIELDS if hasattr(self, field)]
+        return present + list(getattr(self, "_extra", {}))
+    
+    def values(self) -> List[Any]:
+        return [self[key] for key in self.keys()]
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def __len__(self) -> int:
+        return len(self.keys())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the record (and its nested records) back into plain JSON objects.
+        
+        Returns:
+            Dictionary equal to the JSON object the record was decoded from
+        """
+        return {key: _to_plain(value) for key, value in self.items()}
+    
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LogRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+
+def _to_plain(value: Any) -> Any:
+    """Convert records nested in lists into plain JSON values."""
+    if isinstance(value, LogRecord):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """
+    Serialize records with json.dumps(..., default=json_default).
+    
+    Args:
+        value: Object json cannot serialize natively
+        
+    Returns:
+        Plain dictionary for records
+        
+    Raises:
+        TypeError: If the value is not a record
+    """
+    if isinstance(value, LogRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class LoggedAction(LogRecord):
+    """Action decided by an agent (AgentLogger.LoggedAction)."""
+    
+    FIELDS = ("time", "action_type", "movement_state", "dialog_text", "plan", "target_location")
+    __slots__ = FIELDS
+
+
+class LoggedObservation(LogRecord):
+    """Observation of an agent with its mood (AgentLogger.LoggedObservation)."""
+    
+    FIELDS = ("time", "observation")
+    __slots__ = FIELDS
+
+
+class LoggedMemory(LogRecord):
+    """Memory formed by an agent (AgentLogger.LoggedMemory)."""
+    
+    FIELDS = ("time", "description")
+    __slots__ = FIELDS
+
+
+class LoggedPosition(LogRecord):
+    """Trajectory sample of an agent, the shooter or the human player (LoggedPosition)."""
+    
+    FIELDS = ("time", "x", "y", "z", "rotation_x", "rotation_y", "rotation_z", "health", "health_status")
+    __slots__ = FIELDS
+
+
+class AgentLog(LogRecord):
+    """Complete log of one agent (AgentLogger.AgentLog)."""
+    
+    FIELDS = ("persona", "traits", "observations", "actions", "memories", "trajectory", "final_status")
+    __slots__ = FIELDS
+    
+    # Record class of the entries of each list field
+    ENTRY_TYPES = {
+        "observations": LoggedObservation,
+        "actions": LoggedAction,
+        "memories": LoggedMemory,
+        "trajectory": LoggedPosition
+    }
+    
+    @classmethod
+    def _convert_field(cls, key: str, value: Any) -> Any:
+        entry_type = cls.ENTRY_TYPES.get(key)
+        if entry_type is not None and isinstance(value, list):
+            return [entry_type.from_dict(entry) if isinstance(entry, dict) else entry for entry in value]
+        return value
+
+
+def to_agent_log(data: Optional[Dict[str, Any]]) -> Optional[AgentLog]:
+    """
+    Convert a decoded agent log into an AgentLog record.
+    
+    Args:
+        data: Decoded AgentLogs/*.json content (may be None)
+        
+    Returns:
+        AgentLog record, or None if data is not a JSON object
+    """
+    return AgentLog.from_dict(data) if isinstance(data, dict) else None
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the OpenAI Files/Batches API.
+
+This module runs a small HTTP server that implements just enough of the OpenAI API
+(file upload, batch create/retrieve, file content and chat completions) to exercise the
+batch classification flow of classify_behavior.py offline. Responses are deterministic
+mock classifications derived from a hash of the prompt.
+
+Usage:
+    python -m peba_core.utils.batch_stub_server --port 8765
+
+    # In another shell
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub \
+        python classify_behavior.py --folder <path> --direct-path --batch-api --poll-interval 1
+"""
+
+import json
+import time
+import uuid
+import hashlib
+import argparse
+import threading
+from email.parser import BytesParser
+from email.policy import default as default_email_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+from ..config import BEHAVIOR_DESCRIPTIONS
+
+
+def _stub_completion_content(body: Dict[str, Any]) -> str:
+    """
+    Produce a deterministic mock classification for a chat completion request body.
+    
+    Args:
+        body: Chat completion request body
+        
+    Returns:
+        JSON string in the format expected by LLMClient
+    """
+    prompt_text = "".join(message.get("content", "") for message in body.get("messages", []))
+    ranking = sorted(
+        BEHAVIOR_DESCRIPTIONS.keys(),
+        key=lambda category: hashlib.sha256((category + prompt_text).encode("utf-8")).hexdigest()
+    )
+    
+    return json.dumps({
+        "reasoning": "Stub classification generated by the local batch server.",
+        "classification": ranking[0],
+        "ranking": ranking
+    })
+
+
+def _stub_chat_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a chat completion response object for a request body."""
+    content = _stub_completion_content(body)
+    prompt_text = "".join(message.get("content", "") for message in body.get("messages", []))
+    prompt_tokens = max(1, len(prompt_text) // 4)
+    completion_tokens = max(1, len(content) // 4)
+    
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+class StubState:
+    """In-memory storage for uploaded files and submitted batches."""
+    
+    def __init__(self, processing_delay: float = 0.0):
+        self.processing_delay = processing_delay
+        self.files = {}
+        self.batches = {}
+        self.lock = threading.Lock()
+    
+    def add_file(self, content: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+        """Store an uploaded file and return its file object."""
+        file_object = {
+            "id": f"file-{uuid.uuid4().hex}",
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed"
+        }
+        with self.lock:
+            self.files[file_object["id"]] = (file_object, content)
+        return file_object
+    
+    def create_batch(self, input_file_id: str, endpoint: str, completion_window: str) -> Dict[str, Any]:
+        """Register a new batch; it is processed once the processing delay has elapsed."""
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex}",
+            "object": "batch",
+            "endpoint": endpoint,
+            "input_file_id": input_file_id,
+            "completion_window": completion_window,
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0}
+        }
+        with self.lock:
+            self.batches[batch["id"]] = batch
+        return batch
+    
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Return a batch, running it first if it is due."""
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch and batch["status"] == "in_progress" and time.time() - batch["created_at"] >= self.processing_delay:
+                self._run_batch(batch)
+            return batch
+    
+    def _run_batch(self, batch: Dict[str, Any]):
+        """Answer every request of a batch and store the output file."""
+        _, input_content = self.files[batch["input_file_id"]]
+        
+        output_lines = []
+        for line in input_content.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            output_lines.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": _stub_chat_completion(request["body"])
+                },
+                "error": None
+            }))
+        
+        output_content = ("\n".join(output_lines) + "\n").encode("utf-8")
+        file_object = {
+            "id": f"file-{uuid.uuid4().hex}",
+            "object": "file",
+            "bytes": len(output_content),
+            "created_at": int(time.time()),
+            "filename": f"{batch['id']}_output.jsonl",
+            "purpose": "batch_output",
+            "status": "processed"
+        }
+        self.files[file_object["id"]] = (file_object, output_content)
+        
+        batch["status"] = "completed"
+        batch["output_file_id"] = file_object["id"]
+        batch["request_counts"] = {"total": len(output_lines), "completed": len(output_lines), "failed": 0}
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler implementing the subset of the OpenAI API used by LLMClient."""
+    
+    state: StubState = None
+    
+    def _send_json(self, payload: Dict[str, Any], status: int = 200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _send_not_found(self):
+        self._send_json({"error": {"message": f"Unknown path: {self.path}", "type": "invalid_request_error"}}, 404)
+    
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length)
+    
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        body = self._read_body()
+        
+        if path.endswith("/files"):
+            # Parse the multipart upload
+            message = BytesParser(policy=default_email_policy).parsebytes(
+                b"Content-Type: " + self.headers["Content-Type"].encode("utf-8") + b"\r\n\r\n" + body
+            )
+            fields = {}
+            file_content, filename = b"", "upload.jsonl"
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                if name == "file":
+                    file_content = part.get_payload(decode=True)
+                    filename = part.get_filename() or filename
+                else:
+                    fields[name] = part.get_content().strip()
+            self._send_json(self.state.add_file(file_content, filename, fields.get("purpose", "batch")))
+        
+        elif path.endswith("/batches"):
+            request = json.loads(body)
+            if request.get("input_file_id") not in self.state.files:
+                self._send_json({"error": {"message": "Input file not found", "type": "invalid_request_error"}}, 400)
+                return
+            self._send_json(self.state.create_batch(
+                request["input_file_id"], request.get("endpoint", "/v1/chat/completions"),
+                request.get("completion_window", "24h")
+            ))
+        
+        elif path.endswith("/chat/completions"):
+            self._send_json(_stub_chat_completion(json.loads(body)))
+        
+        else:
+            self._send_not_found()
+    
+    def do_GET(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        
+        if len(parts) >= 2 and parts[-2] == "batches":
+            batch = self.state.get_batch(parts[-1])
+            if batch:
+                self._send_json(batch)
+                return
+        
+        elif len(parts) >= 3 and parts[-3] == "files" and parts[-1] == "content":
+            stored = self.state.files.get(parts[-2])
+            if stored:
+                content = stored[1]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+                return
+        
+        self._send_not_found()
+    
+    def log_message(self, format, *args):
+        # Keep the console quiet; the classifier prints its own progress
+        pass
+
+
+def create_stub_server(host: str = "127.0.0.1", port: int = 8765, processing_delay: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a stub OpenAI batch server.
+    
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        processing_delay: Seconds a batch stays in progress before it is completed
+        
+    Returns:
+        Server instance; call serve_forever() to run it
+    """
+    handler = type("BoundStubRequestHandler", (StubRequestHandler,), {"state": StubState(processing_delay)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    """Run the stub server from the command line."""
+    parser = argparse.ArgumentParser(description='Run a local stand-in for the OpenAI Batch API.')
+    parser.add_argument('--host', type=str, default="127.0.0.1",
+                        help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='Port to listen on')
+    parser.add_argument('--processing-delay', type=float, default=2.0,
+                        help='Seconds each batch stays in progress before completing')
+    args = parser.parse_args()
+    
+    server = create_stub_server(args.host, args.port, args.processing_delay)
+    print(f"Stub batch server listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""
+Agent behavior matrices for PEBA-PEvo framework.
+
+This module encodes the classified behaviors of an optimization run as an agents x iterations
+matrix of small integer codes (indices into BEHAVIOR_CATEGORIES, -1 where an agent was not
+classified). The matrix is built once per run; transition counts between consecutive
+iterations, flip rates and the outcome of persona adjustments are then NumPy operations on it,
+shared by the effectiveness analysis and the Sankey diagrams.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import BEHAVIOR_CATEGORIES
+
+
+# Code of agents without a (valid) classification in an iteration
+UNOBSERVED = -1
+
+CATEGORY_CODES = {category: code for code, category in enumerate(BEHAVIOR_CATEGORIES)}
+UNKNOWN_CODE = CATEGORY_CODES.get("UNKNOWN", UNOBSERVED)
+
+
+def encode_behaviors(behaviors: List[Optional[str]]) -> np.ndarray:
+    """
+    Encode behavior names as category codes.
+    
+    Args:
+        behaviors: Behavior category names (None or unknown names become UNOBSERVED)
+        
+    Returns:
+        Array of int8 codes
+    """
+    return np.array([CATEGORY_CODES.get(behavior, UNOBSERVED) for behavior in behaviors], dtype=np.int8)
+
+
+class BehaviorMatrix:
+    """Classified behaviors of the agents of one run across its iterations."""
+    
+    def __init__(self, agents: List[str], iterations: List[int], codes: np.ndarray):
+        """
+        Initialize a behavior matrix.
+        
+        Args:
+            agents: Agent names (matrix rows)
+            iterations: Iteration numbers in ascending order (matrix columns)
+            codes: Array of shape (agents, iterations) of category codes
+        """
+        self.agents = agents
+        self.iterations = iterations
+        self.codes = codes
+        self.agent_index = {agent: row for row, agent in enumerate(agents)}
+        self.iteration_index = {iteration: column for column, iteration in enumerate(iterations)}
+    
+    @classmethod
+    def from_run(cls, run_data: Dict[str, Any]) -> "BehaviorMatrix":
+        """
+        Build the matrix of a run from its agent_behaviors.
+        
+        Args:
+            run_data: Data of one run ({"iterations": {...}}) as loaded by load_optimization_run_data
+            
+        Returns:
+            BehaviorMatrix of the run
+        """
+        iterations = sorted(run_data["iterations"])
+        agent_index = {}
+        for iteration in iterations:
+            for agent in run_data["iterations"][iteration].get("agent_behaviors", {}):
+                agent_index.setdefault(agent, len(agent_index))
+        
+        codes = np.full((len(agent_index), len(iterations)), UNOBSERVED, dtype=np.int8)
+        for column, iteration in enumerate(iterations):
+            agent_behaviors = run_data["iterations"][iteration].get("agent_behaviors", {})
+            if agent_behaviors:
+                rows = [agent_index[agent] for agent in agent_behaviors]
+                codes[rows, column] = encode_behaviors(list(agent_behaviors.values()))
+        
+        return cls(list(agent_index), iterations, codes)
+    
+    def transition_counts(self, include_unknown: bool = False) -> np.ndarray:
+        """
+        Count behavior transitions between consecutive iterations.
+        
+        Args:
+            include_unknown: Whether transitions from or to UNKNOWN are counted
+            
+        Returns:
+            Array of shape (iterations - 1, categories, categories) where [t, i, j] is the number of
+            agents classified as category i in iteration t and category j in iteration t + 1
+        """
+        num_categories = len(BEHAVIOR_CATEGORIES)
+        num_pairs = max(len(self.iterations) - 1, 0)
+        if num_pairs == 0 or len(self.agents) == 0:
+            return np.zeros((num_pairs, num_categories, num_categories), dtype=np.int64)
+        
+        from_codes = self.codes[:, :-1].astype(np.int64)
+        to_codes = self.codes[:, 1:].astype(np.int64)
+        valid = (from_codes != UNOBSERVED) & (to_codes != UNOBSERVED)
+        if not include_unknown:
+            valid &= (from_codes != UNKNOWN_CODE) & (to_codes != UNKNOWN_CODE)
+        
+        pairs = np.broadcast_to(np.arange(num_pairs), from_codes.shape)[valid]
+        flat = (pairs * num_categories + from_codes[valid]) * num_categories + to_codes[valid]
+        counts = np.bincount(flat, minlength=num_pairs * num_categories * num_categories)
+        return counts.reshape(num_pairs, num_categories, num_categories)
+    
+    def flip_rates(self) -> np.ndarray:
+        """
+        Get the fraction of agents whose behavior changed between consecutive iterations.
+        
+        Returns:
+            Array of shape (iterations - 1,) with the flip rate among agents classified in both
+            iterations (NaN if there are none)
+        """
+        counts = self.transition_counts(include_unknown=True)
+        totals = counts.sum(axis=(1, 2))
+        flips = totals - np.trace(counts, axis1=1, axis2=2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(totals > 0, flips / np.maximum(totals, 1), np.nan)
+    
+    def behaviors_at(self, iteration: int, agents: List[str]) -> np.ndarray:
+        """
+        Look up the behavior codes of agents in an iteration.
+        
+        Args:
+            iteration: Iteration number
+            agents: Agent names
+            
+        Returns:
+            Array of codes (UNOBSERVED for agents or iterations without a classification)
+        """
+        column = self.iteration_index.get(iteration)
+        rows = np.array([self.agent_index.get(agent, -1) for agent in agents], dtype=np.int64)
+        codes = np.full(len(agents), UNOBSERVED, dtype=np.int8)
+        if column is not None:
+            found = rows >= 0
+            codes[found] = self.codes[rows[found], column]
+        return codes
+
+
+def build_behavior_matrices(optimization_data: Dict[str, Any]) -> Dict[str, BehaviorMatrix]:
+    """
+    Build the behavior matrix of every run.
+    
+    Args:
+        optimization_data: Dictionary containing optimization run data
+        
+    Returns:
+        Dictionary mapping run names to their BehaviorMatrix
+    """
+    return {run_name: BehaviorMatrix.from_run(run_data) for run_name, run_data in optimization_data.items()}
+
+
+def adjustment_outcomes(from_codes: np.ndarray, target_codes: np.ndarray,
+                        actual_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Count persona adjustments and their successes per (from, to) behavior pair.
+    
+    An adjustment succeeds if the agent shows its target behavior in the next iteration.
+    
+    Args:
+        from_codes: Behavior codes before the adjustment
+        target_codes: Target behavior codes of the adjustment
+        actual_codes: Behavior codes observed in the next iteration
+        
+    Returns:
+        Tuple of (totals, successes), arrays of shape (categories, categories) indexed by
+        [from, target]; adjustments with an unknown from or target behavior are left out
+    """
+    num_categories = len(BEHAVIOR_CATEGORIES)
+    from_codes = np.asarray(from_codes, dtype=np.int64)
+    target_codes = np.asarray(target_codes, dtype=np.int64)
+    valid = (from_codes != UNOBSERVED) & (target_codes != UNOBSERVED)
+    
+    flat = from_codes[valid] * num_categories + target_codes[valid]
+    success = (np.asarray(actual_codes) == target_codes)[valid]
+    size = num_categories * num_categories
+    totals = np.bincount(flat, minlength=size).reshape(num_categories, num_categories)
+    successes = np.bincount(flat[success], minlength=size).reshape(num_categories, num_categories)
+    return totals, successes
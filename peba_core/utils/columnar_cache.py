@@ -0,0 +1,586 @@
+#!/usr/bin/env python
+"""
+Columnar cache of simulation logs for PEBA-PEvo framework.
+
+This module converts the nested JSON logs of a simulation folder (AgentLogs/*.json,
+shooter_traj.json, human_traj.json and simulation_metadata.json) into flat tables
+(agents, actions, observations, memories, trajectory) and stores them as Parquet files,
+so analysis scripts can read just the columns they need instead of re-parsing every log.
+The manifest also records the key path of every flattened column, so load_simulation_data
+and the trajectory store rebuild agent logs and trajectories from a fresh cache.
+
+The cache lives in a ColumnarCache folder inside the simulation folder, next to a manifest
+recording the size and modification time of every source file; it is only used while those
+still match. Writing and reading Parquet requires pyarrow (or fastparquet); without it the
+tables are built in memory from the JSON logs instead.
+
+Usage:
+    python -m peba_core.utils.columnar_cache <simulation_folder> [<simulation_folder> ...]
+"""
+
+import os
+import sys
+import json
+import argparse
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from ..config import (
+    COLUMNAR_CACHE_FOLDER,
+    COLUMNAR_CACHE_VERSION
+)
+from .data_loader import load_json_file, load_agent_data, find_json_file, list_json_files
+
+# Parquet support is optional; pandas picks whichever engine is installed
+try:
+    import pyarrow
+    PARQUET_ENGINE = "pyarrow"
+except ImportError:
+    try:
+        import fastparquet
+        PARQUET_ENGINE = "fastparquet"
+    except ImportError:
+        PARQUET_ENGINE = None
+
+
+TABLE_NAMES = ["agents", "actions", "observations", "memories", "trajectory"]
+
+# Files of a simulation folder (besides AgentLogs/*.json) that feed the tables
+SIMULATION_SOURCE_FILES = ["shooter_traj.json", "human_traj.json", "simulation_metadata.json"]
+
+# Tables whose flattened columns are recorded in the manifest layout
+LAYOUT_TABLE_NAMES = ["agents", "actions", "observations"]
+
+# Agent log fields and the tables they are rebuilt from
+AGENT_LOG_FIELD_TABLES = {
+    "persona": "agents",
+    "traits": "agents",
+    "final_status": "agents",
+    "actions": "actions",
+    "observations": "observations",
+    "memories": "memories",
+    "trajectory": "trajectory"
+}
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def _flatten_record(record: Dict[str, Any], prefix: str = "", layout: Optional[Dict[str, Any]] = None,
+                    path: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """
+    Flatten nested dictionaries into prefixed columns; lists are stored as JSON text.
+    
+    Args:
+        record: Dictionary to flatten
+        prefix: Prefix for the column names
+        layout: Optional table layout to record each column's key path (and whether it holds
+                JSON text) in, so the nested records can be rebuilt from the table
+        path: Key path of record within the original (unflattened) record
+        
+    Returns:
+        Flat dictionary of scalar values
+    """
+    flat = {}
+    for key, value in record.items():
+        column = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten_record(value, f"{column}_", layout, path + (key,)))
+            continue
+        
+        if isinstance(value, list):
+            flat[column] = json.dumps(value, ensure_ascii=False)
+        else:
+            flat[column] = value
+        if layout is not None and column not in layout:
+            layout[column] = {"path": list(path + (key,)), "json": isinstance(value, list)}
+    return flat
+
+
+def _unflatten_record(row: Dict[str, Any], layout: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rebuild a nested record from a table row flattened by _flatten_record.
+    
+    Args:
+        row: Table row (columns without a layout entry are left out)
+        layout: Layout of the table's flattened columns
+        
+    Returns:
+        Nested dictionary; missing values (NaN) become None
+    """
+    record = {}
+    for column, entry in layout.items():
+        if column not in row:
+            continue
+        
+        path = entry["path"]
+        value = row[column]
+        if value is None or (isinstance(value, float) and value != value):
+            # Missing values of nested fields come from rows where the parent was null
+            if len(path) > 1:
+                continue
+            value = None
+        elif entry["json"] and isinstance(value, str):
+            value = json.loads(value)
+        
+        target = record
+        for key in path[:-1]:
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            target = target[key]
+        # A null parent column must not replace the fields of a parent that is present
+        if value is None and isinstance(target.get(path[-1]), dict):
+            continue
+        target[path[-1]] = value
+    return record
+
+
+def _normalize_object_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Store object columns that mix value types (e.g. ages as numbers and text) as text."""
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+        
+        value_types = {type(value) for value in df[column] if value is not None}
+        if len(value_types) > 1:
+            df[column] = df[column].map(lambda value: None if value is None else str(value))
+    
+    return df
+
+
+def _records_table(rows: List[Dict[str, Any]], columns: List[str]) -> pd.DataFrame:
+    """Build a table from flat records, keeping the given leading columns even when there are no rows."""
+    df = pd.DataFrame.from_records(rows) if rows else pd.DataFrame(columns=columns)
+    return _normalize_object_columns(df)
+
+
+def get_source_files(simulation_dir: str) -> List[str]:
+    """
+    List the files of a simulation folder that the columnar tables are built from.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        
+    Returns:
+        Sorted list of paths relative to the simulation folder
+    """
+    sources = []
+    
+    agent_logs_folder = os.path.join(simulation_dir, "AgentLogs")
+    if os.path.isdir(agent_logs_folder):
+        sources.extend(os.path.join("AgentLogs", f) for f in list_json_files(agent_logs_folder).values())
+    
+    for file_name in SIMULATION_SOURCE_FILES:
+        file_path = find_json_file(os.path.join(simulation_dir, file_name))
+        if file_path:
+            sources.append(os.path.basename(file_path))
+    return sorted(sources)
+
+
+def _source_fingerprints(simulation_dir: str) -> Dict[str, Dict[str, int]]:
+    """Record the size and modification time of every source file."""
+    fingerprints = {}
+    for source in get_source_files(simulation_dir):
+        stat = os.stat(os.path.join(simulation_dir, source))
+        fingerprints[source.replace(os.sep, "/")] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return fingerprints
+
+
+def build_simulation_tables(simulation_dir: str) -> Tuple[Dict[str, pd.DataFrame], Optional[Dict[str, Any]],
+                                                         Dict[str, Dict[str, Any]]]:
+    """
+    Build the columnar tables of a simulation from its JSON logs.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        
+    Returns:
+        Tuple of (tables, metadata, layout). tables maps each name in TABLE_NAMES to a DataFrame;
+        metadata is the content of simulation_metadata.json (None if missing); layout maps
+        table names to the key paths of their flattened columns (see _flatten_record).
+    """
+    agent_data = load_agent_data(os.path.join(simulation_dir, "AgentLogs"))
+    layout = {name: {} for name in LAYOUT_TABLE_NAMES}
+    
+    agent_rows, action_rows, observation_rows, memory_rows, trajectory_frames = [], [], [], [], []
+    
+    for agent_name in sorted(agent_data):
+        data = agent_data[agent_name]
+        trajectory = data.get("trajectory") or []
+        
+        agent_rows.append({
+            "agent": agent_name,
+            **_flatten_record(data.get("persona") or {}, "persona_", layout["agents"], ("persona",)),
+            **_flatten_record(data.get("traits") or {}, "traits_", layout["agents"], ("traits",)),
+            "final_status": data.get("final_status"),
+            "action_count": len(data.get("actions") or []),
+            "observation_count": len(data.get("observations") or []),
+            "memory_count": len(data.get("memories") or []),
+            "trajectory_sample_count": len(trajectory)
+        })
+        
+        for action in data.get("actions") or []:
+            action_rows.append({"agent": agent_name, **_flatten_record(action, layout=layout["actions"])})
+        
+        for observation in data.get("observations") or []:
+            observation_rows.append({
+                "agent": agent_name,
+                "time": observation.get("time"),
+                **_flatten_record(observation.get("observation") or {}, layout=layout["observations"])
+            })
+        
+        for memory in data.get("memories") or []:
+            memory_rows.append({"agent": agent_name, "time": memory.get("time"), "description": memory.get("description")})
+        
+        if trajectory:
+            frame = pd.DataFrame.from_records(trajectory)
+            frame.insert(0, "agent", agent_name)
+            frame.insert(0, "source", "agent")
+            trajectory_frames.append(frame)
+    
+    # Shooter and human player trajectories share the trajectory table
+    for source, file_name in (("shooter", "shooter_traj.json"), ("human", "human_traj.json")):
+        file_path = find_json_file(os.path.join(simulation_dir, file_name))
+        samples = load_json_file(file_path) if file_path else None
+        if samples:
+            frame = pd.DataFrame.from_records(samples)
+            frame.insert(0, "agent", source)
+            frame.insert(0, "source", source)
+            trajectory_frames.append(frame)
+    
+    metadata_path = find_json_file(os.path.join(simulation_dir, "simulation_metadata.json"))
+    metadata = load_json_file(metadata_path) if metadata_path else None
+    
+    tables = {
+        "agents": _records_table(agent_rows, ["agent"]),
+        "actions": _records_table(action_rows, ["agent", "time"]),
+        "observations": _records_table(observation_rows, ["agent", "time"]),
+        "memories": _records_table(memory_rows, ["agent", "time", "description"]),
+        "trajectory": _normalize_object_columns(
+            pd.concat(trajectory_frames, ignore_index=True) if trajectory_frames
+            else pd.DataFrame(columns=["source", "agent", "time", "x", "y", "z"])
+        )
+    }
+    
+    return tables, metadata, layout
+
+
+def get_cache_dir(simulation_dir: str) -> str:
+    """Get the columnar cache folder of a simulation."""
+    return os.path.join(simulation_dir, COLUMNAR_CACHE_FOLDER)
+
+
+def is_cache_fresh(simulation_dir: str, cache_dir: Optional[str] = None) -> bool:
+    """
+    Check whether the columnar cache of a simulation matches its current source files.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        cache_dir: Cache folder (defaults to the simulation's ColumnarCache folder)
+        
+    Returns:
+        True if every table exists and no source file was added, removed or modified
+    """
+    cache_dir = cache_dir or get_cache_dir(simulation_dir)
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE_NAME)
+    if not os.path.isfile(manifest_path):
+        return False
+    
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    
+    if manifest.get("version") != COLUMNAR_CACHE_VERSION:
+        return False
+    if not all(os.path.isfile(os.path.join(cache_dir, f"{name}.parquet")) for name in TABLE_NAMES):
+        return False
+    
+    return manifest.get("sources") == _source_fingerprints(simulation_dir)
+
+
+def write_columnar_cache(simulation_dir: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Convert the JSON logs of a simulation into Parquet tables.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        cache_dir: Cache folder (defaults to the simulation's ColumnarCache folder)
+        
+    Returns:
+        Path to the cache folder
+        
+    Raises:
+        ImportError: If no Parquet engine (pyarrow or fastparquet) is installed
+    """
+    if PARQUET_ENGINE is None:
+        raise ImportError("Writing the columnar cache requires pyarrow (pip install pyarrow)")
+    
+    cache_dir = cache_dir or get_cache_dir(simulation_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    # Fingerprint the sources before reading them, so changes made during the conversion
+    # make the cache stale instead of going unnoticed
+    sources = _source_fingerprints(simulation_dir)
+    tables, metadata, layout = build_simulation_tables(simulation_dir)
+    
+    for name, df in tables.items():
+        df.to_parquet(os.path.join(cache_dir, f"{name}.parquet"), engine=PARQUET_ENGINE, index=False)
+    
+    manifest = {
+        "version": COLUMNAR_CACHE_VERSION,
+        "sources": sources,
+        "row_counts": {name: len(df) for name, df in tables.items()},
+        "metadata": metadata,
+        "layout": layout
+    }
+    with open(os.path.join(cache_dir, MANIFEST_FILE_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    return cache_dir
+
+
+class SimulationTables:
+    """Lazily loaded columnar tables of a simulation."""
+    
+    def __init__(self, simulation_dir: str, cache_dir: Optional[str] = None):
+        """
+        Initialize the tables of a simulation.
+        
+        Args:
+            simulation_dir: Path to the simulation folder
+            cache_dir: Fresh columnar cache folder to read from; tables are built from the
+                       JSON logs (on first access) if None
+        """
+        self.simulation_dir = simulation_dir
+        self.cache_dir = cache_dir
+        self._tables = {}
+        self._metadata = None
+        self._metadata_loaded = False
+        self._layout = None
+    
+    @property
+    def from_cache(self) -> bool:
+        """Whether the tables are read from the Parquet cache."""
+        return self.cache_dir is not None
+    
+    def _build_from_logs(self):
+        """Build every table from the JSON logs."""
+        self._tables, self._metadata, self._layout = build_simulation_tables(self.simulation_dir)
+        self._metadata_loaded = True
+    
+    def _read_manifest(self) -> Dict[str, Any]:
+        """Read the manifest of the Parquet cache."""
+        return load_json_file(os.path.join(self.cache_dir, MANIFEST_FILE_NAME)) or {}
+    
+    def table(self, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Get a table, loading it on first access.
+        
+        Args:
+            name: Table name (one of TABLE_NAMES)
+            columns: Optional subset of columns; with the Parquet cache only these are read
+            
+        Returns:
+            DataFrame with the table
+        """
+        if name not in TABLE_NAMES:
+            raise KeyError(f"Unknown table '{name}', expected one of {TABLE_NAMES}")
+        
+        if name not in self._tables:
+            if self.from_cache:
+                parquet_path = os.path.join(self.cache_dir, f"{name}.parquet")
+                if columns is not None:
+                    # Column subsets are read straight from the file and not kept
+                    return pd.read_parquet(parquet_path, engine=PARQUET_ENGINE, columns=columns)
+                self._tables[name] = pd.read_parquet(parquet_path, engine=PARQUET_ENGINE)
+            else:
+                self._build_from_logs()
+        
+        df = self._tables[name]
+        return df[columns] if columns is not None else df
+    
+    @property
+    def agents(self) -> pd.DataFrame:
+        return self.table("agents")
+    
+    @property
+    def actions(self) -> pd.DataFrame:
+        return self.table("actions")
+    
+    @property
+    def observations(self) -> pd.DataFrame:
+        return self.table("observations")
+    
+    @property
+    def memories(self) -> pd.DataFrame:
+        return self.table("memories")
+    
+    @property
+    def trajectory(self) -> pd.DataFrame:
+        return self.table("trajectory")
+    
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        """Content of simulation_metadata.json (None if missing)."""
+        if not self._metadata_loaded:
+            if self.from_cache:
+                self._metadata = self._read_manifest().get("metadata")
+            else:
+                metadata_path = find_json_file(os.path.join(self.simulation_dir, "simulation_metadata.json"))
+                self._metadata = load_json_file(metadata_path) if metadata_path else None
+            self._metadata_loaded = True
+        return self._metadata
+    
+    @property
+    def layout(self) -> Dict[str, Dict[str, Any]]:
+        """Key paths of the flattened columns of the agents, actions and observations tables."""
+        if self._layout is None:
+            if self.from_cache:
+                self._layout = self._read_manifest().get("layout") or {}
+            else:
+                self._build_from_logs()
+        return self._layout
+    
+    def agent_logs(self, fields: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Rebuild the agent logs (as in AgentLogs/*.json) from the tables.
+        
+        Only the tables holding the selected fields are read, so e.g. classification never
+        touches the trajectory table.
+        
+        Args:
+            fields: Optional top-level agent log fields to rebuild (all fields if None)
+            
+        Returns:
+            Dictionary mapping agent names to their log data
+        """
+        fields = list(AGENT_LOG_FIELD_TABLES) if fields is None else [f for f in fields if f in AGENT_LOG_FIELD_TABLES]
+        layout = self.layout
+        
+        agent_data = {}
+        for row in self.agents.to_dict("records"):
+            record = _unflatten_record(row, layout.get("agents", {}))
+            data = {}
+            for field in fields:
+                if field in ("persona", "traits"):
+                    data[field] = record.get(field)
+                elif field == "final_status":
+                    data[field] = None if pd.isna(row.get("final_status")) else row["final_status"]
+                else:
+                    data[field] = []
+            agent_data[row["agent"]] = data
+        
+        def grouped_rows(name: str):
+            df = self.table(name)
+            if df.empty:
+                return []
+            return ((agent, group.drop(columns="agent").to_dict("records"))
+                    for agent, group in df.groupby("agent", sort=False))
+        
+        if "actions" in fields:
+            actions_layout = layout.get("actions", {})
+            for agent, rows in grouped_rows("actions"):
+                agent_data[agent]["actions"] = [_unflatten_record(row, actions_layout) for row in rows]
+        
+        if "observations" in fields:
+            observations_layout = layout.get("observations", {})
+            for agent, rows in grouped_rows("observations"):
+                agent_data[agent]["observations"] = [
+                    {"time": row.get("time"), "observation": _unflatten_record(row, observations_layout)}
+                    for row in rows
+                ]
+        
+        if "memories" in fields:
+            for agent, rows in grouped_rows("memories"):
+                agent_data[agent]["memories"] = rows
+        
+        if "trajectory" in fields:
+            for agent, samples in self.trajectories(source="agent").items():
+                if agent in agent_data:
+                    agent_data[agent]["trajectory"] = samples
+        
+        return agent_data
+    
+    def trajectories(self, source: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the trajectory samples of every agent (and the shooter and human player).
+        
+        Args:
+            source: Optional source to restrict to ('agent', 'shooter' or 'human')
+            
+        Returns:
+            Dictionary mapping agent names ('shooter' and 'human' for the players) to their samples
+        """
+        df = self.trajectory
+        if source is not None:
+            df = df[df["source"] == source]
+        
+        trajectories = {}
+        for agent, group in df.groupby("agent", sort=False):
+            samples = group.drop(columns=["source", "agent"]).to_dict("records")
+            trajectories[agent] = [
+                {key: None if isinstance(value, float) and value != value else value for key, value in sample.items()}
+                for sample in samples
+            ]
+        return trajectories
+
+
+def open_simulation_tables(simulation_dir: str, use_cache: bool = True, build_cache: bool = True) -> SimulationTables:
+    """
+    Open the columnar tables of a simulation, using the Parquet cache when it is fresh.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        use_cache: Whether to read from (and maintain) the Parquet cache
+        build_cache: Whether to (re)build a missing or stale cache
+        
+    Returns:
+        SimulationTables reading from the cache, or building the tables from the JSON logs
+    """
+    if use_cache and PARQUET_ENGINE is not None:
+        cache_dir = get_cache_dir(simulation_dir)
+        if is_cache_fresh(simulation_dir, cache_dir):
+            return SimulationTables(simulation_dir, cache_dir)
+        
+        if build_cache:
+            try:
+                write_columnar_cache(simulation_dir, cache_dir)
+                return SimulationTables(simulation_dir, cache_dir)
+            except Exception as e:
+                print(f"Warning: Could not write columnar cache for {simulation_dir}: {e}")
+    
+    return SimulationTables(simulation_dir)
+
+
+def main():
+    """Convert simulation folders into columnar caches from the command line."""
+    parser = argparse.ArgumentParser(description='Convert simulation JSON logs into a columnar Parquet cache.')
+    parser.add_argument('folders', nargs='+',
+                        help='Simulation folders (containing AgentLogs) to convert')
+    parser.add_argument('--force', action='store_true', default=False,
+                        help='Rebuild the cache even if it is up to date')
+    args = parser.parse_args()
+    
+    if PARQUET_ENGINE is None:
+        print("Error: The columnar cache requires pyarrow (pip install pyarrow)")
+        return 1
+    
+    for folder in args.folders:
+        if not os.path.isdir(os.path.join(folder, "AgentLogs")):
+            print(f"Skipping {folder}: no AgentLogs folder")
+            continue
+        
+        if not args.force and is_cache_fresh(folder):
+            print(f"Cache of {folder} is up to date")
+            continue
+        
+        cache_dir = write_columnar_cache(folder)
+        print(f"Wrote columnar cache: {cache_dir}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
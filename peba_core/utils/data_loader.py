@@ -7,22 +7,193 @@ and agent behavior data from various file formats.
 """
 
 import os
+import gzip
 import json
 import re
-from typing import Dict, List, Optional, Tuple, Any
+import time
+import hashlib
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any, Callable
 from collections import defaultdict
 
 from ..config import (
     BASE_OPTIMIZATION_PATH, 
     BASE_SIMULATION_PATH, 
     DEFAULT_SIMULATION_FOLDER,
-    BEHAVIOR_CATEGORIES
+    BEHAVIOR_CATEGORIES,
+    DEFAULT_LOADER_WORKERS,
+    DEFAULT_RUN_LOADER_PROCESSES
 )
+from .agent_records import to_agent_log, json_default
+
+# Optional faster JSON decoders; the standard library is used when neither is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+JSON_DECODER_NAME = "orjson" if orjson else "msgspec" if msgspec else "json"
+
+# Optional zstd support for compressed logs; gzip is always available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Extensions of compressed JSON files, which every loader reads transparently
+COMPRESSED_JSON_EXTENSIONS = (".gz", ".zst")
+
+
+# Skips ahead to the next bracket that needs attention. Plain text, simple strings (no escapes or
+# brackets) and whole flat arrays/objects (e.g. trajectory samples) are consumed inside the regex
+# engine; any other string stops the match at its opening quote.
+_JSON_SIMPLE_RUN = r'[^"\[\]{}]*(?:"[^"\\\[\]{}]*"[^"\[\]{}]*)*'
+_JSON_SKIP_PATTERN = re.compile(
+    r'[^"\[\]{}]*(?:(?:"[^"\\\[\]{}]*"|[\[{]' + _JSON_SIMPLE_RUN + r'[\]}])[^"\[\]{}]*)*([\[\]{}"])'
+)
+_JSON_WHITESPACE_PATTERN = re.compile(r'[ \t\n\r]*')
+_JSON_DECODER = json.JSONDecoder()
+
+
+# Statistics of the most recent bulk load (see load_json_files)
+_last_load_stats: Dict[str, Any] = {}
+
+# Parsed iterations of load_optimization_run_data: analysis path -> ((size, mtime_ns), iteration data)
+_iteration_cache: Dict[str, Tuple[Optional[Tuple[int, int]], Optional[Dict[str, Any]]]] = {}
+
+
+def decode_json(content: bytes) -> Any:
+    """
+    Decode a JSON document with the fastest available decoder.
+    
+    Documents the fast decoders reject but the standard library accepts (e.g. NaN values
+    or very large integers) are decoded with the standard library.
+    
+    Args:
+        content: UTF-8 encoded JSON document
+        
+    Returns:
+        Decoded JSON value
+    """
+    if orjson:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    elif msgspec:
+        try:
+            return msgspec.json.decode(content)
+        except msgspec.DecodeError:
+            pass
+    
+    return json.loads(content.decode('utf-8'))
+
+
+def find_json_file(file_path: str) -> Optional[str]:
+    """
+    Find a JSON file, or its compressed variant (file.json.gz or file.json.zst) if it was compressed.
+    
+    Args:
+        file_path: Path to the uncompressed JSON file
+        
+    Returns:
+        Path of the existing file (the uncompressed one takes precedence), or None if there is none
+    """
+    if os.path.exists(file_path):
+        return file_path
+    
+    for extension in COMPRESSED_JSON_EXTENSIONS:
+        if os.path.exists(file_path + extension):
+            return file_path + extension
+    
+    return None
+
+
+def is_json_file(file_name: str) -> bool:
+    """Check whether a file name is a JSON file, compressed or not."""
+    return file_name.endswith('.json') or any(file_name.endswith('.json' + ext) for ext in COMPRESSED_JSON_EXTENSIONS)
+
+
+def strip_json_extension(file_name: str) -> str:
+    """Remove the .json (and compression) extension from a file name."""
+    for extension in COMPRESSED_JSON_EXTENSIONS:
+        if file_name.endswith(extension):
+            file_name = file_name[:-len(extension)]
+            break
+    return file_name[:-len('.json')] if file_name.endswith('.json') else file_name
+
+
+def list_json_files(folder: str) -> Dict[str, str]:
+    """
+    List the JSON files of a folder, compressed or not.
+    
+    Args:
+        folder: Folder to list
+        
+    Returns:
+        Dictionary mapping names without extension to file names, sorted by name. When a file
+        exists both compressed and uncompressed, the uncompressed one is listed.
+    """
+    files = {}
+    for file_name in sorted(os.listdir(folder)):
+        if not is_json_file(file_name):
+            continue
+        name = strip_json_extension(file_name)
+        if name not in files or file_name.endswith('.json'):
+            files[name] = file_name
+    return files
+
+
+def read_file_bytes(file_path: str) -> bytes:
+    """
+    Read a file, decompressing .gz and .zst files.
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        (Decompressed) file content
+        
+    Raises:
+        ImportError: If the file is zstd-compressed and zstandard is not installed
+    """
+    if file_path.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("Reading .zst files requires zstandard (pip install zstandard)")
+        with open(file_path, 'rb') as f:
+            return zstandard.ZstdDecompressor().stream_reader(f).read()
+    
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    return gzip.decompress(content) if file_path.endswith('.gz') else content
+
+
+def read_json_file(file_path: str) -> Any:
+    """
+    Read a JSON file, or its compressed variant if only that exists.
+    
+    Args:
+        file_path: Path to the JSON file
+        
+    Returns:
+        Decoded JSON value
+        
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not valid JSON
+    """
+    return decode_json(read_file_bytes(find_json_file(file_path) or file_path))
 
 
 def load_json_file(file_path: str) -> Optional[Dict[str, Any]]:
     """
-    Load a JSON file and return its contents.
+    Load a JSON file (plain, .json.gz or .json.zst) and return its contents.
     
     Args:
         file_path: Path to the JSON file
@@ -31,25 +202,268 @@ def load_json_file(file_path: str) -> Optional[Dict[str, Any]]:
         Dictionary containing the JSON data, or None if loading fails
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json_file(file_path)
     except Exception as e:
         print(f"Error loading JSON file {file_path}: {e}")
         return None
 
 
-def load_optimization_run_data(optimization_runs: List[str], base_path: str = BASE_OPTIMIZATION_PATH) -> Dict[str, Any]:
+def _skip_json_value(text: str, index: int) -> int:
+    """
+    Find the end of the JSON value starting at index without decoding it.
+    
+    Args:
+        text: JSON document
+        index: Position of the first character of the value
+        
+    Returns:
+        Position just past the value
+    """
+    if text[index] not in "[{":
+        # Scalars are short, so the regular decoder can find their end
+        return _JSON_DECODER.raw_decode(text, index)[1]
+    
+    # Fast path for the common case of an array of flat objects (or an object without nested
+    # objects): without escapes and nested openers of the same kind, the first closer that is
+    # outside a string ends the value, which str.find/str.count can check without a Python loop
+    opener = text[index]
+    end = text.find("]" if opener == "[" else "}", index)
+    if (end != -1 and text.count(opener, index, end) == 1 and text.find("\\", index, end) == -1
+            and text.count('"', index, end) % 2 == 0):
+        return end + 1
+    
+    depth = 0
+    while True:
+        match = _JSON_SKIP_PATTERN.match(text, index)
+        if not match:
+            raise ValueError(f"Unterminated JSON value at position {index}")
+        
+        token = match.group(1)
+        index = match.end()
+        if token == '"':
+            # A string that may contain escapes or brackets
+            index = json.decoder.scanstring(text, index)[1]
+        elif token in "[{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return index
+
+
+def parse_json_fields(text: str, fields: List[str]) -> Dict[str, Any]:
+    """
+    Decode only the selected top-level fields of a JSON object.
+    
+    The document is scanned incrementally: selected values are decoded, all other values
+    (e.g. large trajectory arrays) are skipped without building Python objects, and scanning
+    stops as soon as every selected field has been found.
+    
+    Args:
+        text: JSON document whose root is an object
+        fields: Names of the top-level fields to decode
+        
+    Returns:
+        Dictionary with the selected fields that are present in the document
+        
+    Raises:
+        ValueError: If the document is not a well-formed JSON object
+    """
+    wanted = set(fields)
+    result = {}
+    
+    index = _JSON_WHITESPACE_PATTERN.match(text, 0).end()
+    if text[index:index + 1] != "{":
+        raise ValueError("JSON document is not an object")
+    index = _JSON_WHITESPACE_PATTERN.match(text, index + 1).end()
+    if text[index:index + 1] == "}":
+        return result
+    
+    while True:
+        key, index = _JSON_DECODER.raw_decode(text, index)
+        index = _JSON_WHITESPACE_PATTERN.match(text, index).end()
+        if text[index:index + 1] != ":":
+            raise ValueError(f"Expected ':' at position {index}")
+        index = _JSON_WHITESPACE_PATTERN.match(text, index + 1).end()
+        
+        if key in wanted:
+            result[key], index = _JSON_DECODER.raw_decode(text, index)
+            if len(result) == len(wanted):
+                return result
+        else:
+            index = _skip_json_value(text, index)
+        
+        index = _JSON_WHITESPACE_PATTERN.match(text, index).end()
+        separator = text[index:index + 1]
+        if separator == "}":
+            return result
+        if separator != ",":
+            raise ValueError(f"Expected ',' or '}}' at position {index}")
+        index = _JSON_WHITESPACE_PATTERN.match(text, index + 1).end()
+
+
+def load_json_fields(file_path: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Load only the selected top-level fields of a JSON file.
+    
+    Args:
+        file_path: Path to the JSON file
+        fields: Names of the top-level fields to load
+        
+    Returns:
+        Dictionary with the selected fields, or None if loading fails
+    """
+    try:
+        content = read_file_bytes(find_json_file(file_path) or file_path)
+        return parse_json_fields(content.decode('utf-8'), fields)
+    except Exception as e:
+        print(f"Error loading JSON file {file_path}: {e}")
+        return None
+
+
+def load_json_files(file_paths: List[str], fields: Optional[List[str]] = None, 
+                    max_workers: int = DEFAULT_LOADER_WORKERS,
+                    converter: Optional[Callable[[Any], Any]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Load many JSON files concurrently.
+    
+    Files are read and decoded by a thread pool, which hides the latency of shared or network
+    storage. Throughput statistics of the load are available from get_last_load_stats().
+    
+    Args:
+        file_paths: Paths to the JSON files
+        fields: Optional top-level fields to load (all fields if None)
+        max_workers: Maximum number of files read at once
+        converter: Optional function applied to each decoded file (e.g. to_agent_log), so the
+                   decoded dictionaries of a file can be freed as soon as it is converted
+        
+    Returns:
+        Dictionary mapping each path to its data (None if loading failed), in input order
+    """
+    global _last_load_stats
+    
+    def load(file_path):
+        data = load_json_fields(file_path, fields) if fields else load_json_file(file_path)
+        if converter is not None and data is not None:
+            data = converter(data)
+        try:
+            size = os.path.getsize(find_json_file(file_path) or file_path)
+        except OSError:
+            size = 0
+        return data, size
+    
+    start_time = time.perf_counter()
+    if len(file_paths) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+            loaded = list(executor.map(load, file_paths))
+    else:
+        loaded = [load(file_path) for file_path in file_paths]
+    elapsed = time.perf_counter() - start_time
+    
+    total_bytes = sum(size for _, size in loaded)
+    _last_load_stats = {
+        "files": len(file_paths),
+        "bytes": total_bytes,
+        "seconds": elapsed,
+        "files_per_second": len(file_paths) / elapsed if elapsed > 0 else 0.0,
+        "bytes_per_second": total_bytes / elapsed if elapsed > 0 else 0.0,
+        "decoder": JSON_DECODER_NAME,
+        "workers": min(max_workers, len(file_paths))
+    }
+    
+    return {file_path: data for file_path, (data, _) in zip(file_paths, loaded)}
+
+
+def get_last_load_stats() -> Dict[str, Any]:
+    """
+    Get throughput statistics of the most recent load_json_files call.
+    
+    Returns:
+        Dictionary with files, bytes, seconds, files_per_second, bytes_per_second, decoder and workers
+    """
+    return dict(_last_load_stats)
+
+
+def print_load_stats(label: str):
+    """Print the throughput of the most recent bulk load."""
+    stats = _last_load_stats
+    if not stats or not stats["files"]:
+        return
+    
+    print(f"Loaded {stats['files']} {label} ({stats['bytes'] / (1024 * 1024):.1f} MB) in {stats['seconds']:.2f}s: "
+          f"{stats['files_per_second']:.0f} files/s, {stats['bytes_per_second'] / (1024 * 1024):.1f} MB/s "
+          f"({stats['decoder']}, {stats['workers']} threads)")
+
+
+def _file_state(file_path: str) -> Optional[Tuple[int, int]]:
+    """Get the (size, mtime_ns) of a file, or None if it cannot be read."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _extract_iteration_data(analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the metrics, behavior distribution and agent behaviors of an iteration's analysis.
+    
+    Args:
+        analysis_data: Content of a behavior_analysis.json file
+        
+    Returns:
+        Dictionary with metrics, behavior_distribution, total_agents and agent_behaviors
+    """
+    # Extract metrics
+    metrics = analysis_data.get("statistics", {}).get("distribution_metrics", {})
+    
+    # Extract behavior distribution
+    behavior_counts = analysis_data.get("statistics", {}).get("behavior", {})
+    total_agents = analysis_data.get("statistics", {}).get("total_agents", 0)
+    
+    # Calculate behavior distribution
+    behavior_dist = {}
+    for category in BEHAVIOR_CATEGORIES:
+        behavior_dist[category] = behavior_counts.get(category, 0) / total_agents if total_agents > 0 else 0
+    
+    # Store individual agent behaviors
+    agent_behaviors = {}
+    for agent_name, agent_data in analysis_data.get("agents", {}).items():
+        if "behavior" in agent_data and "classification" in agent_data["behavior"]:
+            agent_behaviors[agent_name] = agent_data["behavior"]["classification"]
+    
+    return {
+        "metrics": metrics,
+        "behavior_distribution": behavior_dist,
+        "total_agents": total_agents,
+        "agent_behaviors": agent_behaviors
+    }
+
+
+def clear_iteration_cache():
+    """Forget the parsed iterations kept by load_optimization_run_data."""
+    _iteration_cache.clear()
+
+
+def load_optimization_run_data(optimization_runs: List[str], base_path: str = BASE_OPTIMIZATION_PATH,
+                               use_cache: bool = True) -> Dict[str, Any]:
     """
     Load data from multiple optimization runs.
     
+    Parsed iterations are kept in memory keyed on the size and modification time of their
+    behavior_analysis.json, so repeated calls (e.g. while monitoring a running optimization)
+    only read iterations that are new or were re-analyzed.
+    
     Args:
         optimization_runs: List of optimization run folder names
         base_path: Base path where optimization runs are stored
+        use_cache: Whether to reuse iterations parsed by earlier calls
         
     Returns:
         Dictionary containing all optimization run data
     """
     all_data = {}
+    run_iterations = {}
     
     for run_name in optimization_runs:
         run_path = os.path.join(base_path, run_name)
@@ -70,49 +484,49 @@ def load_optimization_run_data(optimization_runs: List[str], base_path: str = BA
         # Sort iteration folders numerically
         iteration_folders.sort(key=lambda x: int(x.split("_")[1]))
         
-        run_data = {"iterations": {}}
-        
-        # Load data from each iteration
+        run_iterations[run_name] = []
         for iteration_folder in iteration_folders:
-            iteration_path = os.path.join(run_path, iteration_folder)
-            analysis_path = os.path.join(iteration_path, "behavior_analysis.json")
+            analysis_file = os.path.join(run_path, iteration_folder, "behavior_analysis.json")
+            analysis_path = find_json_file(analysis_file)
             
-            if not os.path.exists(analysis_path):
-                print(f"Warning: Behavior analysis file not found: {analysis_path}")
+            if not analysis_path:
+                print(f"Warning: Behavior analysis file not found: {analysis_file}")
                 continue
             
-            analysis_data = load_json_file(analysis_path)
-            if not analysis_data:
+            run_iterations[run_name].append((iteration_folder, analysis_path))
+    
+    # Only analyses that are new or changed since they were last parsed are read
+    file_states = {}
+    pending_paths = []
+    for iterations in run_iterations.values():
+        for _, analysis_path in iterations:
+            file_states[analysis_path] = _file_state(analysis_path)
+            cached = _iteration_cache.get(analysis_path)
+            if not use_cache or cached is None or cached[0] != file_states[analysis_path]:
+                pending_paths.append(analysis_path)
+    
+    # Read the analysis files of all runs concurrently
+    analyses = load_json_files(pending_paths)
+    print_load_stats("behavior analysis files")
+    
+    for analysis_path, analysis_data in analyses.items():
+        iteration_data = _extract_iteration_data(analysis_data) if analysis_data else None
+        _iteration_cache[analysis_path] = (file_states[analysis_path], iteration_data)
+    
+    for run_name, iterations in run_iterations.items():
+        run_data = {"iterations": {}}
+        
+        # Load data from each iteration
+        for iteration_folder, analysis_path in iterations:
+            iteration_data = _iteration_cache[analysis_path][1]
+            if not iteration_data:
                 continue
             
             # Extract iteration number
             iteration_num = int(iteration_folder.split("_")[1])
             
-            # Extract metrics
-            metrics = analysis_data.get("statistics", {}).get("distribution_metrics", {})
-            
-            # Extract behavior distribution
-            behavior_counts = analysis_data.get("statistics", {}).get("behavior", {})
-            total_agents = analysis_data.get("statistics", {}).get("total_agents", 0)
-            
-            # Calculate behavior distribution
-            behavior_dist = {}
-            for category in BEHAVIOR_CATEGORIES:
-                behavior_dist[category] = behavior_counts.get(category, 0) / total_agents if total_agents > 0 else 0
-            
-            # Store individual agent behaviors
-            agent_behaviors = {}
-            for agent_name, agent_data in analysis_data.get("agents", {}).items():
-                if "behavior" in agent_data and "classification" in agent_data["behavior"]:
-                    agent_behaviors[agent_name] = agent_data["behavior"]["classification"]
-            
             # Store data for this iteration
-            run_data["iterations"][iteration_num] = {
-                "metrics": metrics,
-                "behavior_distribution": behavior_dist,
-                "total_agents": total_agents,
-                "agent_behaviors": agent_behaviors
-            }
+            run_data["iterations"][iteration_num] = iteration_data
         
         # Store data for this run
         all_data[run_name] = run_data
@@ -120,12 +534,98 @@ def load_optimization_run_data(optimization_runs: List[str], base_path: str = BA
     return all_data
 
 
-def load_agent_data(agent_logs_folder: str) -> Dict[str, Any]:
+def _load_run_worker(task: Tuple[str, str, bool]) -> Tuple[str, Any, int, float]:
+    """Load one optimization run (or only its running statistics) in a worker process and time it."""
+    run_name, base_path, statistics_only = task
+    start_time = time.perf_counter()
+    run_data = load_optimization_run_data([run_name], base_path, use_cache=False).get(run_name)
+    if run_data is None:
+        return run_name, None, 0, time.perf_counter() - start_time
+    
+    result = run_data
+    if statistics_only:
+        # Imported here so that loading data alone does not pull in scipy through metrics
+        from .metrics import accumulate_run_statistics
+        result = accumulate_run_statistics(run_data)
+    return run_name, result, len(run_data["iterations"]), time.perf_counter() - start_time
+
+
+def _load_runs_in_processes(optimization_runs: List[str], base_path: str, max_workers: int,
+                            statistics_only: bool) -> Dict[str, Any]:
+    """Run _load_run_worker over the runs in a process pool, printing per-run load times."""
+    tasks = [(run_name, base_path, statistics_only) for run_name in optimization_runs]
+    start_time = time.perf_counter()
+    
+    max_workers = max(1, min(max_workers, len(tasks)))
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_load_run_worker, tasks))
+    else:
+        results = [_load_run_worker(task) for task in tasks]
+    
+    all_data = {}
+    for run_name, result, iteration_count, elapsed in results:
+        if result is None:
+            continue
+        all_data[run_name] = result
+        print(f"  Loaded {run_name}: {iteration_count} iterations in {elapsed:.2f}s")
+    
+    print(f"Loaded {len(all_data)} runs in {time.perf_counter() - start_time:.2f}s "
+          f"({max_workers} processes)")
+    return all_data
+
+
+def load_optimization_runs_parallel(optimization_runs: List[str], base_path: str = BASE_OPTIMIZATION_PATH,
+                                    max_workers: int = DEFAULT_RUN_LOADER_PROCESSES) -> Dict[str, Any]:
+    """
+    Load optimization runs in parallel worker processes.
+    
+    Each run is loaded by load_optimization_run_data in its own process and the results are
+    merged into the same structure, in the order of optimization_runs. The load time of every
+    run is printed.
+    
+    Args:
+        optimization_runs: List of optimization run folder names
+        base_path: Base path where optimization runs are stored
+        max_workers: Maximum number of worker processes (runs are loaded in this process if 1)
+        
+    Returns:
+        Dictionary containing all optimization run data
+    """
+    return _load_runs_in_processes(optimization_runs, base_path, max_workers, statistics_only=False)
+
+
+def load_run_statistics_parallel(optimization_runs: List[str], base_path: str = BASE_OPTIMIZATION_PATH,
+                                 max_workers: int = DEFAULT_RUN_LOADER_PROCESSES) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Load the running statistics of optimization runs in parallel worker processes.
+    
+    Each worker loads a run and reduces it to accumulators of its metrics and behavior
+    distributions by iteration, so only constant-size statistics are sent back. Merge the
+    accumulators of several runs with StatisticsAccumulator.merge.
+    
+    Args:
+        optimization_runs: List of optimization run folder names
+        base_path: Base path where optimization runs are stored
+        max_workers: Maximum number of worker processes (runs are loaded in this process if 1)
+        
+    Returns:
+        Dictionary mapping run names to (metrics_accumulator, behavior_accumulator)
+    """
+    return _load_runs_in_processes(optimization_runs, base_path, max_workers, statistics_only=True)
+
+
+def load_agent_data(agent_logs_folder: str, fields: Optional[List[str]] = None,
+                    records: bool = False) -> Dict[str, Any]:
     """
     Load agent data from JSON files in the agent logs folder.
     
     Args:
         agent_logs_folder: Path to the folder containing agent JSON files
+        fields: Optional top-level fields to load (e.g. AGENT_LOG_CLASSIFICATION_FIELDS);
+                all other fields are skipped while parsing. Loads everything if None.
+        records: If True, return compact AgentLog records (dictionary-compatible) instead of
+                 nested dictionaries
         
     Returns:
         Dictionary mapping agent names to their data
@@ -136,13 +636,14 @@ def load_agent_data(agent_logs_folder: str) -> Dict[str, Any]:
         print(f"Agent logs folder not found: {agent_logs_folder}")
         return agent_data
     
-    agent_files = [f for f in os.listdir(agent_logs_folder) if f.endswith('.json')]
+    agent_files = list_json_files(agent_logs_folder)
     
-    for agent_file in agent_files:
-        agent_name = agent_file.replace('.json', '')
-        file_path = os.path.join(agent_logs_folder, agent_file)
-        
-        data = load_json_file(file_path)
+    # Read the agent files concurrently
+    loaded = load_json_files([os.path.join(agent_logs_folder, f) for f in agent_files.values()], fields,
+                             converter=to_agent_log if records else None)
+    print_load_stats("agent files")
+    
+    for agent_name, data in zip(agent_files, loaded.values()):
         if data:
             agent_data[agent_name] = data
     
@@ -163,15 +664,24 @@ def load_personas_data(personas_path: str) -> Optional[Dict[str, Any]]:
 
 
 def load_simulation_data(simulation_folder: str, base_path: str = BASE_SIMULATION_PATH, 
-                        folder_name: str = DEFAULT_SIMULATION_FOLDER, direct_path: bool = False) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+                        folder_name: str = DEFAULT_SIMULATION_FOLDER, direct_path: bool = False,
+                        fields: Optional[List[str]] = None,
+                        records: bool = False,
+                        use_columnar_cache: bool = True) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
     """
     Load simulation data including agent logs.
     
+    When the simulation has an up-to-date columnar cache (see load_simulation_tables), the agent
+    logs are rebuilt from its Parquet tables instead of re-parsing AgentLogs/*.json.
+    
     Args:
         simulation_folder: Name of the simulation folder
         base_path: Base path where simulations are stored
         folder_name: Simulation folder name within base path
         direct_path: If True, treat simulation_folder as direct path
+        fields: Optional top-level agent log fields to load (all fields if None)
+        records: If True, return the agent logs as compact AgentLog records
+        use_columnar_cache: Whether to read the agent logs from a fresh columnar cache
         
     Returns:
         Tuple of (agent_logs_folder_path, agent_data_dict)
@@ -184,10 +694,119 @@ def load_simulation_data(simulation_folder: str, base_path: str = BASE_SIMULATIO
     if not os.path.exists(agent_logs_folder):
         return None, None
     
-    agent_data = load_agent_data(agent_logs_folder)
+    if use_columnar_cache:
+        # The cache is only read here, never built: building it costs a full parse of the logs
+        from .columnar_cache import open_simulation_tables
+        
+        tables = open_simulation_tables(os.path.dirname(agent_logs_folder), build_cache=False)
+        if tables.from_cache:
+            try:
+                agent_data = tables.agent_logs(fields)
+                if records:
+                    agent_data = {name: to_agent_log(data) for name, data in agent_data.items()}
+                return agent_logs_folder, agent_data
+            except Exception as e:
+                print(f"Warning: Could not read columnar cache of {agent_logs_folder}, loading JSON logs: {e}")
+    
+    agent_data = load_agent_data(agent_logs_folder, fields, records)
     return agent_logs_folder, agent_data
 
 
+def load_simulation_tables(simulation_folder: str, base_path: str = BASE_SIMULATION_PATH,
+                           folder_name: str = DEFAULT_SIMULATION_FOLDER, direct_path: bool = False,
+                           use_cache: bool = True):
+    """
+    Load the columnar tables (agents, actions, observations, memories, trajectory) of a simulation.
+    
+    Tables are read lazily from the Parquet cache inside the simulation folder when it is up to
+    date with the JSON logs; otherwise the cache is rebuilt (or, without pyarrow, the tables are
+    built in memory from the logs).
+    
+    Args:
+        simulation_folder: Name of the simulation folder
+        base_path: Base path where simulations are stored
+        folder_name: Simulation folder name within base path
+        direct_path: If True, treat simulation_folder as direct path
+        use_cache: Whether to read from and maintain the Parquet cache
+        
+    Returns:
+        SimulationTables for the simulation, or None if it has no AgentLogs folder
+    """
+    # Imported here because columnar_cache builds on the loaders of this module
+    from .columnar_cache import open_simulation_tables
+    
+    simulation_dir = simulation_folder if direct_path else os.path.join(base_path, folder_name, simulation_folder)
+    if not os.path.exists(os.path.join(simulation_dir, "AgentLogs")):
+        return None
+    
+    return open_simulation_tables(simulation_dir, use_cache=use_cache)
+
+
+def load_trajectory_store(simulation_folder: str, base_path: str = BASE_SIMULATION_PATH,
+                          folder_name: str = DEFAULT_SIMULATION_FOLDER, direct_path: bool = False):
+    """
+    Open the memory-mapped trajectories of a simulation, packing them on first use.
+    
+    Args:
+        simulation_folder: Name of the simulation folder
+        base_path: Base path where simulations are stored
+        folder_name: Simulation folder name within base path
+        direct_path: If True, treat simulation_folder as direct path
+        
+    Returns:
+        TrajectoryStore for the simulation, or None if it has no AgentLogs folder
+    """
+    # Imported here because trajectory_store builds on the loaders of this module
+    from .trajectory_store import open_trajectory_store
+    
+    simulation_dir = simulation_folder if direct_path else os.path.join(base_path, folder_name, simulation_folder)
+    if not os.path.exists(os.path.join(simulation_dir, "AgentLogs")):
+        return None
+    
+    return open_trajectory_store(simulation_dir)
+
+
+# Fields of the Unity token usage summary (OpenAIUtils.GetTokenUsageInfo), matched in one pass
+_TOKEN_USAGE_FIELDS = {
+    "Model": ("model", str),
+    "Prompt tokens": ("prompt_tokens", lambda value: int(value.replace(",", ""))),
+    "Cached tokens": ("cached_tokens", lambda value: int(value.replace(",", ""))),
+    "Completion tokens": ("completion_tokens", lambda value: int(value.replace(",", ""))),
+    "Total requests": ("total_requests", int),
+    "Total cost": ("total_cost", float)
+}
+_TOKEN_USAGE_PATTERN = re.compile(
+    r"(Model|Prompt tokens|Cached tokens|Completion tokens|Total requests|Total cost): "
+    r"(?:\$([\d.]+)|([\w.,/-]+))"
+)
+
+
+def parse_token_usage_text(content: str) -> Dict[str, Any]:
+    """
+    Parse the text of a Unity token usage summary.
+    
+    Args:
+        content: Text containing the lines written by OpenAIUtils.GetTokenUsageInfo
+        
+    Returns:
+        Dictionary with the fields found (model, prompt_tokens, cached_tokens, completion_tokens,
+        total_requests, total_cost); the first occurrence of each field wins
+    """
+    usage_info = {}
+    for match in _TOKEN_USAGE_PATTERN.finditer(content):
+        key, convert = _TOKEN_USAGE_FIELDS[match.group(1)]
+        if key in usage_info:
+            continue
+        
+        value = match.group(2) if match.group(2) is not None else match.group(3)
+        try:
+            usage_info[key] = convert(value)
+        except ValueError:
+            continue
+    
+    return usage_info
+
+
 def parse_token_usage_log(log_path: str) -> Optional[Dict[str, Any]]:
     """
     Parse Unity token usage log file.
@@ -205,33 +824,7 @@ def parse_token_usage_log(log_path: str) -> Optional[Dict[str, Any]]:
         with open(log_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        usage_info = {}
-        
-        # Extract model information
-        model_match = re.search(r"Model: ([\w\.-]+)", content)
-        if model_match:
-            usage_info["model"] = model_match.group(1)
-        
-        # Extract prompt tokens
-        prompt_match = re.search(r"Prompt tokens: ([\d,]+)", content)
-        if prompt_match:
-            usage_info["prompt_tokens"] = int(prompt_match.group(1).replace(",", ""))
-        
-        # Extract completion tokens
-        completion_match = re.search(r"Completion tokens: ([\d,]+)", content)
-        if completion_match:
-            usage_info["completion_tokens"] = int(completion_match.group(1).replace(",", ""))
-        
-        # Extract total requests
-        requests_match = re.search(r"Total requests: (\d+)", content)
-        if requests_match:
-            usage_info["total_requests"] = int(requests_match.group(1))
-        
-        # Extract total cost
-        cost_match = re.search(r"Total cost: \$([\d.]+)", content)
-        if cost_match:
-            usage_info["total_cost"] = float(cost_match.group(1))
-        
+        usage_info = parse_token_usage_text(content)
         return usage_info if usage_info else None
         
     except Exception as e:
@@ -270,6 +863,9 @@ def get_agent_context(agent_data: Dict[str, Any]) -> Dict[str, str]:
         mood = observation_data.get('mood', 'unknown')
         moods[time] = mood
     
+    # Sorted observation times let each action find its latest mood with a binary search
+    mood_times = sorted(moods)
+    
     # Process actions to get plans and dialog
     timeline = []
     for action in sorted(actions, key=lambda x: x.get('time', 0)):
@@ -277,7 +873,10 @@ def get_agent_context(agent_data: Dict[str, Any]) -> Dict[str, str]:
         action_type = action.get('action_type', '')
         plan = action.get('plan', '')
         dialog = action.get('dialog_text', '')
-        mood = moods.get(time, moods.get(max(t for t in moods if t <= time), 'unknown'))
+        
+        # Mood of the latest observation at or before the action ('unknown' if there is none)
+        mood_index = bisect_right(mood_times, time) - 1
+        mood = moods[mood_times[mood_index]] if mood_index >= 0 else 'unknown'
         
         timeline.append({
             'time': time,
@@ -306,6 +905,29 @@ def get_agent_context(agent_data: Dict[str, Any]) -> Dict[str, str]:
     }
 
 
+def compute_agent_input_hash(agent_data: Dict[str, Any]) -> str:
+    """
+    Compute a content hash of the agent data that classification depends on.
+    
+    Only memories, actions and observations are hashed, so unrelated fields such as the
+    trajectory do not invalidate a previous classification.
+    
+    Args:
+        agent_data: Dictionary containing agent data
+        
+    Returns:
+        Hex digest identifying the classification inputs
+    """
+    classification_inputs = {
+        "memories": agent_data.get("memories", []),
+        "actions": agent_data.get("actions", []),
+        "observations": agent_data.get("observations", [])
+    }
+    # Records serialize to the JSON objects they were decoded from, so both forms hash alike
+    serialized = json.dumps(classification_inputs, sort_keys=True, ensure_ascii=False, default=json_default)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
 def find_simulation_folders(batch_folder_path: str) -> List[str]:
     """
     Find all simulation folders in a batch directory.
@@ -0,0 +1,527 @@
+#!/usr/bin/env python
+"""
+Experiment store for PEBA-PEvo framework.
+
+This module indexes optimization runs into a local SQLite database (runs, iterations,
+per-iteration metrics and behavior counts, per-agent classifications, persona adjustments
+and token usage), so cross-run queries do not have to re-read every behavior_analysis.json,
+optimization_log.json and simulation_metadata.json. Runs are ingested incrementally: an
+iteration is only re-read when one of its files was added, removed or modified.
+
+Usage:
+    python -m peba_core.utils.experiment_store ingest [--runs RUN [RUN ...]]
+    python -m peba_core.utils.experiment_store query --metric kl_divergence --model gpt-4o-mini
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..config import (
+    BASE_OPTIMIZATION_PATH,
+    BEHAVIOR_CATEGORIES,
+    EXPERIMENT_STORE_PATH
+)
+from .data_loader import load_json_files, find_json_file
+
+
+# Files of an iteration folder that feed the store
+ITERATION_SOURCE_FILES = ["behavior_analysis.json", "optimization_log.json", "simulation_metadata.json"]
+
+# Child tables keyed by (run_name, iteration)
+ITERATION_TABLES = ["iteration_metrics", "behavior_counts", "agent_classifications", "adjustments", "token_usage"]
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_name TEXT PRIMARY KEY,
+        base_path TEXT NOT NULL,
+        model TEXT,
+        iteration_count INTEGER NOT NULL,
+        ingested_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS iterations (
+        run_name TEXT NOT NULL,
+        iteration INTEGER NOT NULL,
+        simulation_id TEXT,
+        model TEXT,
+        total_agents INTEGER,
+        source_state TEXT NOT NULL,
+        ingested_at REAL NOT NULL,
+        PRIMARY KEY (run_name, iteration)
+    );
+    CREATE TABLE IF NOT EXISTS iteration_metrics (
+        run_name TEXT NOT NULL,
+        iteration INTEGER NOT NULL,
+        metric TEXT NOT NULL,
+        value REAL,
+        PRIMARY KEY (run_name, iteration, metric)
+    );
+    CREATE TABLE IF NOT EXISTS behavior_counts (
+        run_name TEXT NOT NULL,
+        iteration INTEGER NOT NULL,
+        behavior TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        fraction REAL NOT NULL,
+        PRIMARY KEY (run_name, iteration, behavior)
+    );
+    CREATE TABLE IF NOT EXISTS agent_classifications (
+        run_name TEXT NOT NULL,
+        iteration INTEGER NOT NULL,
+        agent_name TEXT NOT NULL,
+        classification TEXT,
+        ranking TEXT,
+        reused INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (run_name, iteration, agent_name)
+    );
+    CREATE TABLE IF NOT EXISTS adjustments (
+        run_name TEXT NOT NULL,
+        iteration INTEGER NOT NULL,
+        agent_name TEXT NOT NULL,
+        from_behavior TEXT,
+        to_behavior TEXT,
+        prompt_tokens INTEGER,
+        cached_tokens INTEGER,
+        completion_tokens INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS token_usage (
+        run_name TEXT NOT NULL,
+        iteration INTEGER NOT NULL,
+        stage TEXT NOT NULL,
+        model TEXT,
+        prompt_tokens INTEGER NOT NULL,
+        cached_tokens INTEGER NOT NULL,
+        completion_tokens INTEGER NOT NULL,
+        total_requests INTEGER,
+        cost_usd REAL,
+        PRIMARY KEY (run_name, iteration, stage)
+    );
+    CREATE INDEX IF NOT EXISTS idx_iteration_metrics_metric ON iteration_metrics (metric, run_name, iteration);
+    CREATE INDEX IF NOT EXISTS idx_agent_classifications_agent ON agent_classifications (run_name, agent_name);
+    CREATE INDEX IF NOT EXISTS idx_adjustments_iteration ON adjustments (run_name, iteration);
+    CREATE INDEX IF NOT EXISTS idx_runs_model ON runs (model);
+"""
+
+
+def _iteration_source_state(iteration_path: str) -> str:
+    """
+    Describe the source files of an iteration by size and modification time.
+    
+    Args:
+        iteration_path: Path to the iteration folder
+        
+    Returns:
+        JSON text that changes whenever a source file is added, removed or modified
+    """
+    state = {}
+    for file_name in ITERATION_SOURCE_FILES:
+        file_path = find_json_file(os.path.join(iteration_path, file_name))
+        if file_path:
+            stat = os.stat(file_path)
+            state[os.path.basename(file_path)] = [stat.st_size, stat.st_mtime_ns]
+    return json.dumps(state, sort_keys=True)
+
+
+def _find_iteration_folders(run_path: str) -> Dict[int, str]:
+    """Map iteration numbers to the Iteration_N folders of a run."""
+    iterations = {}
+    for folder in os.listdir(run_path):
+        if folder.startswith("Iteration_") and os.path.isdir(os.path.join(run_path, folder)):
+            try:
+                iterations[int(folder.split("_")[1])] = os.path.join(run_path, folder)
+            except ValueError:
+                continue
+    return iterations
+
+
+def _flatten_metrics(statistics: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Collect the numeric distribution metrics of an analysis.
+    
+    Top-k metrics are stored as 'top{k}_{metric}' next to the plain distribution metrics.
+    
+    Args:
+        statistics: 'statistics' section of a behavior analysis
+        
+    Returns:
+        Dictionary mapping metric names to values
+    """
+    metrics = {
+        name: float(value) for name, value in (statistics.get("distribution_metrics") or {}).items()
+        if isinstance(value, (int, float))
+    }
+    for k, topk_metrics in (statistics.get("topk_metrics") or {}).items():
+        for name, value in (topk_metrics or {}).items():
+            if isinstance(value, (int, float)):
+                metrics[f"top{k}_{name}"] = float(value)
+    return metrics
+
+
+def _usage_row(token_usage: Dict[str, Any]) -> Tuple[int, int, int]:
+    """Get (prompt_tokens, cached_tokens, completion_tokens) of a token usage record."""
+    return (
+        token_usage.get("prompt_tokens", 0) or 0,
+        token_usage.get("cached_tokens", 0) or 0,
+        token_usage.get("completion_tokens", 0) or 0
+    )
+
+
+class ExperimentStore:
+    """SQLite index of optimization runs, ingested incrementally from the run folders."""
+    
+    def __init__(self, db_path: str = EXPERIMENT_STORE_PATH):
+        """
+        Open (or create) the experiment store.
+        
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+    
+    def ingest_run(self, run_name: str, base_path: str = BASE_OPTIMIZATION_PATH) -> int:
+        """
+        Bring the store up to date with an optimization run folder.
+        
+        Args:
+            run_name: Name of the optimization run folder
+            base_path: Base path where optimization runs are stored
+            
+        Returns:
+            Number of iterations that were (re)ingested
+        """
+        run_path = os.path.join(base_path, run_name)
+        if not os.path.isdir(run_path):
+            print(f"Warning: Optimization run path not found: {run_path}")
+            return 0
+        
+        iteration_paths = _find_iteration_folders(run_path)
+        with self._lock:
+            known_states = dict(self._conn.execute(
+                "SELECT iteration, source_state FROM iterations WHERE run_name = ?", (run_name,)
+            ).fetchall())
+        
+        # Only iterations whose files changed since the last ingestion are read again
+        states = {iteration: _iteration_source_state(path) for iteration, path in iteration_paths.items()}
+        changed = sorted(iteration for iteration, state in states.items() if known_states.get(iteration) != state)
+        removed = [iteration for iteration in known_states if iteration not in iteration_paths]
+        
+        documents = load_json_files([
+            os.path.join(iteration_paths[iteration], file_name)
+            for iteration in changed for file_name in ITERATION_SOURCE_FILES
+            if find_json_file(os.path.join(iteration_paths[iteration], file_name))
+        ])
+        
+        with self._lock:
+            for iteration in removed + changed:
+                self._delete_iteration(run_name, iteration)
+            
+            for iteration in changed:
+                iteration_path = iteration_paths[iteration]
+                self._insert_iteration(
+                    run_name, iteration, states[iteration],
+                    *(documents.get(os.path.join(iteration_path, file_name)) for file_name in ITERATION_SOURCE_FILES)
+                )
+            
+            # The run's model is the model that drove its simulations
+            model = self._conn.execute(
+                "SELECT model FROM iterations WHERE run_name = ? AND model IS NOT NULL ORDER BY iteration LIMIT 1",
+                (run_name,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_name, base_path, model, iteration_count, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_name, base_path, model[0] if model else None, len(iteration_paths), time.time())
+            )
+            self._conn.commit()
+        
+        return len(changed)
+    
+    def ingest_runs(self, run_names: Optional[List[str]] = None, base_path: str = BASE_OPTIMIZATION_PATH) -> int:
+        """
+        Ingest several optimization runs.
+        
+        Args:
+            run_names: Run folder names (every run folder under base_path if None)
+            base_path: Base path where optimization runs are stored
+            
+        Returns:
+            Total number of iterations that were (re)ingested
+        """
+        if run_names is None:
+            if not os.path.isdir(base_path):
+                print(f"Warning: Optimization path not found: {base_path}")
+                return 0
+            run_names = sorted(f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f)))
+        
+        return sum(self.ingest_run(run_name, base_path) for run_name in run_names)
+    
+    def _delete_iteration(self, run_name: str, iteration: int):
+        """Remove an iteration and its rows from every table (caller holds the lock)."""
+        for table in ["iterations"] + ITERATION_TABLES:
+            self._conn.execute(f"DELETE FROM {table} WHERE run_name = ? AND iteration = ?", (run_name, iteration))
+    
+    def _insert_iteration(self, run_name: str, iteration: int, source_state: str,
+                          analysis: Optional[Dict[str, Any]], optimization_log: Optional[Dict[str, Any]],
+                          metadata: Optional[Dict[str, Any]]):
+        """Insert the rows of one iteration (caller holds the lock)."""
+        key = (run_name, iteration)
+        statistics = (analysis or {}).get("statistics", {})
+        llm_usage = (metadata or {}).get("llm_usage") or {}
+        total_agents = statistics.get("total_agents")
+        
+        self._conn.execute(
+            "INSERT INTO iterations (run_name, iteration, simulation_id, model, total_agents, source_state, ingested_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            key + ((analysis or {}).get("simulation_id"), llm_usage.get("model"), total_agents, source_state, time.time())
+        )
+        
+        self._conn.executemany(
+            "INSERT INTO iteration_metrics (run_name, iteration, metric, value) VALUES (?, ?, ?, ?)",
+            [key + (name, value) for name, value in _flatten_metrics(statistics).items()]
+        )
+        
+        behavior_counts = statistics.get("behavior") or {}
+        if analysis is not None:
+            self._conn.executemany(
+                "INSERT INTO behavior_counts (run_name, iteration, behavior, count, fraction) VALUES (?, ?, ?, ?, ?)",
+                [key + (category, behavior_counts.get(category, 0),
+                        behavior_counts.get(category, 0) / total_agents if total_agents else 0)
+                 for category in BEHAVIOR_CATEGORIES]
+            )
+        
+        classification_rows = []
+        for agent_name, agent_data in ((analysis or {}).get("agents") or {}).items():
+            behavior = agent_data.get("behavior", {})
+            classification_rows.append(key + (
+                agent_name, behavior.get("classification"), json.dumps(behavior.get("ranking", [])),
+                int(bool(behavior.get("reused")))
+            ))
+        self._conn.executemany(
+            "INSERT INTO agent_classifications (run_name, iteration, agent_name, classification, ranking, reused) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            classification_rows
+        )
+        
+        adjustment_rows = []
+        for adjustment in (optimization_log or {}).get("agents_adjusted", []):
+            behavior_change = adjustment.get("behavior_change") or {}
+            adjustment_rows.append(key + (
+                adjustment.get("agent_name"), behavior_change.get("from"), behavior_change.get("to"),
+                *_usage_row(adjustment.get("token_usage") or {})
+            ))
+        self._conn.executemany(
+            "INSERT INTO adjustments (run_name, iteration, agent_name, from_behavior, to_behavior, "
+            "prompt_tokens, cached_tokens, completion_tokens) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            adjustment_rows
+        )
+        
+        usage_rows = []
+        if llm_usage:
+            usage_rows.append(key + ("simulation", llm_usage.get("model"), *_usage_row(llm_usage),
+                                     llm_usage.get("total_requests"), llm_usage.get("total_cost_usd")))
+        optimization_usage = (optimization_log or {}).get("api_usage") or {}
+        if optimization_usage.get("token_usage"):
+            usage_rows.append(key + ("optimization", None, *_usage_row(optimization_usage["token_usage"]),
+                                     optimization_usage.get("total_requests"), None))
+        # Older analyses kept api_usage at the top level instead of under statistics
+        analysis_usage = statistics.get("api_usage") or (analysis or {}).get("api_usage") or {}
+        if analysis_usage.get("token_usage"):
+            # The model is only known if a single classification model was used (no mixed cascade)
+            analysis_models = list(analysis_usage.get("token_usage_by_model") or [])
+            usage_rows.append(key + ("analysis", analysis_models[0] if len(analysis_models) == 1 else None,
+                                     *_usage_row(analysis_usage["token_usage"]),
+                                     analysis_usage.get("total_requests"), None))
+        self._conn.executemany(
+            "INSERT INTO token_usage (run_name, iteration, stage, model, prompt_tokens, cached_tokens, "
+            "completion_tokens, total_requests, cost_usd) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            usage_rows
+        )
+    
+    def _run_filter(self, run_names: Optional[List[str]], model: Optional[str],
+                    column: str = "run_name") -> Tuple[str, list]:
+        """Build a WHERE clause restricting rows to the given runs and/or run model."""
+        clauses, params = [], []
+        if run_names is not None:
+            clauses.append(f"{column} IN ({', '.join('?' * len(run_names))})")
+            params.extend(run_names)
+        if model is not None:
+            clauses.append(f"{column} IN (SELECT run_name FROM runs WHERE model = ?)")
+            params.append(model)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+    
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """
+        Run a read-only SQL query against the store.
+        
+        Args:
+            sql: SQL query
+            params: Query parameters
+            
+        Returns:
+            List of result rows
+        """
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    def get_runs(self, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List the ingested runs.
+        
+        Args:
+            model: Only list runs whose simulations used this model
+            
+        Returns:
+            List of dictionaries with run_name, model and iteration_count
+        """
+        where, params = self._run_filter(None, model)
+        rows = self.query(f"SELECT run_name, model, iteration_count FROM runs{where} ORDER BY run_name", tuple(params))
+        return [{"run_name": run_name, "model": model, "iteration_count": count} for run_name, model, count in rows]
+    
+    def get_metric_by_iteration(self, metric: str, run_names: Optional[List[str]] = None,
+                                model: Optional[str] = None) -> Dict[str, Dict[int, float]]:
+        """
+        Get a metric for every iteration of the selected runs.
+        
+        Args:
+            metric: Metric name, e.g. 'kl_divergence' or 'top3_js_divergence'
+            run_names: Only include these runs
+            model: Only include runs whose simulations used this model
+            
+        Returns:
+            Dictionary mapping run names to {iteration: value}
+        """
+        where, params = self._run_filter(run_names, model)
+        where = f"{where} AND metric = ?" if where else " WHERE metric = ?"
+        rows = self.query(
+            f"SELECT run_name, iteration, value FROM iteration_metrics{where} ORDER BY run_name, iteration",
+            tuple(params + [metric])
+        )
+        
+        result = {}
+        for run_name, iteration, value in rows:
+            result.setdefault(run_name, {})[iteration] = value
+        return result
+    
+    def get_token_usage(self, run_names: Optional[List[str]] = None,
+                        model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the token usage of every stage (simulation, optimization, analysis) of every iteration.
+        
+        Args:
+            run_names: Only include these runs
+            model: Only include runs whose simulations used this model
+            
+        Returns:
+            List of dictionaries, one per run, iteration and stage
+        """
+        where, params = self._run_filter(run_names, model)
+        columns = ["run_name", "iteration", "stage", "model", "prompt_tokens", "cached_tokens",
+                   "completion_tokens", "total_requests", "cost_usd"]
+        rows = self.query(
+            f"SELECT {', '.join(columns)} FROM token_usage{where} ORDER BY run_name, iteration, stage", tuple(params)
+        )
+        return [dict(zip(columns, row)) for row in rows]
+    
+    def get_optimization_run_data(self, run_names: List[str]) -> Dict[str, Any]:
+        """
+        Get run data in the format of data_loader.load_optimization_run_data.
+        
+        Args:
+            run_names: Optimization run folder names
+            
+        Returns:
+            Dictionary containing all optimization run data
+        """
+        all_data = {}
+        for run_name in run_names:
+            if not self.query("SELECT 1 FROM runs WHERE run_name = ? AND iteration_count > 0", (run_name,)):
+                continue
+            
+            # Only iterations with a behavior analysis, as when loading from the run folders
+            iterations = self.query(
+                "SELECT iteration, total_agents FROM iterations WHERE run_name = ? AND iteration IN "
+                "(SELECT iteration FROM behavior_counts WHERE run_name = ?) ORDER BY iteration", (run_name, run_name)
+            )
+            
+            run_data = {"iterations": {}}
+            for iteration, total_agents in iterations:
+                key = (run_name, iteration)
+                run_data["iterations"][iteration] = {
+                    "metrics": dict(self.query(
+                        "SELECT metric, value FROM iteration_metrics "
+                        "WHERE run_name = ? AND iteration = ? AND metric NOT LIKE 'top%'", key
+                    )),
+                    "behavior_distribution": dict(self.query(
+                        "SELECT behavior, fraction FROM behavior_counts WHERE run_name = ? AND iteration = ?", key
+                    )),
+                    "total_agents": total_agents or 0,
+                    "agent_behaviors": dict(self.query(
+                        "SELECT agent_name, classification FROM agent_classifications "
+                        "WHERE run_name = ? AND iteration = ? AND classification IS NOT NULL", key
+                    ))
+                }
+            all_data[run_name] = run_data
+        
+        return all_data
+    
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    """Ingest and query the experiment store from the command line."""
+    parser = argparse.ArgumentParser(description='Index optimization runs into a local SQLite store and query them.')
+    parser.add_argument('--db', type=str, default=EXPERIMENT_STORE_PATH,
+                        help='Path to the experiment store database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    ingest_parser = subparsers.add_parser('ingest', help='Ingest new or changed iterations of optimization runs')
+    ingest_parser.add_argument('--runs', nargs='+', default=None,
+                               help='Run folder names to ingest (all runs if omitted)')
+    ingest_parser.add_argument('--base-path', type=str, default=BASE_OPTIMIZATION_PATH,
+                               help='Base path where optimization runs are stored')
+    
+    query_parser = subparsers.add_parser('query', help='Print a metric by iteration across runs')
+    query_parser.add_argument('--metric', type=str, default='kl_divergence',
+                              help='Metric name, e.g. kl_divergence or top3_js_divergence')
+    query_parser.add_argument('--runs', nargs='+', default=None,
+                              help='Only include these runs')
+    query_parser.add_argument('--model', type=str, default=None,
+                              help='Only include runs whose simulations used this model')
+    args = parser.parse_args()
+    
+    store = ExperimentStore(args.db)
+    try:
+        if args.command == 'ingest':
+            start_time = time.time()
+            ingested = store.ingest_runs(args.runs, args.base_path)
+            print(f"Ingested {ingested} new or changed iterations in {time.time() - start_time:.2f}s")
+        else:
+            values = store.get_metric_by_iteration(args.metric, args.runs, args.model)
+            if not values:
+                print(f"No values of {args.metric} found")
+            for run_name, by_iteration in values.items():
+                print(f"{run_name}:")
+                for iteration, value in by_iteration.items():
+                    print(f"  Iteration {iteration}: {value:.4f}")
+    finally:
+        store.close()
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,84 +8,559 @@ specifically OpenAI's API for behavior classification and persona optimization.
 
 import os
 import json
+import time
+import asyncio
 from typing import Dict, Any, Optional, Tuple
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, RateLimitError
 
 from ..config import (
     DEFAULT_OPENAI_CONFIG,
     CLASSIFICATION_OPENAI_CONFIG, 
     PERSONA_OPTIMIZATION_CONFIG,
     BEHAVIOR_DESCRIPTIONS,
-    BEHAVIOR_CATEGORIES
+    BEHAVIOR_CATEGORIES,
+    LLM_CACHE_PATH,
+    LLM_MAX_RETRIES,
+    BATCH_COMPLETION_WINDOW,
+    BATCH_POLL_INTERVAL_SECONDS,
+    PACKED_CLASSIFICATION_TOKENS_PER_AGENT
 )
+from .response_cache import ResponseCache, compute_cache_key, is_cacheable
+from .rate_limiter import get_rate_limiter, estimate_request_tokens, parse_reset_duration
+from .retry import get_circuit_breaker, is_retryable_error, is_provider_failure, compute_backoff_delay
+
+
+def _format_behavior_descriptions() -> str:
+    """Format the behavior category rubric as a bulleted list."""
+    return "\n".join([
+        f"- {category}: {description}"
+        for category, description in BEHAVIOR_DESCRIPTIONS.items()
+    ])
+
+
+def is_complete_json_response(content: Optional[str]) -> bool:
+    """
+    Check whether a response is a complete JSON object.
+    
+    Every cacheable request asks for a JSON object, so anything else is a failed response
+    (e.g. cut off at max_tokens) that must not be served again from the cache.
+    
+    Args:
+        content: Raw response text returned by the LLM
+        
+    Returns:
+        True if the content parses as a JSON object
+    """
+    if not content:
+        return False
+    try:
+        return isinstance(json.loads(content), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+def merge_token_usage(first: Optional[Dict[str, Any]], second: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Add up the token usage of two requests made for the same agent.
+    
+    Used when one agent is charged for more than one request, e.g. a share of a packed
+    request plus its single-agent fallback.
+    
+    Args:
+        first: Token usage of the first request (or share of a request)
+        second: Token usage of the second request
+        
+    Returns:
+        Combined token usage, with request_share counting the requests involved
+    """
+    if not first or not second:
+        return first or second
+    
+    merged = dict(first)
+    for field, value in second.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and field not in ("packed_request_size", "request_share"):
+            merged[field] = merged.get(field, 0) + value
+    
+    # Flags such as cache_hit hold only if they hold for both requests; a fresh response has no cache_hit key
+    for field in set(first) | set(second):
+        if isinstance(first.get(field), bool) or isinstance(second.get(field), bool):
+            merged[field] = bool(first.get(field, False)) and bool(second.get(field, False))
+    
+    # A response served from the cache did not cost a request
+    merged["request_share"] = (first.get("request_share", 0 if first.get("cache_hit") else 1) +
+                               second.get("request_share", 0 if second.get("cache_hit") else 1))
+    
+    return merged
+
+
+# System prompts are built once at import time and contain no per-request data, so every request
+# starts with a byte-identical prefix that can be served from the provider's prompt cache.
+# The variable part of a request (memories, timeline, persona) always goes into the user message.
+CLASSIFICATION_SYSTEM_PROMPT = f"""
+You are a behavior analyst categorizing how individuals responded during an active shooter incident.
+Based on the agent's memories, actions, moods, plans, and dialog, classify its behavior into exactly ONE of these categories that best describes its behavior:
+
+{_format_behavior_descriptions()}
+
+You will be given the agent's memories and a timeline of its actions, moods, plans, and dialog.
+Given the context, reason about the agent's behavior and classify it into one of the 6 categories.
+Then, give a rank of the 6 categories by ordering them from most likely to least likely.
+Output in JSON format.
+
+{{
+    "reasoning": "<your reasoning here: 3 sentences max>",
+    "classification": "<choose 1 from the 6 categories>",
+    "ranking": [
+        "<most likely category>",
+        "<second most likely category>",
+        "<third most likely category>",
+        "<fourth most likely category>",
+        "<fifth most likely category>",
+        "<least likely category>"
+    ]
+}}
+"""
+
+PACKED_CLASSIFICATION_SYSTEM_PROMPT = f"""
+You are a behavior analyst categorizing how individuals responded during an active shooter incident.
+You will be given several agents, each identified by a key such as "agent_1".
+Based on each agent's memories, actions, moods, plans, and dialog, classify its behavior into exactly ONE of these categories that best describes its behavior:
+
+{_format_behavior_descriptions()}
+
+Classify every agent independently of the others.
+For each agent, reason about its behavior and classify it into one of the 6 categories.
+Then, give a rank of the 6 categories by ordering them from most likely to least likely.
+Output a JSON object with one entry per agent key, in this format:
+
+{{
+    "agent_1": {{
+        "reasoning": "<your reasoning here: 3 sentences max>",
+        "classification": "<choose 1 from the 6 categories>",
+        "ranking": [
+            "<most likely category>",
+            "<second most likely category>",
+            "<third most likely category>",
+            "<fourth most likely category>",
+            "<fifth most likely category>",
+            "<least likely category>"
+        ]
+    }},
+    "agent_2": {{ ... }}
+}}
+"""
+
+PERSONA_OPTIMIZATION_SYSTEM_PROMPT = f"""
+You are an expert in human behavior during crisis situations. Your task is to adjust a person's personality traits to make them more likely to exhibit a specific behavior during an active shooter incident.
+
+Behavior descriptions:
+{_format_behavior_descriptions()}
+
+Please suggest adjustments to the persona's traits that would make this person more likely to exhibit the target behavior during a crisis. Consider their age, role, and other factors that might influence their response.
+
+You may only modify the following fields:
+- personality_traits
+- emotional_disposition
+- motivations_goals
+- communication_style
+- knowledge_scope
+- backstory
+
+Return ONLY a JSON object with these fields, exactly in this format:
+{{
+    "personality_traits": "string | 25 words max",
+    "emotional_disposition": "string | 25 words max",
+    "motivations_goals": "string | 25 words max",
+    "communication_style": "string | 25 words max",
+    "knowledge_scope": "string | 25 words max",
+    "backstory": "string | 25 words max"
+}}
+"""
+
+
+class _ApiCall:
+    """Rate limiting, circuit breaking and caching of one API call across its attempts."""
+    
+    def __init__(self, client: "LLMClient", config: Dict[str, Any], cache_key: Optional[str], estimated_tokens: int):
+        """
+        Initialize the bookkeeping of an API call.
+        
+        Args:
+            client: Client making the call
+            config: Configuration for the API call
+            cache_key: Response cache key (None if the request is not cacheable)
+            estimated_tokens: Estimated tokens of the request
+        """
+        self.client = client
+        self.config = config
+        self.cache_key = cache_key
+        self.estimated_tokens = estimated_tokens
+        self.rate_limiter = get_rate_limiter(config.get("model", ""))
+        self.circuit_breaker = get_circuit_breaker(config.get("model", ""))
+        self.attempt = 0
+    
+    def begin_attempt(self) -> float:
+        """
+        Start the next attempt, reserving its capacity in the process-wide rate limiter.
+        
+        Returns:
+            Seconds to wait before sending the request (while the provider is degraded or the quota is used up)
+        """
+        self.attempt += 1
+        breaker_wait = self.circuit_breaker.wait_time()
+        return max(breaker_wait, self.rate_limiter.reserve(self.estimated_tokens))
+    
+    def succeeded(self, raw_response) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Record a successful attempt and cache its response.
+        
+        Args:
+            raw_response: Raw chat completion response (with headers)
+            
+        Returns:
+            Tuple of (response_content, token_usage)
+        """
+        self.rate_limiter.update_from_headers(raw_response.headers)
+        
+        content, token_usage = self.client._extract_response(raw_response.parse())
+        self.rate_limiter.settle(self.estimated_tokens, token_usage["total_tokens"])
+        self.circuit_breaker.record_success()
+        token_usage["attempts"] = self.attempt
+        self.client._store_cached_response(self.cache_key, self.config, content, token_usage)
+        return content, token_usage
+    
+    def failed(self, error: Exception) -> Optional[float]:
+        """
+        Record a failed attempt.
+        
+        Args:
+            error: Exception raised by the OpenAI client
+            
+        Returns:
+            Seconds to wait before the next attempt, or None to give up
+        """
+        return self.client._handle_api_error(error, self.attempt, self.rate_limiter, self.circuit_breaker)
 
 
 class LLMClient:
     """Unified client for LLM interactions."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, use_cache: bool = True, cache_path: str = LLM_CACHE_PATH):
         """
         Initialize the LLM client.
         
         Args:
             api_key: OpenAI API key. If None, will try to get from environment
+            use_cache: Whether to serve deterministic (temperature 0) calls from the persistent response cache
+            cache_path: Path to the response cache database
         """
         if api_key is None:
             api_key = os.environ.get("OPENAI_API_KEY", "")
         
         self.api_key = api_key
-        self.client = OpenAI(api_key=api_key) if api_key else None
+        # Retries are handled by _make_api_call so every attempt goes through the rate limiter and circuit breaker
+        self.client = OpenAI(api_key=api_key, max_retries=0) if api_key else None
+        self.async_client = AsyncOpenAI(api_key=api_key, max_retries=0) if api_key else None
+        
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = ResponseCache(cache_path)
+            except Exception as e:
+                print(f"Warning: Could not open LLM response cache at {cache_path}: {e}")
     
-    def _make_api_call(self, messages: list, config: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, int]]]:
+    def _get_cached_response(self, messages: list, config: Dict[str, Any]) -> Tuple[Optional[str], Optional[Tuple[str, Dict[str, Any]]]]:
         """
-        Make an API call to OpenAI.
+        Look up a request in the response cache.
         
         Args:
             messages: List of message dictionaries
             config: Configuration for the API call
             
         Returns:
-            Tuple of (response_content, token_usage)
+            Tuple of (cache_key, cached_result). The key is None if the request is not cacheable,
+            the result is None on a cache miss.
         """
-        if not self.client:
+        if not self.cache or not is_cacheable(config):
             return None, None
         
+        cache_key = compute_cache_key(messages, config)
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return cache_key, None
+        
+        # Drop unparseable responses stored by earlier versions so the request is made again
+        content, _ = cached
+        if not is_complete_json_response(content):
+            self.cache.delete(cache_key)
+            return cache_key, None
+        
+        # Cached responses cost nothing, so they are reported with zero token usage
+        token_usage = {
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "cache_hit": True
+        }
+        return cache_key, (content, token_usage)
+    
+    def _store_cached_response(self, cache_key: Optional[str], config: Dict[str, Any], content: Optional[str], 
+                               token_usage: Optional[Dict[str, int]]):
+        """Store a successful response in the response cache (truncated or malformed JSON is never cached)."""
+        if cache_key and is_complete_json_response(content):
+            self.cache.put(cache_key, content, token_usage, config.get("model", ""))
+    
+    @staticmethod
+    def _extract_response(response) -> Tuple[Optional[str], Optional[Dict[str, int]]]:
+        """
+        Extract the message content and token usage from a chat completion response.
+        
+        Args:
+            response: Chat completion response returned by the OpenAI client
+            
+        Returns:
+            Tuple of (response_content, token_usage). cached_tokens counts the prompt tokens
+            served from the provider's prompt cache (a subset of prompt_tokens).
+        """
+        content = response.choices[0].message.content
+        prompt_details = getattr(response.usage, "prompt_tokens_details", None)
+        token_usage = {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "cached_tokens": getattr(prompt_details, "cached_tokens", None) or 0,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.prompt_tokens + response.usage.completion_tokens
+        }
+        
+        return content, token_usage
+    
+    @staticmethod
+    def _failed_token_usage(attempts: int) -> Dict[str, Any]:
+        """
+        Build the token usage of a call that failed after all its attempts.
+        
+        Failed attempts are not billed, but are still counted so retries show up in the API usage.
+        
+        Args:
+            attempts: Number of attempts made
+            
+        Returns:
+            Token usage with zero tokens, the attempts and failed set
+        """
+        return {
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "attempts": attempts,
+            "failed": True
+        }
+    
+    @staticmethod
+    def _pause_after_rate_limit(rate_limiter, error: RateLimitError):
+        """Hold back all callers of a model after the provider rejected a request with HTTP 429."""
+        headers = error.response.headers if error.response is not None else {}
+        retry_after = headers.get("retry-after")
         try:
-            response = self.client.chat.completions.create(
-                messages=messages,
-                **config
-            )
+            pause_seconds = float(retry_after)
+        except (TypeError, ValueError):
+            pause_seconds = parse_reset_duration(headers.get("x-ratelimit-reset-tokens")) or 1.0
+        
+        rate_limiter.update_from_headers(headers)
+        rate_limiter.pause(pause_seconds)
+    
+    def _handle_api_error(self, error: Exception, attempt: int, rate_limiter, circuit_breaker) -> Optional[float]:
+        """
+        Record a failed API call and decide whether to retry it.
+        
+        Args:
+            error: Exception raised by the OpenAI client
+            attempt: Number of the attempt that failed (1-based)
+            rate_limiter: Rate limiter of the model
+            circuit_breaker: Circuit breaker of the model
             
-            content = response.choices[0].message.content
-            token_usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.prompt_tokens + response.usage.completion_tokens
-            }
+        Returns:
+            Seconds to wait before the next attempt, or None to give up
+        """
+        if isinstance(error, RateLimitError):
+            self._pause_after_rate_limit(rate_limiter, error)
+        if is_provider_failure(error):
+            circuit_breaker.record_failure()
+        
+        if not is_retryable_error(error) or attempt > LLM_MAX_RETRIES:
+            print(f"Error in OpenAI API call (attempt {attempt}): {error}")
+            return None
+        
+        return compute_backoff_delay(attempt)
+    
+    def _start_api_call(self, messages: list, config: Dict[str, Any]) -> Tuple["_ApiCall", Optional[Tuple[str, Dict[str, Any]]]]:
+        """
+        Look up a request in the response cache and set up the bookkeeping of its attempts.
+        
+        Args:
+            messages: List of message dictionaries
+            config: Configuration for the API call
             
-            return content, token_usage
+        Returns:
+            Tuple of (call, cached_result). cached_result is None on a cache miss.
+        """
+        cache_key, cached = self._get_cached_response(messages, config)
+        return _ApiCall(self, config, cache_key, estimate_request_tokens(messages, config)), cached
+    
+    def _make_api_call(self, messages: list, config: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, int]]]:
+        """
+        Make an API call to OpenAI, retrying transient failures with exponential backoff.
+        
+        Args:
+            messages: List of message dictionaries
+            config: Configuration for the API call
             
-        except Exception as e:
-            print(f"Error in OpenAI API call: {e}")
+        Returns:
+            Tuple of (response_content, token_usage). token_usage includes the number of attempts;
+            when every attempt failed the content is None and token_usage is marked as failed.
+        """
+        if not self.client:
             return None, None
+        
+        call, cached = self._start_api_call(messages, config)
+        if cached:
+            return cached
+        
+        while True:
+            wait = call.begin_attempt()
+            if wait > 0:
+                time.sleep(wait)
+            
+            try:
+                raw_response = self.client.chat.completions.with_raw_response.create(
+                    messages=messages,
+                    **config
+                )
+                return call.succeeded(raw_response)
+                
+            except Exception as e:
+                delay = call.failed(e)
+                if delay is None:
+                    return None, self._failed_token_usage(call.attempt)
+                time.sleep(delay)
     
-    def classify_agent_behavior(self, agent_data: Dict[str, Any], context: Dict[str, str]) -> Dict[str, Any]:
+    async def _make_api_call_async(self, messages: list, config: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, int]]]:
         """
-        Classify an agent's behavior based on their data using LLM.
+        Make a non-blocking API call to OpenAI, retrying transient failures with exponential backoff.
+        
+        Args:
+            messages: List of message dictionaries
+            config: Configuration for the API call
+            
+        Returns:
+            Tuple of (response_content, token_usage). token_usage includes the number of attempts;
+            when every attempt failed the content is None and token_usage is marked as failed.
+        """
+        if not self.async_client:
+            return None, None
+        
+        call, cached = self._start_api_call(messages, config)
+        if cached:
+            return cached
+        
+        while True:
+            wait = call.begin_attempt()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            
+            try:
+                raw_response = await self.async_client.chat.completions.with_raw_response.create(
+                    messages=messages,
+                    **config
+                )
+                return call.succeeded(raw_response)
+                
+            except Exception as e:
+                delay = call.failed(e)
+                if delay is None:
+                    return None, self._failed_token_usage(call.attempt)
+                await asyncio.sleep(delay)
+    
+    def _build_classification_messages(self, agent_data: Dict[str, Any], context: Dict[str, str]) -> Tuple[Optional[list], Optional[str]]:
+        """
+        Build the chat messages used to classify an agent's behavior.
         
         Args:
             agent_data: Dictionary containing agent data
             context: Dictionary with 'memories' and 'timeline' strings
             
+        Returns:
+            Tuple of (messages, error_message). Messages is None when the agent cannot be classified.
+        """
+        memory_text = context["memories"]
+        timeline_text = context["timeline"]
+        
+        if not memory_text or not timeline_text:
+            return None, "Insufficient data found for agent"
+        
+        user_prompt = f"""
+Here are the agent's memories:
+{memory_text}
+
+Here is the agent's timeline showing actions, moods, plans, and dialog:
+{timeline_text}
+"""
+        
+        # The static instructions come first so the prompt prefix is identical across agents
+        return [
+            {"role": "system", "content": CLASSIFICATION_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ], None
+    
+    def _parse_classification_response(self, agent_data: Dict[str, Any], response_content: Optional[str], 
+                                       token_usage: Optional[Dict[str, int]]) -> Dict[str, Any]:
+        """
+        Turn a raw classification response into a classification result.
+        
+        Args:
+            agent_data: Dictionary containing agent data
+            response_content: Raw response text returned by the LLM
+            token_usage: Token usage of the request
+            
         Returns:
             Dictionary containing classification results
         """
-        if not self.client:
+        if not response_content:
             return {
-                "classification": "UNKNOWN",
-                "error": "OpenAI API key not configured. Please set the OPENAI_API_KEY environment variable."
+                "classification": "ERROR",
+                "error": "Failed to get response from LLM",
+                "token_usage": token_usage
             }
         
+        try:
+            # Extract the JSON response
+            json_response = json.loads(response_content)
+            return self._build_classification_result(agent_data, json_response, token_usage)
+            
+        except json.JSONDecodeError:
+            return {
+                "classification": "ERROR",
+                "error": f"Failed to parse LLM response as JSON: {response_content}",
+                "token_usage": token_usage
+            }
+    
+    @staticmethod
+    def _build_classification_result(agent_data: Dict[str, Any], json_response: Dict[str, Any], 
+                                     token_usage: Optional[Dict[str, int]]) -> Dict[str, Any]:
+        """
+        Build a classification result from a parsed JSON classification.
+        
+        Args:
+            agent_data: Dictionary containing agent data
+            json_response: Parsed classification with 'classification', 'reasoning' and 'ranking'
+            token_usage: Token usage attributed to this agent
+            
+        Returns:
+            Dictionary containing classification results
+            
+        Raises:
+            KeyError: If the classification is missing
+        """
         # Get agent persona information
         persona = agent_data.get('persona', {})
         name = persona.get('name', 'Unknown')
@@ -93,99 +568,436 @@ class LLMClient:
         age = persona.get('age', 'Unknown')
         gender = persona.get('gender', 'Unknown')
         
-        memory_text = context["memories"]
-        timeline_text = context["timeline"]
+        # Extract the classification
+        classification = json_response["classification"]
+        reasoning = json_response.get("reasoning", "")
+        ranking = json_response.get("ranking", [])
         
-        if not memory_text or not timeline_text:
+        # Validate it's one of our categories
+        if classification not in BEHAVIOR_CATEGORIES:
+            # If not an exact match, try to find the closest category
+            for category in BEHAVIOR_CATEGORIES:
+                if category in classification:
+                    classification = category
+                    break
+            else:
+                classification = "UNCLASSIFIED"
+        
+        return {
+            "classification": classification,
+            "reasoning": reasoning,
+            "ranking": ranking,
+            "persona": {
+                "name": name,
+                "occupation": occupation,
+                "age": age,
+                "gender": gender
+            },
+            "final_status": agent_data.get("final_status", "Unknown"),
+            "token_usage": token_usage
+        }
+    
+    def classify_agent_behavior(self, agent_data: Dict[str, Any], context: Dict[str, str],
+                                config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Classify an agent's behavior based on their data using LLM.
+        
+        Args:
+            agent_data: Dictionary containing agent data
+            context: Dictionary with 'memories' and 'timeline' strings
+            config: Configuration for the API call (defaults to CLASSIFICATION_OPENAI_CONFIG)
+            
+        Returns:
+            Dictionary containing classification results
+        """
+        if not self.client:
             return {
                 "classification": "UNKNOWN",
-                "error": "Insufficient data found for agent"
+                "error": "OpenAI API key not configured. Please set the OPENAI_API_KEY environment variable."
             }
         
-        # Prepare the classification prompt
-        behavior_descriptions_text = "\n".join([
-            f"- {category}: {description}"
-            for category, description in BEHAVIOR_DESCRIPTIONS.items()
-        ])
+        messages, error = self._build_classification_messages(agent_data, context)
+        if error:
+            return {
+                "classification": "UNKNOWN",
+                "error": error
+            }
         
-        prompt = f"""
-You are a behavior analyst categorizing how individuals responded during an active shooter incident.
-Based on the agent's memories, actions, moods, plans, and dialog, classify its behavior into exactly ONE of these categories that best describes its behavior:
-
-{behavior_descriptions_text}
-
+        response_content, token_usage = self._make_api_call(messages, config or CLASSIFICATION_OPENAI_CONFIG)
+        return self._parse_classification_response(agent_data, response_content, token_usage)
+    
+    async def classify_agent_behavior_async(self, agent_data: Dict[str, Any], context: Dict[str, str],
+                                            config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Asynchronous variant of classify_agent_behavior for use inside an event loop.
+        
+        Args:
+            agent_data: Dictionary containing agent data
+            context: Dictionary with 'memories' and 'timeline' strings
+            config: Configuration for the API call (defaults to CLASSIFICATION_OPENAI_CONFIG)
+            
+        Returns:
+            Dictionary containing classification results
+        """
+        if not self.async_client:
+            return {
+                "classification": "UNKNOWN",
+                "error": "OpenAI API key not configured. Please set the OPENAI_API_KEY environment variable."
+            }
+        
+        messages, error = self._build_classification_messages(agent_data, context)
+        if error:
+            return {
+                "classification": "UNKNOWN",
+                "error": error
+            }
+        
+        response_content, token_usage = await self._make_api_call_async(messages, config or CLASSIFICATION_OPENAI_CONFIG)
+        return self._parse_classification_response(agent_data, response_content, token_usage)
+    
+    def _build_packed_classification_messages(self, entries: Dict[str, Dict[str, str]]) -> list:
+        """
+        Build the chat messages used to classify several agents in one request.
+        
+        The category rubric is sent once in the system message; the agents follow in the
+        user message as a list keyed by 'agent_1', 'agent_2', ...
+        
+        Args:
+            entries: Dictionary mapping agent keys to context dictionaries with 'memories' and 'timeline'
+            
+        Returns:
+            List of message dictionaries
+        """
+        agent_sections = []
+        for key, context in entries.items():
+            agent_sections.append(f"""=== {key} ===
 Here are the agent's memories:
-{memory_text}
+{context["memories"]}
 
 Here is the agent's timeline showing actions, moods, plans, and dialog:
-{timeline_text}
-
-Given the context, reason about the agent's behavior and classify it into one of the 6 categories.
-Then, give a rank of the 6 categories by ordering them from most likely to least likely.
-Output in JSON format.
-
-{{
-    "reasoning": "<your reasoning here: 3 sentences max>",
-    "classification": "<choose 1 from the 6 categories>",
-    "ranking": [
-        "<most likely category>",
-        "<second most likely category>",
-        "<third most likely category>",
-        "<fourth most likely category>",
-        "<fifth most likely category>",
-        "<least likely category>"
-    ]
-}}
-"""
+{context["timeline"]}
+""")
         
-        messages = [{"role": "system", "content": prompt}]
-        response_content, token_usage = self._make_api_call(messages, CLASSIFICATION_OPENAI_CONFIG)
+        user_prompt = "\n".join(agent_sections) + f"\nReturn results for all {len(entries)} agents: {', '.join(entries)}.\n"
         
-        if not response_content:
-            return {
-                "classification": "ERROR",
-                "error": "Failed to get response from LLM"
-            }
+        return [
+            {"role": "system", "content": PACKED_CLASSIFICATION_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    @staticmethod
+    def _split_token_usage(token_usage: Optional[Dict[str, Any]], count: int) -> list:
+        """
+        Split the token usage of a packed request evenly across the agents it classified.
         
-        try:
-            # Extract the JSON response
-            json_response = json.loads(response_content)
+        Integer counters are split so that the shares add up to the request total; each share
+        also records the fraction of the request it represents.
+        
+        Args:
+            token_usage: Token usage of the packed request
+            count: Number of agents in the request
             
-            # Extract the classification
-            classification = json_response["classification"]
-            reasoning = json_response.get("reasoning", "")
-            ranking = json_response.get("ranking", [])
-            
-            # Validate it's one of our categories
-            if classification not in BEHAVIOR_CATEGORIES:
-                # If not an exact match, try to find the closest category
-                for category in BEHAVIOR_CATEGORIES:
-                    if category in classification:
-                        classification = category
-                        break
+        Returns:
+            List of per-agent token usage dictionaries
+        """
+        if not token_usage:
+            return [token_usage] * count
+        
+        request_share = 0 if token_usage.get("cache_hit") else 1 / count
+        shares = [{"packed_request_size": count, "request_share": request_share} for _ in range(count)]
+        for field, value in token_usage.items():
+            for index, share in enumerate(shares):
+                if isinstance(value, int) and not isinstance(value, bool):
+                    share[field] = value // count + (1 if index < value % count else 0)
                 else:
-                    classification = "UNCLASSIFIED"
+                    share[field] = value
+        
+        return shares
+    
+    def _prepare_packed_classification(self, agents: list, config: Dict[str, Any]) -> Tuple[list, Dict[str, int], Optional[list], Dict[str, Any]]:
+        """
+        Prepare a packed classification request.
+        
+        Args:
+            agents: List of (agent_data, context) tuples
+            config: Configuration for a single-agent request
             
-            return {
-                "classification": classification,
-                "reasoning": reasoning,
-                "ranking": ranking,
-                "persona": {
-                    "name": name,
-                    "occupation": occupation,
-                    "age": age,
-                    "gender": gender
-                },
-                "final_status": agent_data.get("final_status", "Unknown"),
-                "token_usage": token_usage
-            }
+        Returns:
+            Tuple of (results, keys, messages, config). results holds the final result of agents that
+            cannot be classified and None for the rest; keys maps agent keys to indices in agents;
+            messages is None when fewer than two agents need a request.
+        """
+        results = [None] * len(agents)
+        entries = {}
+        keys = {}
+        
+        for index, (agent_data, context) in enumerate(agents):
+            if not context["memories"] or not context["timeline"]:
+                results[index] = {
+                    "classification": "UNKNOWN",
+                    "error": "Insufficient data found for agent"
+                }
+                continue
             
+            key = f"agent_{len(entries) + 1}"
+            entries[key] = context
+            keys[key] = index
+        
+        if len(entries) < 2:
+            return results, keys, None, config
+        
+        # Leave room in the completion for every agent's reasoning and ranking
+        packed_config = dict(config)
+        packed_config["max_tokens"] = max(config.get("max_tokens", 0), PACKED_CLASSIFICATION_TOKENS_PER_AGENT * len(entries))
+        
+        return results, keys, self._build_packed_classification_messages(entries), packed_config
+    
+    def _parse_packed_classification_response(self, agents: list, keys: Dict[str, int], results: list,
+                                              response_content: Optional[str], 
+                                              token_usage: Optional[Dict[str, int]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Fill in the results of a packed classification response.
+        
+        Args:
+            agents: List of (agent_data, context) tuples
+            keys: Dictionary mapping agent keys to indices in agents
+            results: List of results, updated in place
+            response_content: Raw response text returned by the LLM
+            token_usage: Token usage of the packed request
+            
+        Returns:
+            Dictionary mapping indices of agents missing from the response (or malformed in it)
+            to their share of the packed token usage
+        """
+        try:
+            json_response = json.loads(response_content) if response_content else {}
         except json.JSONDecodeError:
+            json_response = {}
+        if not isinstance(json_response, dict):
+            json_response = {}
+        
+        usage_shares = self._split_token_usage(token_usage, len(keys))
+        failed = {}
+        
+        for (key, index), usage_share in zip(keys.items(), usage_shares):
+            agent_result = json_response.get(key)
+            try:
+                results[index] = self._build_classification_result(agents[index][0], agent_result, usage_share)
+                results[index]["packed"] = True
+            except (KeyError, TypeError, AttributeError):
+                failed[index] = usage_share
+        
+        if failed:
+            print(f"Packed classification response was missing or malformed for {len(failed)}/{len(keys)} agents, "
+                  f"classifying them individually")
+        
+        return failed
+    
+    def classify_agents_packed(self, agents: list, config: Optional[Dict[str, Any]] = None) -> list:
+        """
+        Classify several agents with a single request that shares one copy of the category rubric.
+        
+        Agents missing from the response, or whose entry is malformed, are classified individually.
+        
+        Args:
+            agents: List of (agent_data, context) tuples
+            config: Configuration for a single-agent request (defaults to CLASSIFICATION_OPENAI_CONFIG)
+            
+        Returns:
+            List of classification results in the same order as agents
+        """
+        if not self.client:
+            return [self.classify_agent_behavior(agent_data, context) for agent_data, context in agents]
+        
+        config = config or CLASSIFICATION_OPENAI_CONFIG
+        results, keys, messages, packed_config = self._prepare_packed_classification(agents, config)
+        if messages is None:
+            for index in keys.values():
+                results[index] = self.classify_agent_behavior(*agents[index], config)
+            return results
+        
+        response_content, token_usage = self._make_api_call(messages, packed_config)
+        failed = self._parse_packed_classification_response(agents, keys, results, response_content, token_usage)
+        
+        for index, usage_share in failed.items():
+            result = self.classify_agent_behavior(*agents[index], config)
+            result["token_usage"] = merge_token_usage(usage_share, result.get("token_usage"))
+            results[index] = result
+        
+        return results
+    
+    async def classify_agents_packed_async(self, agents: list, config: Optional[Dict[str, Any]] = None) -> list:
+        """
+        Asynchronous variant of classify_agents_packed for use inside an event loop.
+        
+        Args:
+            agents: List of (agent_data, context) tuples
+            config: Configuration for a single-agent request (defaults to CLASSIFICATION_OPENAI_CONFIG)
+            
+        Returns:
+            List of classification results in the same order as agents
+        """
+        if not self.async_client:
+            return [await self.classify_agent_behavior_async(agent_data, context) for agent_data, context in agents]
+        
+        config = config or CLASSIFICATION_OPENAI_CONFIG
+        results, keys, messages, packed_config = self._prepare_packed_classification(agents, config)
+        if messages is None:
+            for index in keys.values():
+                results[index] = await self.classify_agent_behavior_async(*agents[index], config)
+            return results
+        
+        response_content, token_usage = await self._make_api_call_async(messages, packed_config)
+        failed = self._parse_packed_classification_response(agents, keys, results, response_content, token_usage)
+        
+        fallback_results = await asyncio.gather(*[
+            self.classify_agent_behavior_async(*agents[index], config) for index in failed
+        ])
+        for (index, usage_share), result in zip(failed.items(), fallback_results):
+            result["token_usage"] = merge_token_usage(usage_share, result.get("token_usage"))
+            results[index] = result
+        
+        return results
+    
+    def classify_agents_batch(self, agent_items: Dict[str, Tuple[Dict[str, Any], Dict[str, str]]], batch_file_path: str, 
+                              poll_interval: float = BATCH_POLL_INTERVAL_SECONDS) -> Dict[str, Dict[str, Any]]:
+        """
+        Classify many agents through the Batch API instead of interactive requests.
+        
+        Requests already present in the response cache are answered locally; the rest are written
+        to a batch JSONL file, uploaded, polled until the batch finishes and parsed back.
+        
+        Args:
+            agent_items: Dictionary mapping a unique request id to a tuple of (agent_data, context)
+            batch_file_path: Path where the batch input JSONL file is written
+            poll_interval: Seconds to wait between batch status checks
+            
+        Returns:
+            Dictionary mapping request ids to classification results
+        """
+        if not self.client:
             return {
-                "classification": "ERROR",
-                "error": f"Failed to parse LLM response as JSON: {response_content}",
-                "token_usage": token_usage
+                custom_id: {
+                    "classification": "UNKNOWN",
+                    "error": "OpenAI API key not configured. Please set the OPENAI_API_KEY environment variable."
+                }
+                for custom_id in agent_items
             }
+        
+        results = {}
+        pending = {}
+        
+        for custom_id, (agent_data, context) in agent_items.items():
+            messages, error = self._build_classification_messages(agent_data, context)
+            if error:
+                results[custom_id] = {"classification": "UNKNOWN", "error": error}
+                continue
+            
+            cache_key, cached = self._get_cached_response(messages, CLASSIFICATION_OPENAI_CONFIG)
+            if cached:
+                results[custom_id] = self._parse_classification_response(agent_data, *cached)
+                continue
+            
+            pending[custom_id] = (agent_data, messages, cache_key)
+        
+        if not pending:
+            return results
+        
+        # Write the batch input file
+        os.makedirs(os.path.dirname(os.path.abspath(batch_file_path)), exist_ok=True)
+        with open(batch_file_path, 'w', encoding='utf-8') as f:
+            for custom_id, (_, messages, _) in pending.items():
+                request = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {"messages": messages, **CLASSIFICATION_OPENAI_CONFIG}
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+        
+        print(f"Wrote {len(pending)} classification requests to {batch_file_path}")
+        
+        batch_responses = self._run_batch(batch_file_path, poll_interval)
+        
+        for custom_id, (agent_data, _, cache_key) in pending.items():
+            response_content, token_usage = batch_responses.get(custom_id, (None, None))
+            self._store_cached_response(cache_key, CLASSIFICATION_OPENAI_CONFIG, response_content, token_usage)
+            results[custom_id] = self._parse_classification_response(agent_data, response_content, token_usage)
+        
+        return results
+    
+    def _run_batch(self, batch_file_path: str, poll_interval: float) -> Dict[str, Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+        """
+        Upload a batch input file, wait for the batch to finish and collect its responses.
+        
+        Args:
+            batch_file_path: Path to the batch input JSONL file
+            poll_interval: Seconds to wait between batch status checks
+            
+        Returns:
+            Dictionary mapping request ids to (response_content, token_usage)
+        """
+        try:
+            with open(batch_file_path, 'rb') as f:
+                input_file = self.client.files.create(file=f, purpose="batch")
+            
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window=BATCH_COMPLETION_WINDOW
+            )
+            print(f"Submitted batch {batch.id}")
+            
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                time.sleep(poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+                counts = batch.request_counts
+                if counts:
+                    print(f"Batch {batch.id}: {batch.status} ({counts.completed}/{counts.total} completed, {counts.failed} failed)")
+                else:
+                    print(f"Batch {batch.id}: {batch.status}")
+            
+            if batch.status != "completed":
+                print(f"Warning: Batch {batch.id} finished with status '{batch.status}'")
+            
+            if not batch.output_file_id:
+                return {}
+            
+            output_text = self.client.files.content(batch.output_file_id).text
+            
+        except Exception as e:
+            print(f"Error in OpenAI batch processing: {e}")
+            return {}
+        
+        responses = {}
+        for line_number, line in enumerate(output_text.splitlines(), 1):
+            if not line.strip():
+                continue
+            
+            # A malformed line only loses its own request; the agent is reported as failed
+            try:
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    print(f"Batch request {record.get('custom_id')} failed: {record.get('error') or response.get('status_code')}")
+                    continue
+                
+                body = response["body"]
+                usage = body.get("usage") or {}
+                responses[record["custom_id"]] = (
+                    body["choices"][0]["message"]["content"],
+                    {
+                        "prompt_tokens": usage.get("prompt_tokens", 0),
+                        "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+                        "completion_tokens": usage.get("completion_tokens", 0),
+                        "total_tokens": usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0),
+                        "batch": True
+                    }
+                )
+            except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                print(f"Skipping malformed batch output line {line_number}: {e!r}")
+        
+        return responses
     
     def optimize_agent_personality(self, agent_name: str, current_behavior: str, target_behavior: str, 
                                  persona: Dict[str, Any], agent_data: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Optional[str], Optional[Dict[str, int]]]:
@@ -232,40 +1044,6 @@ Output in JSON format.
             if plans:
                 plan_info = "Agent's plans during the incident:\n" + "\n".join(plans)
         
-        # Prepare behavior descriptions
-        behavior_descriptions_text = "\n".join([
-            f"- {category}: {description}"
-            for category, description in BEHAVIOR_DESCRIPTIONS.items()
-        ])
-        
-        # Prepare the optimization prompt
-        system_prompt = f"""
-You are an expert in human behavior during crisis situations. Your task is to adjust a person's personality traits to make them more likely to exhibit a specific behavior during an active shooter incident.
-
-Behavior descriptions:
-{behavior_descriptions_text}
-
-Please suggest adjustments to the persona's traits that would make this person more likely to exhibit the target behavior during a crisis. Consider their age, role, and other factors that might influence their response.
-
-You may only modify the following fields:
-- personality_traits
-- emotional_disposition
-- motivations_goals
-- communication_style
-- knowledge_scope
-- backstory
-
-Return ONLY a JSON object with these fields, exactly in this format:
-{{
-    "personality_traits": "string | 25 words max",
-    "emotional_disposition": "string | 25 words max",
-    "motivations_goals": "string | 25 words max",
-    "communication_style": "string | 25 words max",
-    "knowledge_scope": "string | 25 words max",
-    "backstory": "string | 25 words max"
-}}
-"""
-
         user_prompt = f"""
 Current persona:
 - Name: {name}
@@ -287,7 +1065,7 @@ Target behavior: {target_behavior}
 """
         
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": PERSONA_OPTIMIZATION_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
         
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+"""
+Log compression utilities for PEBA-PEvo framework.
+
+This module compresses the bulky simulation logs of a simulation or optimization tree (agent
+logs, trajectories and map data) into .json.gz or .json.zst files next to the originals.
+Every loader in data_loader reads the compressed files transparently, so downstream code
+keeps using the plain .json paths.
+
+Only logs that are read by Python alone are compressed. The Unity side reads the plain files
+of the optimization loop (e.g. personas_updated.json in BehaviorOptimizer.cs and
+behavior_analysis.json in BehaviorEvaluator.cs), so those and every other JSON file are
+left untouched.
+
+Usage:
+    python -m peba_core.utils.log_compression <folder> [<folder> ...] [--format zst] [--keep]
+"""
+
+import os
+import sys
+import gzip
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from ..config import (
+    LOG_COMPRESSION_FORMAT,
+    LOG_COMPRESSION_LEVELS,
+    COLUMNAR_CACHE_FOLDER,
+    TRAJECTORY_STORE_FOLDER
+)
+from .data_loader import zstandard
+
+
+# Logs that only Python reads: AgentLogs/*.json, the *_traj.json player trajectories and map_data.json
+AGENT_LOGS_FOLDER = "AgentLogs"
+TRAJECTORY_FILE_SUFFIX = "_traj.json"
+COMPRESSIBLE_FILE_NAMES = ["map_data.json"]
+
+
+def compress_bytes(content: bytes, compression: str, level: Optional[int] = None) -> bytes:
+    """
+    Compress data with gzip or zstd.
+    
+    Args:
+        content: Data to compress
+        compression: 'gz' or 'zst'
+        level: Compression level (the configured default if None)
+        
+    Returns:
+        Compressed data
+        
+    Raises:
+        ImportError: If zstd is requested and zstandard is not installed
+    """
+    level = LOG_COMPRESSION_LEVELS[compression] if level is None else level
+    if compression == "zst":
+        if zstandard is None:
+            raise ImportError("Writing .zst files requires zstandard (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=level).compress(content)
+    
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def decompress_bytes(content: bytes, compression: str) -> bytes:
+    """
+    Decompress gzip or zstd data.
+    
+    Args:
+        content: Compressed data
+        compression: 'gz' or 'zst'
+        
+    Returns:
+        Decompressed data
+    """
+    if compression == "zst":
+        return zstandard.ZstdDecompressor().decompress(content)
+    return gzip.decompress(content)
+
+
+def compress_json_file(file_path: str, compression: str = LOG_COMPRESSION_FORMAT, level: Optional[int] = None,
+                       keep_original: bool = False) -> Dict[str, Any]:
+    """
+    Compress a JSON file into file.json.gz or file.json.zst.
+    
+    The compressed file is verified to decompress to the original content before the
+    original is removed.
+    
+    Args:
+        file_path: Path to the JSON file
+        compression: 'gz' or 'zst'
+        level: Compression level (the configured default if None)
+        keep_original: Whether to keep the uncompressed file
+        
+    Returns:
+        Dictionary with the path, original_bytes and compressed_bytes
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    
+    compressed = compress_bytes(content, compression, level)
+    if decompress_bytes(compressed, compression) != content:
+        raise ValueError(f"Compressed data does not match the original: {file_path}")
+    
+    # Write under a temporary name so an interrupted run never leaves a truncated file behind
+    compressed_path = f"{file_path}.{compression}"
+    temp_path = compressed_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(compressed)
+    os.replace(temp_path, compressed_path)
+    
+    stat = os.stat(file_path)
+    os.utime(compressed_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    if not keep_original:
+        os.remove(file_path)
+    
+    return {
+        "path": compressed_path,
+        "original_bytes": len(content),
+        "compressed_bytes": os.path.getsize(compressed_path)
+    }
+
+
+def is_compressible_log(file_path: str) -> bool:
+    """
+    Check whether a JSON file is a simulation log that only Python reads.
+    
+    Args:
+        file_path: Path to the JSON file
+        
+    Returns:
+        True for AgentLogs/*.json, *_traj.json and map_data.json
+    """
+    file_name = os.path.basename(file_path)
+    if not file_name.endswith('.json'):
+        return False
+    return (os.path.basename(os.path.dirname(file_path)) == AGENT_LOGS_FOLDER
+            or file_name.endswith(TRAJECTORY_FILE_SUFFIX)
+            or file_name in COMPRESSIBLE_FILE_NAMES)
+
+
+def find_uncompressed_json_files(folder: str) -> List[str]:
+    """
+    Find the uncompressed simulation logs below a folder that are safe to compress.
+    
+    Files the Unity side reads (personas, behavior analyses, metadata) and derived caches
+    are skipped.
+    
+    Args:
+        folder: Root folder to search
+        
+    Returns:
+        Sorted list of paths to .json files
+    """
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        # Cache manifests are read directly by their stores and are tiny anyway
+        dirs[:] = [d for d in dirs if d not in (COLUMNAR_CACHE_FOLDER, TRAJECTORY_STORE_FOLDER)]
+        paths.extend(os.path.join(root, f) for f in files if is_compressible_log(os.path.join(root, f)))
+    return sorted(paths)
+
+
+def compress_tree(folder: str, compression: str = LOG_COMPRESSION_FORMAT, level: Optional[int] = None,
+                  keep_original: bool = False, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compress the simulation logs below a folder in parallel (see find_uncompressed_json_files).
+    
+    Args:
+        folder: Simulation, batch or optimization run folder
+        compression: 'gz' or 'zst'
+        level: Compression level (the configured default if None)
+        keep_original: Whether to keep the uncompressed files
+        max_workers: Number of files compressed at once (one per CPU if None)
+        
+    Returns:
+        Dictionary with files, failed, original_bytes, compressed_bytes and seconds
+    """
+    file_paths = find_uncompressed_json_files(folder)
+    max_workers = max_workers or os.cpu_count() or 1
+    
+    def compress(file_path):
+        try:
+            return compress_json_file(file_path, compression, level, keep_original)
+        except Exception as e:
+            print(f"Error compressing {file_path}: {e}")
+            return None
+    
+    start_time = time.time()
+    # zlib and zstandard release the GIL while compressing, so threads use every core
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(compress, file_paths))
+    compressed = [result for result in results if result]
+    
+    return {
+        "files": len(compressed),
+        "failed": len(results) - len(compressed),
+        "original_bytes": sum(result["original_bytes"] for result in compressed),
+        "compressed_bytes": sum(result["compressed_bytes"] for result in compressed),
+        "seconds": time.time() - start_time
+    }
+
+
+def main():
+    """Compress simulation trees from the command line."""
+    parser = argparse.ArgumentParser(
+        description='Compress the JSON logs of simulation or optimization folders. Only AgentLogs/*.json, '
+                    '*_traj.json and map_data.json are compressed; files Unity reads (personas_updated.json, '
+                    'behavior_analysis.json, ...) are left as they are.')
+    parser.add_argument('folders', nargs='+',
+                        help='Folders whose simulation logs (recursively) are compressed')
+    parser.add_argument('--format', type=str, choices=['gz', 'zst'], default=LOG_COMPRESSION_FORMAT,
+                        help='Compression format (zst requires zstandard)')
+    parser.add_argument('--level', type=int, default=None,
+                        help='Compression level (default depends on the format)')
+    parser.add_argument('--keep', action='store_true', default=False,
+                        help='Keep the uncompressed files')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of files compressed in parallel (default: one per CPU)')
+    args = parser.parse_args()
+    
+    if args.format == "zst" and zstandard is None:
+        print("Error: zst compression requires zstandard (pip install zstandard)")
+        return 1
+    
+    exit_code = 0
+    for folder in args.folders:
+        if not os.path.isdir(folder):
+            print(f"Skipping {folder}: not a folder")
+            continue
+        
+        stats = compress_tree(folder, args.format, args.level, args.keep, args.workers)
+        ratio = stats["compressed_bytes"] / stats["original_bytes"] if stats["original_bytes"] else 0
+        print(f"{folder}: compressed {stats['files']} files "
+              f"({stats['original_bytes'] / (1024 * 1024):.1f} MB -> {stats['compressed_bytes'] / (1024 * 1024):.1f} MB, "
+              f"{ratio:.1%}) in {stats['seconds']:.1f}s")
+        if stats["failed"]:
+            print(f"  {stats['failed']} files could not be compressed")
+            exit_code = 1
+    
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,36 +8,76 @@ for evaluating the alignment between observed and target behavior distributions.
 
 import numpy as np
 from scipy.special import kl_div
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 
-from ..config import BEHAVIOR_CATEGORIES, TARGET_DISTRIBUTION
+from ..config import (
+    BEHAVIOR_CATEGORIES,
+    TARGET_DISTRIBUTION,
+    GROUND_TRUTH_DISTRIBUTION,
+    METRICS,
+    BOOTSTRAP_RESAMPLES,
+    BOOTSTRAP_CONFIDENCE,
+    BOOTSTRAP_METRICS,
+    BOOTSTRAP_SEED
+)
+from .running_stats import StatisticsAccumulator
 
 
-def calculate_distribution_metrics(observed_dist: Dict[str, float], 
-                                 ground_truth_dist: Dict[str, float]) -> Dict[str, float]:
+# Metrics returned by the distribution metric functions
+DISTRIBUTION_METRIC_NAMES = [
+    "kl_divergence", "reverse_kl", "js_divergence", "entropy_gap", "tvd",
+    "ground_truth_entropy", "observed_entropy"
+]
+
+
+def distributions_to_array(distributions: List[Dict[str, float]]) -> np.ndarray:
     """
-    Calculate various metrics between observed and ground truth distributions.
+    Stack behavior distributions into an array aligned to BEHAVIOR_CATEGORIES.
     
     Args:
-        observed_dist: Dictionary mapping behavior categories to observed proportions
-        ground_truth_dist: Dictionary mapping behavior categories to target proportions
+        distributions: Dictionaries mapping behavior categories to proportions
         
     Returns:
-        Dictionary containing calculated metrics
+        Array of shape (len(distributions), len(BEHAVIOR_CATEGORIES)); missing categories are 0
     """
-    # Ensure both distributions have the same categories
-    categories = BEHAVIOR_CATEGORIES
+    return np.array([[dist.get(cat, 0.0) for cat in BEHAVIOR_CATEGORIES] for dist in distributions],
+                    dtype=float).reshape(len(distributions), len(BEHAVIOR_CATEGORIES))
+
+
+def _normalize_distributions(dists: np.ndarray) -> np.ndarray:
+    """Normalize distributions along the last axis (all-zero distributions become uniform)."""
+    totals = dists.sum(axis=-1, keepdims=True)
+    uniform = np.full_like(dists, 1.0 / dists.shape[-1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = np.where(totals > 0, dists / totals, uniform)
     
-    # Create normalized probability distributions
-    p = np.array([ground_truth_dist.get(cat, 0.0) for cat in categories])
-    q = np.array([observed_dist.get(cat, 0.0) for cat in categories])
+    # Distributions that already sum to one are kept as they are
+    return np.where(np.abs(totals - 1.0) > 1e-10, normalized, dists)
+
+
+def calculate_distribution_metrics_batch(observed: np.ndarray,
+                                         ground_truth: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Calculate distribution metrics for many observed distributions at once.
+    
+    The last axis of observed holds the proportions of BEHAVIOR_CATEGORIES, so a 2-D array can
+    hold one distribution per iteration and a 3-D array one per run and iteration (or per
+    iteration and top-k setting). All metrics are computed in one vectorized pass.
+    
+    Args:
+        observed: Array of shape (..., len(BEHAVIOR_CATEGORIES)) of observed proportions
+        ground_truth: Target proportions broadcastable to observed (TARGET_DISTRIBUTION if None)
+        
+    Returns:
+        Dictionary mapping each name in DISTRIBUTION_METRIC_NAMES to an array of shape observed.shape[:-1]
+    """
+    if ground_truth is None:
+        ground_truth = distributions_to_array([TARGET_DISTRIBUTION])[0]
     
-    # Normalize if not already normalized
-    if abs(sum(p) - 1.0) > 1e-10:
-        p = p / sum(p) if sum(p) > 0 else np.ones(len(p)) / len(p)
-    if abs(sum(q) - 1.0) > 1e-10:
-        q = q / sum(q) if sum(q) > 0 else np.ones(len(q)) / len(q)
+    q = _normalize_distributions(np.asarray(observed, dtype=float))
+    p = _normalize_distributions(np.asarray(ground_truth, dtype=float))
+    p, q = np.broadcast_arrays(p, q)
     
     # Add small epsilon to avoid division by zero
     epsilon = 1e-10
@@ -45,149 +85,345 @@ def calculate_distribution_metrics(observed_dist: Dict[str, float],
     q = q + epsilon
     
     # Renormalize
-    p = p / sum(p)
-    q = q / sum(q)
+    p = p / p.sum(axis=-1, keepdims=True)
+    q = q / q.sum(axis=-1, keepdims=True)
     
     # Calculate KL divergence using scipy
-    kl_pq = np.sum(kl_div(p, q))
-    kl_qp = np.sum(kl_div(q, p))
+    kl_pq = np.sum(kl_div(p, q), axis=-1)
+    kl_qp = np.sum(kl_div(q, p), axis=-1)
     
     # Calculate Jensen-Shannon Divergence
     # JS = 0.5 * (KL(P||M) + KL(Q||M)) where M = 0.5 * (P + Q)
     m = 0.5 * (p + q)
-    js_divergence = 0.5 * (np.sum(kl_div(p, m)) + np.sum(kl_div(q, m)))
+    js_divergence = 0.5 * (np.sum(kl_div(p, m), axis=-1) + np.sum(kl_div(q, m), axis=-1))
     
     # Calculate entropy of each distribution
-    entropy_p = -np.sum(p * np.log(p))
-    entropy_q = -np.sum(q * np.log(q))
-    
-    # Entropy Gap (ΔH) - difference in entropy
-    entropy_gap = entropy_p - entropy_q
-    
-    # Total Variation Distance - 0.5 * L1 norm
-    tvd = 0.5 * np.sum(np.abs(p - q))
+    entropy_p = -np.sum(p * np.log(p), axis=-1)
+    entropy_q = -np.sum(q * np.log(q), axis=-1)
     
     return {
         "kl_divergence": kl_pq,
         "reverse_kl": kl_qp,
         "js_divergence": js_divergence,
-        "entropy_gap": entropy_gap,
-        "tvd": tvd,
+        # Entropy Gap (ΔH) - difference in entropy
+        "entropy_gap": entropy_p - entropy_q,
+        # Total Variation Distance - 0.5 * L1 norm
+        "tvd": 0.5 * np.sum(np.abs(p - q), axis=-1),
         "ground_truth_entropy": entropy_p,
         "observed_entropy": entropy_q
     }
 
 
-def calculate_statistics(optimization_data: Dict[str, Any]) -> tuple:
+def calculate_distribution_metrics_many(observed_dists: List[Dict[str, float]],
+                                        ground_truth_dist: Dict[str, float]) -> List[Dict[str, float]]:
+    """
+    Calculate the metrics of several observed distributions against one ground truth.
+    
+    Args:
+        observed_dists: Dictionaries mapping behavior categories to observed proportions
+        ground_truth_dist: Dictionary mapping behavior categories to target proportions
+        
+    Returns:
+        List of metric dictionaries, one per observed distribution
+    """
+    batch = calculate_distribution_metrics_batch(
+        distributions_to_array(observed_dists), distributions_to_array([ground_truth_dist])[0]
+    )
+    return [{name: batch[name][i] for name in DISTRIBUTION_METRIC_NAMES} for i in range(len(observed_dists))]
+
+
+def calculate_distribution_metrics(observed_dist: Dict[str, float], 
+                                 ground_truth_dist: Dict[str, float]) -> Dict[str, float]:
+    """
+    Calculate various metrics between observed and ground truth distributions.
+    
+    Args:
+        observed_dist: Dictionary mapping behavior categories to observed proportions
+        ground_truth_dist: Dictionary mapping behavior categories to target proportions
+        
+    Returns:
+        Dictionary containing calculated metrics
+    """
+    return calculate_distribution_metrics_many([observed_dist], ground_truth_dist)[0]
+
+
+def calculate_statistics(optimization_data: Dict[str, Any], bootstrap_resamples: int = 0,
+                         confidence: float = BOOTSTRAP_CONFIDENCE, seed: Optional[int] = BOOTSTRAP_SEED) -> tuple:
     """
     Calculate statistics across multiple optimization runs.
     
     Args:
         optimization_data: Dictionary containing optimization run data
+        bootstrap_resamples: Number of agent resamples for bootstrap confidence intervals of
+            BOOTSTRAP_METRICS (no intervals if 0)
+        confidence: Confidence level of the bootstrap intervals
+        seed: Seed of the bootstrap resampling (fresh randomness if None)
         
     Returns:
-        Tuple of (metrics_stats, behavior_stats)
-    """
-    # Find the maximum number of iterations across all runs
-    max_iterations = 0
-    for run_name, run_data in optimization_data.items():
-        if run_data["iterations"]:
-            max_iterations = max(max_iterations, max(run_data["iterations"].keys()))
-    
-    # Initialize data structures for statistics
-    metrics_by_iteration = defaultdict(lambda: defaultdict(list))
-    behavior_dist_by_iteration = defaultdict(lambda: defaultdict(list))
-    
-    # Collect data from all runs
-    for run_name, run_data in optimization_data.items():
-        for iteration_num, iteration_data in run_data["iterations"].items():
-            # Collect metrics
-            for metric_name, metric_value in iteration_data["metrics"].items():
-                metrics_by_iteration[iteration_num][metric_name].append(metric_value)
-            
-            # Collect behavior distributions
-            for category, value in iteration_data["behavior_distribution"].items():
-                behavior_dist_by_iteration[iteration_num][category].append(value)
-    
-    # Calculate statistics for metrics
-    metrics_stats = {}
-    for iteration_num in range(1, max_iterations + 1):
-        metrics_stats[iteration_num] = {}
-        for metric_name in ["kl_divergence", "js_divergence", "entropy_gap", "tvd"]:
-            values = metrics_by_iteration[iteration_num][metric_name]
-            if values:
-                metrics_stats[iteration_num][metric_name] = {
-                    "mean": np.mean(values),
-                    "std": np.std(values),
-                    "min": np.min(values),
-                    "max": np.max(values),
-                    "values": values
-                }
-    
-    # Calculate statistics for behavior distributions
-    behavior_stats = {}
-    for iteration_num in range(1, max_iterations + 1):
-        behavior_stats[iteration_num] = {}
-        for category in BEHAVIOR_CATEGORIES:
-            values = behavior_dist_by_iteration[iteration_num][category]
-            if values:
-                behavior_stats[iteration_num][category] = {
-                    "mean": np.mean(values),
-                    "std": np.std(values),
-                    "min": np.min(values),
-                    "max": np.max(values),
-                    "values": values
-                }
+        Tuple of (metrics_stats, behavior_stats) mapping iterations to metrics (or behavior
+        categories) to mean, std, sem, min, max and n. With bootstrapping, metric statistics
+        also hold ci_lower and ci_upper.
+    """
+    # Statistics are accumulated run by run, without keeping the values of every run
+    metrics_accumulator, behavior_accumulator = StatisticsAccumulator(), StatisticsAccumulator()
+    for run_data in optimization_data.values():
+        accumulate_run_statistics(run_data, metrics_accumulator, behavior_accumulator)
+    
+    metrics_stats, behavior_stats = summarize_run_statistics(metrics_accumulator, behavior_accumulator)
+    
+    if bootstrap_resamples > 0:
+        intervals = bootstrap_metric_intervals(optimization_data, bootstrap_resamples, confidence, seed=seed)
+        for iteration_num, iteration_intervals in intervals.items():
+            for metric_name, interval in iteration_intervals.items():
+                if metric_name in metrics_stats.get(iteration_num, {}):
+                    metrics_stats[iteration_num][metric_name].update(interval)
     
     return metrics_stats, behavior_stats
 
 
-def calculate_topk_distribution(agent_results: Dict[str, Any], k: int = 1) -> Dict[str, float]:
+def accumulate_run_statistics(run_data: Dict[str, Any],
+                              metrics_accumulator: Optional[StatisticsAccumulator] = None,
+                              behavior_accumulator: Optional[StatisticsAccumulator] = None
+                              ) -> Tuple[StatisticsAccumulator, StatisticsAccumulator]:
     """
-    Calculate the distribution using top-k credit sharing approach.
+    Add the metrics and behavior distributions of one optimization run to running statistics.
     
-    For each agent, the top k categories in the ranking get 1/k credit each.
-    This creates a "softer" distribution that accounts for uncertainty in classification.
+    Args:
+        run_data: Data of one run ({"iterations": {...}}) as loaded by load_optimization_run_data
+        metrics_accumulator: Accumulator of metrics by iteration (a new one if None)
+        behavior_accumulator: Accumulator of behavior proportions by iteration (a new one if None)
+        
+    Returns:
+        Tuple of (metrics_accumulator, behavior_accumulator)
+    """
+    metrics_accumulator = metrics_accumulator if metrics_accumulator is not None else StatisticsAccumulator()
+    behavior_accumulator = behavior_accumulator if behavior_accumulator is not None else StatisticsAccumulator()
+    
+    for iteration_num, iteration_data in run_data["iterations"].items():
+        metrics_accumulator.update(iteration_num, iteration_data["metrics"])
+        behavior_accumulator.update(iteration_num, iteration_data.get("behavior_distribution", {}))
+    
+    return metrics_accumulator, behavior_accumulator
+
+
+def summarize_run_statistics(metrics_accumulator: StatisticsAccumulator,
+                             behavior_accumulator: StatisticsAccumulator) -> tuple:
+    """
+    Convert running statistics into the statistics returned by calculate_statistics.
     
     Args:
-        agent_results: Dictionary of agent classification results
-        k: Number of top ranks to consider (default: 1, equivalent to hard voting)
+        metrics_accumulator: Accumulator of metrics by iteration
+        behavior_accumulator: Accumulator of behavior proportions by iteration
         
     Returns:
-        Dictionary mapping categories to their credit-shared proportions
+        Tuple of (metrics_stats, behavior_stats) covering iterations 1 to the last iteration seen,
+        each cell holding mean, std, sem, min, max and n
     """
-    # Initialize counts for each category
-    category_credits = {category: 0.0 for category in BEHAVIOR_CATEGORIES}
+    max_iterations = max(metrics_accumulator.groups + behavior_accumulator.groups, default=0)
+    iterations = range(1, max_iterations + 1)
     
-    # Count valid agents (those with rankings)
-    valid_agents = 0
+    metrics_stats = metrics_accumulator.summary(METRICS, iterations)
+    behavior_stats = behavior_accumulator.summary(BEHAVIOR_CATEGORIES, iterations)
+    return metrics_stats, behavior_stats
+
+
+def build_behavior_count_array(optimization_data: Dict[str, Any]) -> Tuple[List[str], List[int], np.ndarray]:
+    """
+    Count the classified behaviors of every run and iteration.
     
-    for agent_name, agent_data in agent_results.items():
-        behavior_data = agent_data.get("behavior", {})
+    Args:
+        optimization_data: Dictionary containing optimization run data
         
-        # Get the ranking if available
-        ranking = behavior_data.get("ranking", [])
+    Returns:
+        Tuple of (run names, iteration numbers, counts), where counts has shape
+        (runs, iterations, len(BEHAVIOR_CATEGORIES)) and is zero for missing iterations
+    """
+    run_names = list(optimization_data)
+    iterations = sorted({iteration for run_data in optimization_data.values() for iteration in run_data["iterations"]})
+    iteration_index = {iteration: i for i, iteration in enumerate(iterations)}
+    category_codes = {category: code for code, category in enumerate(BEHAVIOR_CATEGORIES)}
+    
+    counts = np.zeros((len(run_names), len(iterations), len(BEHAVIOR_CATEGORIES)), dtype=np.int64)
+    for r, run_name in enumerate(run_names):
+        for iteration, iteration_data in optimization_data[run_name]["iterations"].items():
+            agent_behaviors = iteration_data.get("agent_behaviors") or {}
+            if agent_behaviors:
+                codes = [category_codes[behavior] for behavior in agent_behaviors.values() if behavior in category_codes]
+                counts[r, iteration_index[iteration]] = np.bincount(codes, minlength=len(BEHAVIOR_CATEGORIES))
+            else:
+                # Without per-agent classifications, recover the counts from the distribution
+                distribution = iteration_data.get("behavior_distribution", {})
+                total_agents = iteration_data.get("total_agents", 0)
+                counts[r, iteration_index[iteration]] = np.rint(
+                    [distribution.get(category, 0.0) * total_agents for category in BEHAVIOR_CATEGORIES]
+                )
+    
+    return run_names, iterations, counts
+
+
+def bootstrap_metric_intervals(optimization_data: Dict[str, Any], n_resamples: int = BOOTSTRAP_RESAMPLES,
+                               confidence: float = BOOTSTRAP_CONFIDENCE,
+                               metric_names: List[str] = BOOTSTRAP_METRICS,
+                               seed: Optional[int] = BOOTSTRAP_SEED) -> Dict[int, Dict[str, Dict[str, float]]]:
+    """
+    Calculate bootstrap confidence intervals of the mean alignment metrics of each iteration.
+    
+    The agents of every run are resampled with replacement within each iteration, which is
+    the same as drawing the behavior counts from a multinomial distribution. All resamples of
+    an iteration are drawn and scored at once, and the metric is averaged over runs in each
+    resample.
+    
+    Divergences computed from resampled counts are biased upward (sampling noise only ever adds
+    distance to the ground truth), so the plain percentile interval can lie entirely above the
+    estimate. The percentile interval is therefore shifted down by the bootstrap estimate of
+    that bias and clipped at 0. The bias is measured at the median of the resamples, which is
+    robust to the heavy tail of KL divergence and keeps the estimate inside the interval.
+    
+    Args:
+        optimization_data: Dictionary containing optimization run data
+        n_resamples: Number of bootstrap resamples
+        confidence: Confidence level of the intervals
+        metric_names: Metrics to calculate intervals for (non-negative divergences)
+        seed: Seed of the random generator (fresh randomness if None). Each iteration draws from
+            its own stream derived from the seed and the iteration number, so the interval of an
+            iteration does not change when later iterations are added.
         
-        # Skip agents without ranking data
-        if not ranking:
+    Returns:
+        Dictionary mapping iteration numbers to metric names to ci_lower, ci_upper, ci_level,
+        bootstrap_std and bootstrap_bias
+    """
+    _, iterations, counts = build_behavior_count_array(optimization_data)
+    ground_truth = distributions_to_array([GROUND_TRUTH_DISTRIBUTION])[0]
+    tail = (1.0 - confidence) / 2 * 100
+    
+    intervals = {}
+    for i, iteration in enumerate(iterations):
+        iteration_counts = counts[:, i]
+        totals = iteration_counts.sum(axis=-1)
+        iteration_counts = iteration_counts[totals > 0]
+        totals = totals[totals > 0]
+        if len(totals) == 0:
             continue
-            
-        valid_agents += 1
         
-        # Assign credit to top-k categories
-        for i in range(min(k, len(ranking))):
-            category = ranking[i]
-            # Verify the category is valid
-            if category in BEHAVIOR_CATEGORIES:
-                category_credits[category] += 1.0 / k
+        # Point estimates from the same counts, shape (runs,)
+        observed_metrics = calculate_distribution_metrics_batch(iteration_counts, ground_truth)
+        
+        # Shape (n_resamples, runs, categories)
+        rng = np.random.default_rng(None if seed is None else [seed, int(iteration)])
+        resampled = rng.multinomial(totals, iteration_counts / totals[:, None], size=(n_resamples, len(totals)))
+        resampled_metrics = calculate_distribution_metrics_batch(resampled, ground_truth)
+        
+        intervals[iteration] = {}
+        for metric_name in metric_names:
+            estimate = float(observed_metrics[metric_name].mean())
+            run_means = resampled_metrics[metric_name].mean(axis=1)
+            lower, median, upper = np.percentile(run_means, [tail, 50, 100 - tail])
+            bias = float(median) - estimate
+            intervals[iteration][metric_name] = {
+                "ci_lower": max(float(lower) - bias, 0.0),
+                "ci_upper": float(upper) - bias,
+                "ci_level": confidence,
+                "bootstrap_std": float(run_means.std()),
+                "bootstrap_bias": bias
+            }
+    
+    return intervals
+
+
+def build_rank_matrix(agent_results: Dict[str, Any], max_rank: Optional[int] = None) -> np.ndarray:
+    """
+    Encode the behavior rankings of agents as a matrix of category codes.
+    
+    Args:
+        agent_results: Dictionary of agent classification results
+        max_rank: Number of rank positions to keep (the longest ranking if None)
+        
+    Returns:
+        Array of shape (agents with a ranking, rank positions) holding indices into
+        BEHAVIOR_CATEGORIES; -1 marks positions past the end of a ranking and unknown categories
+    """
+    rankings = []
+    for agent_data in agent_results.values():
+        ranking = agent_data.get("behavior", {}).get("ranking", [])
+        if ranking:
+            rankings.append(ranking)
+    
+    if max_rank is None:
+        max_rank = max((len(ranking) for ranking in rankings), default=0)
+    
+    category_codes = {category: code for code, category in enumerate(BEHAVIOR_CATEGORIES)}
+    rank_matrix = np.full((len(rankings), max_rank), -1, dtype=np.int8)
+    for row, ranking in enumerate(rankings):
+        for position, category in enumerate(ranking[:max_rank]):
+            rank_matrix[row, position] = category_codes.get(category, -1)
+    
+    return rank_matrix
+
+
+def calculate_topk_distribution_array(rank_matrix: np.ndarray, k_values: List[int]) -> np.ndarray:
+    """
+    Calculate top-k credit sharing distributions for several k from a rank matrix.
+    
+    The categories at each rank position are counted once; a cumulative sum over rank positions
+    then gives the top-k counts of every k.
+    
+    Args:
+        rank_matrix: Category codes from build_rank_matrix
+        k_values: Numbers of top ranks to consider
+        
+    Returns:
+        Array of shape (len(k_values), len(BEHAVIOR_CATEGORIES)) of credit-shared proportions
+    """
+    num_agents, max_rank = rank_matrix.shape
+    num_categories = len(BEHAVIOR_CATEGORIES)
+    k_array = np.asarray(k_values)
+    if num_agents == 0:
+        return np.zeros((len(k_array), num_categories))
+    
+    # Number of agents ranking each category at each position
+    valid = rank_matrix >= 0
+    positions = np.nonzero(valid)[1]
+    counts = np.bincount(positions * num_categories + rank_matrix[valid],
+                         minlength=max_rank * num_categories).reshape(max_rank, num_categories)
+    
+    # Row r holds how often each category appears within the top r ranks (row 0 is empty)
+    cumulative = np.vstack([np.zeros((1, num_categories), dtype=counts.dtype), np.cumsum(counts, axis=0)])
+    
+    # Each of the top k categories gets 1/k credit; proportions are relative to the ranked agents
+    return cumulative[np.minimum(k_array, max_rank)] / (k_array[:, None] * num_agents)
+
+
+def calculate_topk_distributions(agent_results: Dict[str, Any], k_values: List[int]) -> Dict[int, Dict[str, float]]:
+    """
+    Calculate the top-k credit sharing distributions of several k in one pass over the rankings.
+    
+    Args:
+        agent_results: Dictionary of agent classification results
+        k_values: Numbers of top ranks to consider
+        
+    Returns:
+        Dictionary mapping each k to a dictionary of category proportions
+    """
+    rank_matrix = build_rank_matrix(agent_results, max(k_values, default=0))
+    distributions = calculate_topk_distribution_array(rank_matrix, k_values)
+    return {k: dict(zip(BEHAVIOR_CATEGORIES, distribution.tolist())) for k, distribution in zip(k_values, distributions)}
+
+
+def calculate_topk_distribution(agent_results: Dict[str, Any], k: int = 1) -> Dict[str, float]:
+    """
+    Calculate the distribution using top-k credit sharing approach.
     
-    # Normalize by number of agents to get proportions
-    if valid_agents > 0:
-        category_distribution = {cat: credit / valid_agents for cat, credit in category_credits.items()}
-    else:
-        category_distribution = {cat: 0.0 for cat in BEHAVIOR_CATEGORIES}
+    For each agent, the top k categories in the ranking get 1/k credit each.
+    This creates a "softer" distribution that accounts for uncertainty in classification.
     
-    return category_distribution
+    Args:
+        agent_results: Dictionary of agent classification results
+        k: Number of top ranks to consider (default: 1, equivalent to hard voting)
+        
+    Returns:
+        Dictionary mapping categories to their credit-shared proportions
+    """
+    return calculate_topk_distributions(agent_results, [k])[k]
 
 
 def analyze_distribution_gap(analysis_data: Dict[str, Any], target_distribution: Dict[str, float] = TARGET_DISTRIBUTION) -> tuple:
@@ -237,3 +473,43 @@ def calculate_behavior_counts(agent_results: Dict[str, Any]) -> Dict[str, int]:
         behavior_counts[behavior] = behavior_counts.get(behavior, 0) + 1
     
     return behavior_counts
+
+
+def calculate_cascade_statistics(agent_results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Summarize which tier of the model cascade decided each agent.
+    
+    Args:
+        agent_results: Dictionary of agent classification results
+        
+    Returns:
+        Dictionary with per-tier counts, the escalation rate and how often the large model
+        agreed with the small model on escalated agents (empty if no cascade was used)
+    """
+    tiers = defaultdict(int)
+    models = {}
+    agreements = 0
+    
+    for agent_name, agent_data in agent_results.items():
+        behavior = agent_data.get("behavior", {})
+        cascade = behavior.get("cascade")
+        if not cascade:
+            continue
+        
+        tiers[cascade["tier"]] += 1
+        models[cascade["tier"]] = cascade.get("model")
+        if cascade["tier"] == "large" and cascade.get("small_model_classification") == behavior.get("classification"):
+            agreements += 1
+    
+    total = sum(tiers.values())
+    if total == 0:
+        return {}
+    
+    escalated = tiers["large"]
+    return {
+        "models": models,
+        "decided_by_small_model": tiers["small"],
+        "escalated_to_large_model": escalated,
+        "escalation_rate": escalated / total,
+        "agreement_after_escalation": agreements / escalated if escalated else None
+    }
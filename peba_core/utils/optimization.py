@@ -7,10 +7,20 @@ and behavior adjustment strategies.
 """
 
 import random
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional
 from collections import defaultdict
 
+import numpy as np
+
 from ..config import BEHAVIOR_CATEGORIES, TARGET_DISTRIBUTION
+from .data_loader import find_json_file, read_json_file
+from .behavior_matrix import (
+    BehaviorMatrix,
+    UNOBSERVED,
+    build_behavior_matrices,
+    encode_behaviors,
+    adjustment_outcomes
+)
 
 
 def identify_agents_to_adjust(analysis_data: Dict[str, Any], 
@@ -68,21 +78,26 @@ def identify_agents_to_adjust(analysis_data: Dict[str, Any],
 
 
 def calculate_optimization_effectiveness(optimization_data: Dict[str, Any], 
-                                      base_optimization_path: str) -> Dict[str, Any]:
+                                      base_optimization_path: str,
+                                      behavior_matrices: Optional[Dict[str, BehaviorMatrix]] = None) -> Dict[str, Any]:
     """
     Analyze the effectiveness of optimization by tracking agent behavior changes.
     
     Args:
         optimization_data: Dictionary containing optimization run data
         base_optimization_path: Base path where optimization runs are stored
+        behavior_matrices: Behavior matrices of the runs (built from optimization_data if None)
         
     Returns:
         Dictionary containing effectiveness analysis results
     """
     import os
-    import json
+    
+    if behavior_matrices is None:
+        behavior_matrices = build_behavior_matrices(optimization_data)
     
     effectiveness_results = {}
+    num_categories = len(BEHAVIOR_CATEGORIES)
     
     # Process each run separately
     for run_name, run_data in optimization_data.items():
@@ -91,9 +106,16 @@ def calculate_optimization_effectiveness(optimization_data: Dict[str, Any],
             print(f"Warning: Run {run_name} has fewer than 2 iterations, skipping effectiveness analysis")
             continue
         
+        behavior_matrix = behavior_matrices[run_name]
+        
         # Dictionary to store effectiveness data
         effectiveness_data = {}
         
+        # Codes of every adjustment of the run, for the vectorized summary
+        from_codes = []
+        target_codes = []
+        actual_codes = []
+        
         # For each iteration (except the last one), find agents that were adjusted
         for i in range(len(iterations) - 1):
             current_iter = iterations[i]
@@ -108,24 +130,17 @@ def calculate_optimization_effectiveness(optimization_data: Dict[str, Any],
             )
             
             # Skip if optimization log doesn't exist
-            if not os.path.exists(optimization_log_path):
+            if not find_json_file(optimization_log_path):
                 print(f"Warning: Optimization log not found for {run_name}, Iteration_{current_iter}")
                 continue
             
             try:
                 # Load the optimization log
-                with open(optimization_log_path, 'r', encoding='utf-8') as f:
-                    optimization_log = json.load(f)
-                
-                # Get the list of adjusted agents
-                adjusted_agents = optimization_log.get("agents_adjusted", [])
+                optimization_log = read_json_file(optimization_log_path)
                 
-                # Get agent behaviors for both iterations
-                current_behaviors = run_data["iterations"][current_iter].get("agent_behaviors", {})
-                next_behaviors = run_data["iterations"][next_iter].get("agent_behaviors", {})
-                
-                # Track each agent's behavior change
-                for agent_data in adjusted_agents:
+                # Keep the last adjustment of each agent in this iteration
+                adjustments = {}
+                for agent_data in optimization_log.get("agents_adjusted", []):
                     agent_name = agent_data.get("agent_name")
                     behavior_change = agent_data.get("behavior_change", {})
                     
@@ -133,59 +148,88 @@ def calculate_optimization_effectiveness(optimization_data: Dict[str, Any],
                     if not agent_name or not behavior_change:
                         continue
                     
-                    original_behavior = behavior_change.get("from")
-                    target_behavior = behavior_change.get("to")
-                    
-                    # Get the actual behavior in the next iteration
-                    actual_behavior = next_behaviors.get(agent_name)
-                    
-                    # Initialize agent data if not already present
-                    if agent_name not in effectiveness_data:
-                        effectiveness_data[agent_name] = {}
-                    
-                    # Store the behavior change data for this iteration
-                    effectiveness_data[agent_name][current_iter] = {
+                    adjustments[agent_name] = (behavior_change.get("from"), behavior_change.get("to"))
+                
+                if not adjustments:
+                    continue
+                
+                # Look up the actual behaviors of the adjusted agents in the next iteration at once
+                agent_names = list(adjustments)
+                targets = encode_behaviors([target for _, target in adjustments.values()])
+                actuals = behavior_matrix.behaviors_at(next_iter, agent_names)
+                successes = (actuals == targets) & (targets != UNOBSERVED)
+                
+                from_codes.append(encode_behaviors([original for original, _ in adjustments.values()]))
+                target_codes.append(targets)
+                actual_codes.append(actuals)
+                
+                # Store the behavior change data for this iteration, keeping the labels as logged
+                next_behaviors = run_data["iterations"][next_iter].get("agent_behaviors", {})
+                for agent_name, (original_behavior, target_behavior), success in zip(
+                        agent_names, adjustments.values(), successes):
+                    effectiveness_data.setdefault(agent_name, {})[current_iter] = {
                         "original_behavior": original_behavior,
                         "target_behavior": target_behavior,
-                        "actual_behavior": actual_behavior,
-                        "success": actual_behavior == target_behavior
+                        "actual_behavior": next_behaviors.get(agent_name),
+                        "success": bool(success)
                     }
             
             except Exception as e:
                 print(f"Error processing optimization log for {run_name}, Iteration_{current_iter}: {e}")
         
-        # Calculate success metrics
-        total_adjustments = 0
-        successful_adjustments = 0
+        # Count adjustments and successes per (original, target) behavior pair
+        if from_codes:
+            from_codes = np.concatenate(from_codes)
+            target_codes = np.concatenate(target_codes)
+            actual_codes = np.concatenate(actual_codes)
+        else:
+            from_codes = target_codes = actual_codes = np.empty(0, dtype=np.int8)
+        
+        transition_totals, transition_successes = adjustment_outcomes(from_codes, target_codes, actual_codes)
         
-        # Track success by behavior category
-        success_by_target = {category: {"total": 0, "success": 0} for category in BEHAVIOR_CATEGORIES}
+        # Per-target counts also include adjustments whose original behavior is unknown
+        valid_targets = target_codes != UNOBSERVED
+        target_totals = np.bincount(target_codes[valid_targets], minlength=num_categories)
+        target_successes = np.bincount(target_codes[valid_targets & (actual_codes == target_codes)],
+                                       minlength=num_categories)
         
-        for agent_name, iterations_data in effectiveness_data.items():
-            for iteration, change_data in iterations_data.items():
-                total_adjustments += 1
-                if change_data["success"]:
-                    successful_adjustments += 1
-                
-                target = change_data["target_behavior"]
-                if target in success_by_target:
-                    success_by_target[target]["total"] += 1
-                    if change_data["success"]:
-                        success_by_target[target]["success"] += 1
+        total_adjustments = len(target_codes)
+        successful_adjustments = int(target_successes.sum())
         
         # Calculate success rates
         overall_success_rate = successful_adjustments / total_adjustments if total_adjustments > 0 else 0
         
+        adjustments_by_target = {}
         success_rates_by_target = {}
-        for category, counts in success_by_target.items():
-            success_rates_by_target[category] = counts["success"] / counts["total"] if counts["total"] > 0 else 0
+        for code, category in enumerate(BEHAVIOR_CATEGORIES):
+            total, success = int(target_totals[code]), int(target_successes[code])
+            adjustments_by_target[category] = {"total": total, "success": success}
+            success_rates_by_target[category] = success / total if total > 0 else 0
+        
+        success_by_transition = {}
+        for from_code, to_code in zip(*np.nonzero(transition_totals)):
+            total, success = int(transition_totals[from_code, to_code]), int(transition_successes[from_code, to_code])
+            success_by_transition.setdefault(BEHAVIOR_CATEGORIES[from_code], {})[BEHAVIOR_CATEGORIES[to_code]] = {
+                "total": total,
+                "success": success,
+                "success_rate": success / total
+            }
+        
+        # Share of agents whose observed behavior changed after each iteration
+        flip_rates = {
+            iteration: (None if np.isnan(rate) else float(rate))
+            for iteration, rate in zip(behavior_matrix.iterations[:-1], behavior_matrix.flip_rates())
+        }
         
         # Add summary metrics to the data
         summary = {
             "total_adjustments": total_adjustments,
             "successful_adjustments": successful_adjustments,
             "overall_success_rate": overall_success_rate,
-            "success_rates_by_target": success_rates_by_target
+            "success_rates_by_target": success_rates_by_target,
+            "adjustments_by_target": adjustments_by_target,
+            "success_by_transition": success_by_transition,
+            "flip_rates": flip_rates
         }
         
         # Create the final effectiveness data structure
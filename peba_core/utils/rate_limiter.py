@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+"""
+Rate limiting utilities for PEBA-PEvo framework.
+
+This module provides a process-wide token-bucket limiter for requests-per-minute (RPM)
+and tokens-per-minute (TPM) quotas. Callers are queued until capacity is available
+instead of hitting the provider and failing with HTTP 429, and the buckets adapt to the
+x-ratelimit-* headers returned by the API.
+"""
+
+import re
+import time
+import asyncio
+import threading
+from typing import Dict, Any, Optional, Mapping
+
+from ..config import (
+    DEFAULT_RATE_LIMIT_RPM,
+    DEFAULT_RATE_LIMIT_TPM
+)
+
+
+# Process-wide limiters, shared by every LLMClient instance
+_rate_limiters: Dict[str, "RateLimiter"] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> "RateLimiter":
+    """
+    Get the shared rate limiter for a model, creating it on first use.
+    
+    Args:
+        model: Model name; quotas are tracked separately per model
+        
+    Returns:
+        RateLimiter shared across all clients in this process
+    """
+    with _rate_limiters_lock:
+        if model not in _rate_limiters:
+            _rate_limiters[model] = RateLimiter(DEFAULT_RATE_LIMIT_RPM, DEFAULT_RATE_LIMIT_TPM)
+        return _rate_limiters[model]
+
+
+def estimate_request_tokens(messages: list, config: Dict[str, Any]) -> int:
+    """
+    Estimate how many tokens a request counts against the TPM quota.
+    
+    The provider counts the prompt plus the requested max_tokens, so the estimate uses
+    roughly four characters per prompt token plus a small per-message overhead.
+    
+    Args:
+        messages: List of message dictionaries
+        config: Configuration for the API call
+        
+    Returns:
+        Estimated number of tokens
+    """
+    prompt_tokens = sum(len(message.get("content") or "") // 4 + 4 for message in messages)
+    return prompt_tokens + config.get("max_tokens", 0)
+
+
+def parse_reset_duration(value: str) -> Optional[float]:
+    """
+    Parse a rate limit reset header such as '1s', '6m0s' or '20ms' into seconds.
+    
+    Args:
+        value: Header value
+        
+    Returns:
+        Duration in seconds, or None if the value cannot be parsed
+    """
+    matches = re.findall(r"([\d.]+)(ms|h|m|s)", value or "")
+    if not matches:
+        return None
+    
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(amount) * units[unit] for amount, unit in matches)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to a per-minute capacity."""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+    
+    @property
+    def refill_rate(self) -> float:
+        """Refill rate in units per second."""
+        return self.capacity / 60.0
+    
+    def refill(self, now: float):
+        """Add the capacity accrued since the last update."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.refill_rate)
+        self.updated = now
+    
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Reserve capacity, possibly going into debt.
+        
+        Returns:
+            Seconds the caller has to wait until the reservation is covered
+        """
+        self.refill(now)
+        # Never ask for more than the bucket can ever hold, otherwise the caller would wait forever
+        amount = min(amount, self.capacity)
+        self.level -= amount
+        return max(0.0, -self.level / self.refill_rate)
+
+
+class RateLimiter:
+    """RPM/TPM limiter that queues callers until the request fits within the quota."""
+    
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        """
+        Initialize the limiter.
+        
+        Args:
+            requests_per_minute: Initial request quota
+            tokens_per_minute: Initial token quota
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def reserve(self, estimated_tokens: int) -> float:
+        """
+        Reserve one request and the estimated tokens without waiting.
+
+        Args:
+            estimated_tokens: Estimated tokens of the request
+
+        Returns:
+            Seconds the caller has to wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self.requests.reserve(1, now),
+                self.tokens.reserve(estimated_tokens, now),
+                self.paused_until - now
+            )
+        return wait
+    
+    def acquire(self, estimated_tokens: int):
+        """
+        Block the calling thread until the request fits within the quota.
+        
+        Args:
+            estimated_tokens: Estimated tokens of the request
+        """
+        wait = self.reserve(estimated_tokens)
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self, estimated_tokens: int):
+        """
+        Asynchronously wait until the request fits within the quota.
+        
+        Args:
+            estimated_tokens: Estimated tokens of the request
+        """
+        wait = self.reserve(estimated_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Refund (or charge) the difference between the estimated and actual token usage.
+        
+        Args:
+            estimated_tokens: Tokens reserved before the request
+            actual_tokens: Tokens reported in the response
+        """
+        with self._lock:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated_tokens - actual_tokens)
+    
+    def pause(self, seconds: float):
+        """
+        Hold back every caller for a while, e.g. after the provider returned HTTP 429.
+        
+        Args:
+            seconds: Pause duration
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+    
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Adapt quotas and current levels to the x-ratelimit-* response headers.
+        
+        Args:
+            headers: Response headers of an API call
+        """
+        if not headers:
+            return
+        
+        with self._lock:
+            now = time.monotonic()
+            for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+                limit = headers.get(f"x-ratelimit-limit-{kind}")
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                
+                try:
+                    if limit is not None:
+                        bucket.refill(now)
+                        bucket.capacity = float(limit)
+                        bucket.level = min(bucket.level, bucket.capacity)
+                    if remaining is not None:
+                        # The provider's view wins when it has less capacity left than we think
+                        bucket.refill(now)
+                        bucket.level = min(bucket.level, float(remaining))
+                        if float(remaining) <= 0 and reset:
+                            self.paused_until = max(self.paused_until, now + reset)
+                except ValueError:
+                    continue
+    
+    def get_status(self) -> Dict[str, float]:
+        """
+        Get the current quotas and levels.
+        
+        Returns:
+            Dictionary with request and token capacities and levels
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                "requests_per_minute": self.requests.capacity,
+                "tokens_per_minute": self.tokens.capacity,
+                "available_requests": self.requests.level,
+                "available_tokens": self.tokens.level
+            }
@@ -137,6 +137,9 @@ def export_data_as_csv(metrics_stats: Dict[int, Dict[str, Any]], behavior_stats:
                 row[f"{metric_name}_std"] = stats["std"]
                 row[f"{metric_name}_min"] = stats["min"]
                 row[f"{metric_name}_max"] = stats["max"]
+                if "ci_lower" in stats:
+                    row[f"{metric_name}_ci_lower"] = stats["ci_lower"]
+                    row[f"{metric_name}_ci_upper"] = stats["ci_upper"]
         metrics_data.append(row)
     
     metrics_df = pd.DataFrame(metrics_data)
@@ -311,7 +314,9 @@ def generate_label_studio_data(agent_results: Dict[str, Any], output_file: str,
 def print_behavior_summary(behavior_counts: Dict[str, int], distribution_metrics: Optional[Dict[str, float]] = None, 
                           topk_metrics: Optional[Dict[int, Dict[str, float]]] = None, 
                           token_usage: Optional[Dict[str, Any]] = None, 
-                          unity_token_usage: Optional[Dict[str, Any]] = None):
+                          unity_token_usage: Optional[Dict[str, Any]] = None,
+                          cache_stats: Optional[Dict[str, Any]] = None,
+                          cascade_stats: Optional[Dict[str, Any]] = None):
     """
     Print a comprehensive behavior classification summary to console.
     
@@ -321,6 +326,8 @@ def print_behavior_summary(behavior_counts: Dict[str, int], distribution_metrics
         topk_metrics: Optional top-k metrics
         token_usage: Optional API token usage statistics
         unity_token_usage: Optional Unity token usage statistics
+        cache_stats: Optional LLM response cache statistics
+        cascade_stats: Optional model cascade statistics
     """
     print("\nBehavior Classification Summary:")
     print("-" * 40)
@@ -345,9 +352,31 @@ def print_behavior_summary(behavior_counts: Dict[str, int], distribution_metrics
         print("-" * 40)
         print(f"Total API Requests: {token_usage.get('total_requests', 'N/A')}")
         print(f"Prompt Tokens: {token_usage.get('prompt_tokens', 'N/A')}")
+        if "cached_tokens" in token_usage:
+            prompt_tokens = token_usage.get("prompt_tokens", 0)
+            cached_ratio = token_usage["cached_tokens"] / prompt_tokens if prompt_tokens else 0
+            print(f"Cached Prompt Tokens: {token_usage['cached_tokens']} ({cached_ratio * 100:.1f}% prompt cache hit ratio)")
         print(f"Completion Tokens: {token_usage.get('completion_tokens', 'N/A')}")
         print(f"Total Tokens: {token_usage.get('total_tokens', 'N/A')}")
     
+    if cache_stats:
+        print("\nResponse Cache:")
+        print("-" * 40)
+        print(f"Hits: {cache_stats['hits']}")
+        print(f"Misses: {cache_stats['misses']}")
+        print(f"Hit Rate: {cache_stats['hit_rate'] * 100:.1f}%")
+        print(f"Entries: {cache_stats['entries']} ({cache_stats['size_bytes'] / 1024:.1f} KB)")
+    
+    if cascade_stats:
+        print("\nModel Cascade:")
+        print("-" * 40)
+        models = cascade_stats.get("models", {})
+        print(f"Decided by small model ({models.get('small', 'N/A')}): {cascade_stats['decided_by_small_model']}")
+        print(f"Escalated to large model ({models.get('large', 'N/A')}): {cascade_stats['escalated_to_large_model']} "
+              f"({cascade_stats['escalation_rate'] * 100:.1f}%)")
+        if cascade_stats["agreement_after_escalation"] is not None:
+            print(f"Small/large agreement on escalated agents: {cascade_stats['agreement_after_escalation'] * 100:.1f}%")
+    
     if unity_token_usage:
         print("\nUnity Token Usage:")
         print("-" * 40)
@@ -393,6 +422,8 @@ def print_optimization_summary(observed_dist: Dict[str, float], distribution_gap
     print("-" * 40)
     print(f"Total API Requests: {token_usage.get('total_requests', 0)}")
     print(f"Prompt Tokens: {token_usage.get('prompt_tokens', 0)}")
+    if "cached_tokens" in token_usage:
+        print(f"Cached Prompt Tokens: {token_usage['cached_tokens']}")
     print(f"Completion Tokens: {token_usage.get('completion_tokens', 0)}")
     print(f"Total Tokens: {token_usage.get('total_tokens', 0)}")
     
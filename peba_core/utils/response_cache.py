@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Persistent LLM response cache for PEBA-PEvo framework.
+
+This module provides an on-disk, content-addressed cache for chat completion responses
+so that re-analyzing the same simulation does not pay again for identical prompts.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from ..config import (
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_SIZE_MB,
+    LLM_CACHE_MAX_AGE_DAYS
+)
+
+
+def compute_cache_key(messages: list, config: Dict[str, Any]) -> str:
+    """
+    Compute a content hash identifying an API request.
+    
+    Args:
+        messages: List of message dictionaries
+        config: Configuration for the API call (model, temperature, ...)
+        
+    Returns:
+        Hex digest uniquely identifying the request
+    """
+    payload = json.dumps({"messages": messages, "config": config}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(config: Dict[str, Any]) -> bool:
+    """
+    Check whether responses for a configuration are deterministic enough to cache.
+    
+    Args:
+        config: Configuration for the API call
+        
+    Returns:
+        True if the configuration uses temperature 0
+    """
+    return config.get("temperature", 1.0) == 0
+
+
+class ResponseCache:
+    """SQLite-backed cache of LLM responses keyed by a hash of messages and model config."""
+    
+    # Number of writes between eviction passes
+    EVICTION_INTERVAL = 100
+    
+    def __init__(self, cache_path: str = LLM_CACHE_PATH, max_size_mb: float = LLM_CACHE_MAX_SIZE_MB,
+                 max_age_days: float = LLM_CACHE_MAX_AGE_DAYS):
+        """
+        Open (or create) the response cache.
+        
+        Args:
+            cache_path: Path to the SQLite database file
+            max_size_mb: Maximum total size of cached responses before least recently used entries are evicted
+            max_age_days: Maximum age of a cached response before it is evicted
+        """
+        self.cache_path = cache_path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 3600
+        
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_eviction = 0
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        self._conn = sqlite3.connect(cache_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                content TEXT NOT NULL,
+                token_usage TEXT,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_accessed ON responses (last_accessed)")
+        self._conn.commit()
+        
+        self.evict()
+    
+    def get(self, key: str) -> Optional[Tuple[str, Optional[Dict[str, int]]]]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Cache key from compute_cache_key
+            
+        Returns:
+            Tuple of (response_content, original_token_usage), or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, token_usage, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None or now - row[2] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            
+            self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        
+        content, token_usage = row[0], row[1]
+        return content, json.loads(token_usage) if token_usage else None
+    
+    def put(self, key: str, content: str, token_usage: Optional[Dict[str, int]], model: str = ""):
+        """
+        Store a response in the cache.
+        
+        Args:
+            key: Cache key from compute_cache_key
+            content: Response content to store
+            token_usage: Token usage of the original request
+            model: Model name, kept for inspection
+        """
+        now = time.time()
+        usage_text = json.dumps(token_usage) if token_usage else None
+        size = len(content.encode("utf-8")) + len(usage_text or "")
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, token_usage, size, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, content, usage_text, size, now, now)
+            )
+            self._conn.commit()
+            self._writes_since_eviction += 1
+            run_eviction = self._writes_since_eviction >= self.EVICTION_INTERVAL
+        
+        if run_eviction:
+            self.evict()
+    
+    def delete(self, key: str):
+        """
+        Remove a response from the cache.
+        
+        Args:
+            key: Cache key from compute_cache_key
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def evict(self) -> int:
+        """
+        Remove expired entries, then least recently used entries until the cache fits its size budget.
+        
+        Returns:
+            Number of evicted entries
+        """
+        with self._lock:
+            self._writes_since_eviction = 0
+            
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            )
+            evicted = cursor.rowcount
+            
+            total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total_size > self.max_size_bytes:
+                excess = total_size - self.max_size_bytes
+                freed = 0
+                stale_keys = []
+                for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_accessed"):
+                    if freed >= excess:
+                        break
+                    stale_keys.append((key,))
+                    freed += size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+                evicted += len(stale_keys)
+            
+            self._conn.commit()
+        
+        return evicted
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache hit/miss counters and current size.
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries and size_bytes
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups > 0 else 0.0,
+            "entries": entries,
+            "size_bytes": size
+        }
+    
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
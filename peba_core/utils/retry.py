@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Retry utilities for PEBA-PEvo framework.
+
+This module classifies API errors into transient and permanent failures, computes
+exponential backoff delays with jitter, and provides a process-wide circuit breaker
+that holds back all workers while the provider is degraded.
+"""
+
+import time
+import random
+import threading
+from typing import Dict
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    APIStatusError,
+    RateLimitError
+)
+
+from ..config import (
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_MAX_DELAY,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_COOLDOWN_SECONDS
+)
+
+
+# Process-wide circuit breakers, shared by every LLMClient instance
+_circuit_breakers: Dict[str, "CircuitBreaker"] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> "CircuitBreaker":
+    """
+    Get the shared circuit breaker for a model, creating it on first use.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        CircuitBreaker shared across all clients in this process
+    """
+    with _circuit_breakers_lock:
+        if model not in _circuit_breakers:
+            _circuit_breakers[model] = CircuitBreaker()
+        return _circuit_breakers[model]
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Decide whether a failed API call is worth retrying.
+    
+    Rate limits, server errors, timeouts and connection problems are transient.
+    Other 4xx errors (invalid request, authentication, exhausted quota) are not.
+    
+    Args:
+        error: Exception raised by the OpenAI client
+        
+    Returns:
+        True if the call should be retried
+    """
+    if isinstance(error, RateLimitError):
+        # An exhausted account quota is reported as 429 too but will not recover by waiting
+        return getattr(error, "code", None) != "insufficient_quota"
+    if isinstance(error, (APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 408 or error.status_code == 409 or error.status_code >= 500
+    return False
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """
+    Check whether an error indicates a degraded provider (as opposed to throttling).
+    
+    Args:
+        error: Exception raised by the OpenAI client
+        
+    Returns:
+        True for server errors, timeouts and connection problems
+    """
+    if isinstance(error, RateLimitError):
+        return False
+    return is_retryable_error(error)
+
+
+def compute_backoff_delay(attempt: int, base_delay: float = LLM_RETRY_BASE_DELAY,
+                          max_delay: float = LLM_RETRY_MAX_DELAY) -> float:
+    """
+    Compute an exponential backoff delay with full jitter.
+    
+    Args:
+        attempt: Number of the attempt that just failed (1-based)
+        base_delay: Delay scale in seconds
+        max_delay: Upper bound of the delay in seconds
+        
+    Returns:
+        Delay in seconds before the next attempt
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """Circuit breaker that pauses all callers after repeated provider failures."""
+    
+    def __init__(self, failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                 cooldown_seconds: float = CIRCUIT_BREAKER_COOLDOWN_SECONDS):
+        """
+        Initialize the circuit breaker.
+        
+        Args:
+            failure_threshold: Consecutive provider failures that open the circuit
+            cooldown_seconds: How long the circuit stays open before calls are let through again
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+    
+    def wait_time(self) -> float:
+        """
+        Get the time callers have to wait before the next call is allowed.
+        
+        Returns:
+            Seconds until the circuit closes (0 if it is closed)
+        """
+        with self._lock:
+            return max(0.0, self.open_until - time.monotonic())
+    
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self.consecutive_failures = 0
+    
+    def record_failure(self):
+        """Count a provider failure and open the circuit once the threshold is reached."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold and self.open_until <= time.monotonic():
+                self.open_until = time.monotonic() + self.cooldown_seconds
+                print(f"Provider appears degraded ({self.consecutive_failures} consecutive failures), "
+                      f"pausing requests for {self.cooldown_seconds:.0f}s")
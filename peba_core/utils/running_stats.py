@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""
+Streaming statistics for PEBA-PEvo framework.
+
+This module accumulates the mean, variance, minimum and maximum of values as they arrive
+(Welford's algorithm), so statistics across hundreds of optimization runs are computed in
+constant memory per (iteration, metric) cell without keeping every value. Accumulators
+built in separate worker processes can be merged into one.
+"""
+
+import math
+from typing import Dict, Any, List, Optional, Tuple, Hashable, Iterable
+
+
+class RunningStats:
+    """Count, mean, variance, minimum and maximum of a stream of values."""
+    
+    __slots__ = ("n", "mean", "_m2", "min", "max")
+    
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value: float):
+        """
+        Add a value.
+        
+        Args:
+            value: Value to add
+        """
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """
+        Combine the values of another accumulator into this one.
+        
+        Args:
+            other: Accumulator to merge
+            
+        Returns:
+            This accumulator
+        """
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self._m2, self.min, self.max = other.n, other.mean, other._m2, other.min, other.max
+            return self
+        
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self._m2 += other._m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+    
+    @property
+    def variance(self) -> float:
+        """Population variance (as np.var)."""
+        return self._m2 / self.n if self.n else math.nan
+    
+    @property
+    def std(self) -> float:
+        """Population standard deviation (as np.std)."""
+        return math.sqrt(self.variance)
+    
+    @property
+    def sem(self) -> float:
+        """Standard error of the mean (std / sqrt(n))."""
+        return self.std / math.sqrt(self.n) if self.n else math.nan
+    
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Get the statistics as a dictionary.
+        
+        Returns:
+            Dictionary with mean, std, sem, min, max and n
+        """
+        return {
+            "mean": self.mean,
+            "std": self.std,
+            "sem": self.sem,
+            "min": self.min,
+            "max": self.max,
+            "n": self.n
+        }
+    
+    def __getstate__(self) -> Tuple:
+        return self.n, self.mean, self._m2, self.min, self.max
+    
+    def __setstate__(self, state: Tuple):
+        self.n, self.mean, self._m2, self.min, self.max = state
+    
+    def __repr__(self) -> str:
+        return f"RunningStats(n={self.n}, mean={self.mean!r}, std={self.std!r}, min={self.min!r}, max={self.max!r})"
+
+
+class StatisticsAccumulator:
+    """RunningStats per (group, key) cell, e.g. per (iteration, metric)."""
+    
+    def __init__(self):
+        self.cells: Dict[Tuple[Hashable, str], RunningStats] = {}
+    
+    def add(self, group: Hashable, key: str, value: Optional[float]):
+        """
+        Add a value to a cell (None values are skipped).
+        
+        Args:
+            group: Group of the cell (e.g. iteration number)
+            key: Key of the cell (e.g. metric name or behavior category)
+            value: Value to add
+        """
+        if value is None:
+            return
+        cell = self.cells.get((group, key))
+        if cell is None:
+            cell = self.cells[(group, key)] = RunningStats()
+        cell.add(value)
+    
+    def update(self, group: Hashable, values: Dict[str, Optional[float]]):
+        """
+        Add the values of several keys of a group.
+        
+        Args:
+            group: Group of the cells
+            values: Dictionary mapping keys to values
+        """
+        for key, value in values.items():
+            self.add(group, key, value)
+    
+    def merge(self, other: "StatisticsAccumulator") -> "StatisticsAccumulator":
+        """
+        Combine the cells of another accumulator into this one.
+        
+        Args:
+            other: Accumulator to merge (left unchanged)
+            
+        Returns:
+            This accumulator
+        """
+        for cell_key, other_cell in other.cells.items():
+            cell = self.cells.get(cell_key)
+            if cell is None:
+                cell = self.cells[cell_key] = RunningStats()
+            cell.merge(other_cell)
+        return self
+    
+    @property
+    def groups(self) -> List[Hashable]:
+        """Sorted groups with at least one cell."""
+        return sorted({group for group, _ in self.cells})
+    
+    def summary(self, keys: Iterable[str], groups: Optional[Iterable[Hashable]] = None) -> Dict[Hashable, Dict[str, Dict[str, Any]]]:
+        """
+        Get the statistics of the selected keys by group.
+        
+        Args:
+            keys: Keys to include
+            groups: Groups to include (all groups if None); groups without values map to {}
+            
+        Returns:
+            Dictionary mapping groups to keys to RunningStats.to_dict() results
+        """
+        keys = list(keys)
+        summary = {}
+        for group in (self.groups if groups is None else groups):
+            summary[group] = {}
+            for key in keys:
+                cell = self.cells.get((group, key))
+                if cell is not None and cell.n:
+                    summary[group][key] = cell.to_dict()
+        return summary
@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+"""
+Memory-mapped trajectory store for PEBA-PEvo framework.
+
+This module packs the trajectories of every agent of a simulation (plus the shooter and
+human player trajectories) into a single structured NumPy array on disk, with an index of
+each agent's offset and sample count. The array is opened memory-mapped, so per-agent and
+per-time-window lookups are zero-copy views and analyses over many simulations only page in
+the samples they touch.
+
+The store lives in a TrajectoryStore folder inside the simulation folder and records the
+size and modification time of its source files; it is rebuilt once those change.
+
+Usage:
+    python -m peba_core.utils.trajectory_store <simulation_folder> [<simulation_folder> ...]
+"""
+
+import os
+import sys
+import json
+import argparse
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import (
+    TRAJECTORY_STORE_FOLDER,
+    TRAJECTORY_STORE_VERSION
+)
+from .data_loader import load_json_file, load_json_fields, find_json_file, list_json_files
+from .columnar_cache import open_simulation_tables
+
+
+# One record per trajectory sample; health_status is stored as an index into the store's labels
+TRAJECTORY_DTYPE = np.dtype([
+    ("time", "f8"),
+    ("x", "f4"),
+    ("y", "f4"),
+    ("z", "f4"),
+    ("rotation_x", "f4"),
+    ("rotation_y", "f4"),
+    ("rotation_z", "f4"),
+    ("health", "f4"),
+    ("health_status", "i2")
+])
+
+# Shooter and human player trajectories are stored under these names next to the agents
+PLAYER_TRAJECTORY_FILES = {"shooter": "shooter_traj.json", "human": "human_traj.json"}
+
+SAMPLES_FILE_NAME = "trajectories.npy"
+INDEX_FILE_NAME = "index.json"
+
+
+def get_store_dir(simulation_dir: str) -> str:
+    """Get the trajectory store folder of a simulation."""
+    return os.path.join(simulation_dir, TRAJECTORY_STORE_FOLDER)
+
+
+def _trajectory_sources(simulation_dir: str) -> Dict[str, str]:
+    """Map trajectory names (agent names, 'shooter', 'human') to their source files."""
+    sources = {}
+    
+    agent_logs_folder = os.path.join(simulation_dir, "AgentLogs")
+    if os.path.isdir(agent_logs_folder):
+        for name, file_name in list_json_files(agent_logs_folder).items():
+            sources[name] = os.path.join(agent_logs_folder, file_name)
+    
+    for name, file_name in PLAYER_TRAJECTORY_FILES.items():
+        file_path = find_json_file(os.path.join(simulation_dir, file_name))
+        if file_path:
+            sources[name] = file_path
+    
+    return sources
+
+
+def _source_fingerprints(simulation_dir: str) -> Dict[str, List[int]]:
+    """Record the size and modification time of every trajectory source file."""
+    fingerprints = {}
+    for name, file_path in _trajectory_sources(simulation_dir).items():
+        stat = os.stat(file_path)
+        fingerprints[name] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprints
+
+
+def trajectory_to_array(samples: List[Dict[str, Any]], status_codes: Dict[str, int]) -> np.ndarray:
+    """
+    Convert a list of trajectory samples into a structured array sorted by time.
+    
+    Args:
+        samples: Trajectory samples as logged ({time, x, y, z, rotation_x/y/z, health, health_status})
+        status_codes: Codes of the health status labels seen so far; new labels are added
+        
+    Returns:
+        Array with TRAJECTORY_DTYPE; missing values are NaN (-1 for health_status)
+    """
+    array = np.empty(len(samples), dtype=TRAJECTORY_DTYPE)
+    
+    for field in TRAJECTORY_DTYPE.names:
+        if field == "health_status":
+            continue
+        array[field] = np.fromiter(
+            (np.nan if sample.get(field) is None else sample[field] for sample in samples),
+            dtype=TRAJECTORY_DTYPE[field], count=len(samples)
+        )
+    
+    codes = np.empty(len(samples), dtype=TRAJECTORY_DTYPE["health_status"])
+    for i, sample in enumerate(samples):
+        status = sample.get("health_status")
+        if status is None:
+            codes[i] = -1
+        else:
+            codes[i] = status_codes.setdefault(str(status), len(status_codes))
+    array["health_status"] = codes
+    
+    # Time-window lookups rely on every trajectory being sorted by time
+    if len(array) > 1 and np.any(np.diff(array["time"]) < 0):
+        array = array[np.argsort(array["time"], kind="stable")]
+    
+    return array
+
+
+def write_trajectory_store(simulation_dir: str, store_dir: Optional[str] = None) -> str:
+    """
+    Pack the trajectories of a simulation into a memory-mappable array.
+    
+    Agent logs are parsed one at a time (reading only their trajectory), so converting a large
+    simulation needs little more memory than the packed samples. If the simulation has a fresh
+    columnar cache, the trajectories are read from its trajectory table instead.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        store_dir: Store folder (defaults to the simulation's TrajectoryStore folder)
+        
+    Returns:
+        Path to the store folder
+    """
+    store_dir = store_dir or get_store_dir(simulation_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    
+    # Fingerprint the sources before reading them, so changes made during the conversion
+    # make the store stale instead of going unnoticed
+    fingerprints = _source_fingerprints(simulation_dir)
+    
+    # A fresh columnar cache already holds every trajectory, so the JSON logs need not be parsed
+    tables = open_simulation_tables(simulation_dir, build_cache=False)
+    cached_trajectories = tables.trajectories() if tables.from_cache else None
+    
+    agent_logs_folder = os.path.join(simulation_dir, "AgentLogs")
+    status_codes = {}
+    arrays = {}
+    for name, file_path in _trajectory_sources(simulation_dir).items():
+        if cached_trajectories is not None:
+            samples = cached_trajectories.get(name)
+        elif os.path.dirname(file_path) == agent_logs_folder:
+            samples = (load_json_fields(file_path, ["trajectory"]) or {}).get("trajectory")
+        else:
+            # Player trajectory files are plain lists of samples
+            samples = load_json_file(file_path)
+        arrays[name] = trajectory_to_array(samples or [], status_codes)
+    
+    offsets = {}
+    offset = 0
+    for name, array in arrays.items():
+        offsets[name] = [offset, len(array)]
+        offset += len(array)
+    
+    samples_path = os.path.join(store_dir, SAMPLES_FILE_NAME)
+    temp_path = samples_path + ".tmp"
+    samples = np.lib.format.open_memmap(temp_path, mode="w+", dtype=TRAJECTORY_DTYPE, shape=(offset,))
+    for name, array in arrays.items():
+        start, count = offsets[name]
+        samples[start:start + count] = array
+    samples.flush()
+    del samples
+    os.replace(temp_path, samples_path)
+    
+    index = {
+        "version": TRAJECTORY_STORE_VERSION,
+        "sources": fingerprints,
+        "offsets": offsets,
+        "health_status_labels": [label for label, _ in sorted(status_codes.items(), key=lambda item: item[1])]
+    }
+    with open(os.path.join(store_dir, INDEX_FILE_NAME), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    
+    return store_dir
+
+
+def is_store_fresh(simulation_dir: str, store_dir: Optional[str] = None) -> bool:
+    """
+    Check whether the trajectory store of a simulation matches its current source files.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        store_dir: Store folder (defaults to the simulation's TrajectoryStore folder)
+        
+    Returns:
+        True if the store exists and no source file was added, removed or modified
+    """
+    store_dir = store_dir or get_store_dir(simulation_dir)
+    index_path = os.path.join(store_dir, INDEX_FILE_NAME)
+    if not os.path.isfile(index_path) or not os.path.isfile(os.path.join(store_dir, SAMPLES_FILE_NAME)):
+        return False
+    
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    
+    return index.get("version") == TRAJECTORY_STORE_VERSION and index.get("sources") == _source_fingerprints(simulation_dir)
+
+
+class TrajectoryStore:
+    """Memory-mapped trajectories of a simulation with per-agent and per-time-window views."""
+    
+    def __init__(self, store_dir: str):
+        """
+        Open a trajectory store.
+        
+        Args:
+            store_dir: Store folder written by write_trajectory_store
+        """
+        self.store_dir = store_dir
+        
+        with open(os.path.join(store_dir, INDEX_FILE_NAME), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        
+        self.offsets: Dict[str, Tuple[int, int]] = {name: tuple(entry) for name, entry in index["offsets"].items()}
+        self.health_status_labels: List[str] = index.get("health_status_labels", [])
+        self.samples = np.load(os.path.join(store_dir, SAMPLES_FILE_NAME), mmap_mode="r")
+    
+    @property
+    def names(self) -> List[str]:
+        """Names of all stored trajectories (agents, 'shooter' and 'human')."""
+        return list(self.offsets)
+    
+    @property
+    def agents(self) -> List[str]:
+        """Names of the agents (excluding the shooter and human player)."""
+        return [name for name in self.offsets if name not in PLAYER_TRAJECTORY_FILES]
+    
+    def trajectory(self, name: str) -> np.ndarray:
+        """
+        Get the trajectory of an agent (or 'shooter' / 'human') as a zero-copy view.
+        
+        Args:
+            name: Trajectory name
+            
+        Returns:
+            Structured array view with TRAJECTORY_DTYPE, sorted by time
+        """
+        start, count = self.offsets[name]
+        return self.samples[start:start + count]
+    
+    def window(self, start_time: float, end_time: float, names: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Get the samples of each trajectory within a time window as zero-copy views.
+        
+        Args:
+            start_time: Start of the window (inclusive)
+            end_time: End of the window (exclusive)
+            names: Trajectories to include (all if None)
+            
+        Returns:
+            Dictionary mapping trajectory names to structured array views
+        """
+        views = {}
+        for name in (names if names is not None else self.offsets):
+            trajectory = self.trajectory(name)
+            times = trajectory["time"]
+            first, last = np.searchsorted(times, start_time, side="left"), np.searchsorted(times, end_time, side="left")
+            views[name] = trajectory[first:last]
+        return views
+    
+    def positions(self, name: str) -> np.ndarray:
+        """
+        Get the (x, y, z) positions of a trajectory.
+        
+        Args:
+            name: Trajectory name
+            
+        Returns:
+            Array of shape (samples, 3)
+        """
+        trajectory = self.trajectory(name)
+        return np.column_stack([trajectory["x"], trajectory["y"], trajectory["z"]])
+    
+    def health_status(self, codes: np.ndarray) -> List[Optional[str]]:
+        """
+        Decode health status codes into their labels.
+        
+        Args:
+            codes: health_status values of a trajectory
+            
+        Returns:
+            List of labels (None for samples without a status)
+        """
+        return [self.health_status_labels[code] if code >= 0 else None for code in codes]
+
+
+def open_trajectory_store(simulation_dir: str, build: bool = True) -> Optional[TrajectoryStore]:
+    """
+    Open the trajectory store of a simulation, (re)building it if it is missing or stale.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        build: Whether to build a missing or stale store
+        
+    Returns:
+        TrajectoryStore, or None if the store is stale and build is False
+    """
+    store_dir = get_store_dir(simulation_dir)
+    if not is_store_fresh(simulation_dir, store_dir):
+        if not build:
+            return None
+        write_trajectory_store(simulation_dir, store_dir)
+    
+    return TrajectoryStore(store_dir)
+
+
+def main():
+    """Convert simulation folders into trajectory stores from the command line."""
+    parser = argparse.ArgumentParser(description='Pack simulation trajectories into a memory-mapped NumPy store.')
+    parser.add_argument('folders', nargs='+',
+                        help='Simulation folders (containing AgentLogs) to convert')
+    parser.add_argument('--force', action='store_true', default=False,
+                        help='Rebuild the store even if it is up to date')
+    args = parser.parse_args()
+    
+    for folder in args.folders:
+        if not os.path.isdir(os.path.join(folder, "AgentLogs")):
+            print(f"Skipping {folder}: no AgentLogs folder")
+            continue
+        
+        if not args.force and is_store_fresh(folder):
+            print(f"Trajectory store of {folder} is up to date")
+            continue
+        
+        store_dir = write_trajectory_store(folder)
+        store = TrajectoryStore(store_dir)
+        print(f"Wrote trajectory store: {store_dir} ({len(store.names)} trajectories, {len(store.samples)} samples)")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+"""
+Token usage ingestion for PEBA-PEvo framework.
+
+This module collects the LLM usage recorded for a simulation into a single table with one
+row per simulation, stage, agent and model:
+
+- simulation_metadata.json (llm_usage), or TokenUsage.txt for older simulations: token totals
+  of the Unity simulation
+- AgentChatLogs/*_ChatLogs.txt: requests of each agent and the size of its prompts and responses
+- behavior_analysis.json and optimization_log.json: tokens used to classify and optimize
+  (one analysis row per classification model, so cascade tiers can be priced separately)
+
+Each file is read in a single pass (JSON files only decode the fields holding usage) and
+simulations are ingested in parallel. Chat logs do not record token counts, so the simulation
+totals are split across agents in proportion to the characters each agent sent and received.
+
+Usage:
+    python -m peba_core.utils.usage_table <simulation_folder> [<simulation_folder> ...] [--csv usage.csv]
+"""
+
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from ..config import DEFAULT_LOADER_WORKERS, CLASSIFICATION_OPENAI_CONFIG
+from .data_loader import load_json_fields, find_json_file, parse_token_usage_log
+
+
+# Files written by OpenAIUtils.cs
+TOKEN_USAGE_LOG_NAME = "TokenUsage.txt"
+RAW_CHAT_LOG_NAME = "ChatLogsRaw.txt"
+AGENT_CHAT_LOGS_FOLDER = "AgentChatLogs"
+AGENT_CHAT_LOG_SUFFIX = "_ChatLogs.txt"
+CHAT_LOG_SEPARATOR = "-" * 40
+
+# Chat log section headers and whether they count as prompt or completion text
+CHAT_LOG_SECTIONS = {"SYSTEM:": "prompt", "USER:": "prompt", "ASSISTANT:": "completion"}
+
+USAGE_COLUMNS = [
+    "simulation", "stage", "agent", "model", "requests",
+    "prompt_tokens", "cached_tokens", "completion_tokens", "cost_usd",
+    "prompt_chars", "completion_chars"
+]
+USAGE_STAGES = ("simulation", "analysis", "optimization")
+TOKEN_COLUMNS = ["requests", "prompt_tokens", "cached_tokens", "completion_tokens", "cost_usd"]
+
+
+def parse_chat_log(log_path: str) -> Dict[str, int]:
+    """
+    Count the requests of a chat log and the characters of their prompts and responses.
+    
+    The log is streamed line by line, so large logs are never held in memory.
+    
+    Args:
+        log_path: Path to ChatLogsRaw.txt or an AgentChatLogs/*_ChatLogs.txt file
+        
+    Returns:
+        Dictionary with requests, prompt_chars and completion_chars
+    """
+    requests = prompt_chars = completion_chars = 0
+    section = None
+    
+    with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            stripped = line.rstrip("\r\n")
+            if stripped in CHAT_LOG_SECTIONS:
+                section = CHAT_LOG_SECTIONS[stripped]
+            elif stripped == CHAT_LOG_SEPARATOR:
+                requests += 1
+                section = None
+            elif section == "prompt":
+                prompt_chars += len(line)
+            elif section == "completion":
+                completion_chars += len(line)
+    
+    return {"requests": requests, "prompt_chars": prompt_chars, "completion_chars": completion_chars}
+
+
+def _usage_row(simulation: str, stage: str, agent: Optional[str] = None, model: Optional[str] = None,
+               **values) -> Dict[str, Any]:
+    """Build a usage table row, filling missing counts with zero."""
+    row = {"simulation": simulation, "stage": stage, "agent": agent, "model": model}
+    for column in USAGE_COLUMNS[4:]:
+        row[column] = values.get(column)
+        if row[column] is None and column != "cost_usd":
+            row[column] = 0
+    return row
+
+
+def _token_values(token_usage: Dict[str, Any]) -> Dict[str, int]:
+    """Read the token counts of a usage record (Unity writes them as floats)."""
+    return {
+        key: int(token_usage.get(key) or 0)
+        for key in ("prompt_tokens", "cached_tokens", "completion_tokens")
+    }
+
+
+def _simulation_totals(simulation_dir: str) -> Optional[Dict[str, Any]]:
+    """Read the token totals of the Unity simulation."""
+    metadata_path = find_json_file(os.path.join(simulation_dir, "simulation_metadata.json"))
+    llm_usage = ((load_json_fields(metadata_path, ["llm_usage"]) or {}).get("llm_usage") if metadata_path else None)
+    if llm_usage:
+        return {
+            "model": llm_usage.get("model"),
+            "requests": int(llm_usage.get("total_requests") or 0),
+            "cost_usd": llm_usage.get("total_cost_usd"),
+            **_token_values(llm_usage)
+        }
+    
+    # Simulations without metadata only have the summary written by the debug display
+    token_usage = parse_token_usage_log(os.path.join(simulation_dir, TOKEN_USAGE_LOG_NAME))
+    if token_usage:
+        return {
+            "model": token_usage.get("model"),
+            "requests": token_usage.get("total_requests", 0),
+            "cost_usd": token_usage.get("total_cost"),
+            **_token_values(token_usage)
+        }
+    
+    return None
+
+
+def _share(total: Optional[float], part: int, whole: int) -> float:
+    """Split a total in proportion to part / whole."""
+    return total * part / whole if total and whole else 0
+
+
+def _agent_rows(simulation_dir: str, totals: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build the rows of every agent with a chat log."""
+    chat_logs_folder = os.path.join(simulation_dir, AGENT_CHAT_LOGS_FOLDER)
+    if not os.path.isdir(chat_logs_folder):
+        return []
+    
+    agent_logs = {}
+    for file_name in sorted(os.listdir(chat_logs_folder)):
+        if file_name.endswith(AGENT_CHAT_LOG_SUFFIX):
+            agent_logs[file_name[:-len(AGENT_CHAT_LOG_SUFFIX)]] = parse_chat_log(os.path.join(chat_logs_folder, file_name))
+    
+    # The raw log also holds requests made outside any agent, which keeps them out of the agents' shares
+    raw_log_path = os.path.join(simulation_dir, RAW_CHAT_LOG_NAME)
+    if os.path.isfile(raw_log_path):
+        all_requests = parse_chat_log(raw_log_path)
+    else:
+        all_requests = {key: sum(log[key] for log in agent_logs.values()) for key in ("prompt_chars", "completion_chars")}
+    
+    totals = totals or {}
+    total_tokens = totals.get("prompt_tokens", 0) + totals.get("completion_tokens", 0)
+    rows = []
+    for agent_name, log in agent_logs.items():
+        prompt_share = (log["prompt_chars"], all_requests["prompt_chars"])
+        prompt_tokens = _share(totals.get("prompt_tokens"), *prompt_share)
+        completion_tokens = _share(totals.get("completion_tokens"), log["completion_chars"], all_requests["completion_chars"])
+        cost_usd = totals.get("cost_usd")
+        rows.append(_usage_row(
+            simulation_dir, "simulation", agent_name, totals.get("model"),
+            requests=log["requests"],
+            prompt_tokens=round(prompt_tokens),
+            cached_tokens=round(_share(totals.get("cached_tokens"), *prompt_share)),
+            completion_tokens=round(completion_tokens),
+            cost_usd=None if cost_usd is None else _share(cost_usd, prompt_tokens + completion_tokens, total_tokens),
+            prompt_chars=log["prompt_chars"],
+            completion_chars=log["completion_chars"]
+        ))
+    
+    return rows
+
+
+def _api_usage_row(simulation_dir: str, stage: str, api_usage: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build the row of a classification or optimization api_usage record."""
+    token_usage = (api_usage or {}).get("token_usage")
+    if not token_usage:
+        return None
+    return _usage_row(simulation_dir, stage, requests=api_usage.get("total_requests"), **_token_values(token_usage))
+
+
+def _analysis_rows(simulation_dir: str, statistics: Dict[str, Any],
+                   api_usage: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build the rows of a behavior analysis, one per classification model."""
+    token_usage_by_model = (api_usage or {}).get("token_usage_by_model")
+    if token_usage_by_model:
+        return [
+            _usage_row(simulation_dir, "analysis", model=model, requests=usage.get("requests"), **_token_values(usage))
+            for model, usage in token_usage_by_model.items()
+        ]
+    
+    row = _api_usage_row(simulation_dir, "analysis", api_usage)
+    if row is None:
+        return []
+    
+    # Older analyses only have the combined usage; it is attributed to the small cascade model
+    # when that model decided every agent, and to the classification model otherwise
+    cascade = statistics.get("cascade") or {}
+    if cascade and not cascade.get("escalated_to_large_model"):
+        row["model"] = (cascade.get("models") or {}).get("small")
+    row["model"] = row["model"] or CLASSIFICATION_OPENAI_CONFIG["model"]
+    return [row]
+
+
+def collect_simulation_usage(simulation_dir: str, stages: Tuple[str, ...] = USAGE_STAGES,
+                             include_agents: bool = True, metrics: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
+    """
+    Collect the usage rows of a simulation (or optimization iteration) folder.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        stages: Stages to collect; the files of other stages are not read
+        include_agents: Whether to add the per-agent rows of the simulation stage (which streams
+                        every agent chat log)
+        metrics: Distribution metrics (e.g. 'kl_divergence') of behavior_analysis.json to add to
+                 the analysis rows, read together with the usage
+                 
+    Returns:
+        List of rows with USAGE_COLUMNS (plus the requested metrics on analysis rows). The
+        simulation stage has one row with agent None holding the simulation totals, plus one row
+        per agent holding that agent's share of them.
+    """
+    rows = []
+    
+    if "simulation" in stages:
+        totals = _simulation_totals(simulation_dir)
+        if totals:
+            rows.append(_usage_row(simulation_dir, "simulation", **totals))
+        if include_agents:
+            rows.extend(_agent_rows(simulation_dir, totals))
+    
+    analysis_path = find_json_file(os.path.join(simulation_dir, "behavior_analysis.json")) if "analysis" in stages else None
+    if analysis_path:
+        analysis = load_json_fields(analysis_path, ["statistics", "api_usage"]) or {}
+        statistics = analysis.get("statistics") or {}
+        # Older analyses kept api_usage at the top level instead of under statistics
+        api_usage = statistics.get("api_usage") or analysis.get("api_usage")
+        analysis_rows = _analysis_rows(simulation_dir, statistics, api_usage)
+        if metrics:
+            distribution_metrics = statistics.get("distribution_metrics") or {}
+            # Analyses without token usage still report their metrics
+            analysis_rows = analysis_rows or [_usage_row(simulation_dir, "analysis")]
+            for row in analysis_rows:
+                row.update({metric: distribution_metrics.get(metric) for metric in metrics})
+        rows.extend(analysis_rows)
+    
+    optimization_log_path = (find_json_file(os.path.join(simulation_dir, "optimization_log.json"))
+                             if "optimization" in stages else None)
+    if optimization_log_path:
+        optimization_log = load_json_fields(optimization_log_path, ["api_usage"]) or {}
+        row = _api_usage_row(simulation_dir, "optimization", optimization_log.get("api_usage"))
+        if row:
+            rows.append(row)
+    
+    return rows
+
+
+def collect_usage(simulation_dirs: List[str], max_workers: int = DEFAULT_LOADER_WORKERS,
+                  stages: Tuple[str, ...] = USAGE_STAGES, include_agents: bool = True,
+                  metrics: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
+    """
+    Collect the usage rows of many simulations in parallel.
+    
+    Args:
+        simulation_dirs: Paths to simulation (or optimization iteration) folders
+        max_workers: Number of simulations ingested at once
+        stages: Stages to collect (see collect_simulation_usage)
+        include_agents: Whether to add the per-agent rows of the simulation stage
+        metrics: Distribution metrics of behavior_analysis.json to add to the analysis rows
+        
+    Returns:
+        List of rows with USAGE_COLUMNS, in the order of simulation_dirs
+    """
+    def collect(simulation_dir):
+        try:
+            return collect_simulation_usage(simulation_dir, stages, include_agents, metrics)
+        except Exception as e:
+            print(f"Error collecting token usage from {simulation_dir}: {e}")
+            return []
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(simulation_dirs)))) as executor:
+        results = list(executor.map(collect, simulation_dirs))
+    
+    return [row for rows in results for row in rows]
+
+
+def load_usage_table(simulation_dirs: List[str], max_workers: int = DEFAULT_LOADER_WORKERS) -> pd.DataFrame:
+    """
+    Load the usage table of many simulations.
+    
+    Args:
+        simulation_dirs: Paths to simulation (or optimization iteration) folders
+        max_workers: Number of simulations ingested at once
+        
+    Returns:
+        DataFrame with USAGE_COLUMNS
+    """
+    return pd.DataFrame(collect_usage(simulation_dirs, max_workers), columns=USAGE_COLUMNS)
+
+
+def summarize_usage(table: pd.DataFrame, by: Tuple[str, ...] = ("stage", "model")) -> pd.DataFrame:
+    """
+    Sum the usage table per group.
+    
+    Agent rows are left out, since they split the simulation totals that are already counted.
+    
+    Args:
+        table: Usage table from load_usage_table
+        by: Columns to group by
+        
+    Returns:
+        DataFrame with the summed TOKEN_COLUMNS of each group
+    """
+    totals = table[table["agent"].isna()]
+    return totals.groupby(list(by), dropna=False)[TOKEN_COLUMNS].sum(min_count=1).reset_index()
+
+
+def get_simulation_usage(simulation_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the Unity token usage of a simulation with the usage of each agent.
+    
+    Args:
+        simulation_dir: Path to the simulation folder
+        
+    Returns:
+        Dictionary with model, prompt_tokens, cached_tokens, completion_tokens, total_requests,
+        total_cost and agents (per-agent rows), or None if the simulation recorded no usage
+    """
+    rows = collect_simulation_usage(simulation_dir, stages=("simulation",))
+    totals = next((row for row in rows if row["agent"] is None), None)
+    if totals is None:
+        return None
+    
+    usage = {
+        "model": totals["model"],
+        "prompt_tokens": totals["prompt_tokens"],
+        "cached_tokens": totals["cached_tokens"],
+        "completion_tokens": totals["completion_tokens"],
+        "total_requests": totals["requests"],
+        "total_cost": totals["cost_usd"]
+    }
+    agents = {
+        row["agent"]: {column: row[column] for column in USAGE_COLUMNS[4:]}
+        for row in rows if row["agent"] is not None
+    }
+    if agents:
+        usage["agents"] = agents
+    return usage
+
+
+def main():
+    """Summarize the token usage of simulation folders from the command line."""
+    parser = argparse.ArgumentParser(description='Collect the LLM token usage of simulations into one table.')
+    parser.add_argument('folders', nargs='+',
+                        help='Simulation or optimization iteration folders')
+    parser.add_argument('--csv', type=str, default=None,
+                        help='Write the full usage table (including per-agent rows) to this CSV file')
+    parser.add_argument('--workers', type=int, default=DEFAULT_LOADER_WORKERS,
+                        help='Number of simulations ingested in parallel')
+    args = parser.parse_args()
+    
+    table = load_usage_table(args.folders, args.workers)
+    if table.empty:
+        print("No token usage found.")
+        return 1
+    
+    print(summarize_usage(table).to_string(index=False))
+    
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+        print(f"\nWrote {len(table)} rows to {args.csv}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
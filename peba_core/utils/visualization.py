@@ -15,7 +15,6 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from matplotlib.ticker import MaxNLocator
 from typing import Dict, List, Any, Optional
-from collections import defaultdict
 
 from ..config import (
     BEHAVIOR_CATEGORIES,
@@ -26,6 +25,7 @@ from ..config import (
     DEFAULT_DPI,
     METRIC_NAMES
 )
+from .behavior_matrix import BehaviorMatrix, build_behavior_matrices
 
 
 def setup_matplotlib_style():
@@ -120,6 +120,9 @@ def create_metrics_over_iterations_plot(metrics_stats: Dict[int, Dict[str, Any]]
     """
     Plot metrics over iterations with confidence intervals.
     
+    Bootstrap intervals are drawn when the statistics hold them (calculate_statistics with
+    bootstrap_resamples), otherwise the standard error of the mean across runs.
+    
     Args:
         metrics_stats: Dictionary containing metrics statistics by iteration
         output_dir: Directory to save the plots
@@ -153,15 +156,23 @@ def create_metrics_over_iterations_plot(metrics_stats: Dict[int, Dict[str, Any]]
                     label=f'Mean {METRIC_NAMES.get(metric_name, metric_name)}')
             
             # Calculate standard error of the mean (SEM = std / sqrt(n))
-            n_runs = [len(metrics_stats[i][metric_name]["values"]) if metric_name in metrics_stats[i] else 0 
+            n_runs = [metrics_stats[i][metric_name]["n"] if metric_name in metrics_stats[i] else 0 
                      for i in iterations]
             valid_n_runs = np.array(n_runs)[valid_indices]
             
             std_errors = valid_stds / np.sqrt(valid_n_runs)
             
-            # Fill between standard error bounds
-            plt.fill_between(valid_iterations, valid_means - std_errors, valid_means + std_errors, alpha=0.2,
-                           label='Standard Error of Mean')
+            valid_stats = [metrics_stats[i][metric_name] for i in valid_iterations]
+            if all("ci_lower" in stats for stats in valid_stats):
+                # Bootstrap intervals also capture the sampling noise of the agents within each run
+                ci_lower = np.array([stats["ci_lower"] for stats in valid_stats])
+                ci_upper = np.array([stats["ci_upper"] for stats in valid_stats])
+                plt.fill_between(valid_iterations, ci_lower, ci_upper, alpha=0.2,
+                               label=f'{valid_stats[0]["ci_level"]:.0%} Bootstrap CI')
+            else:
+                # Fill between standard error bounds
+                plt.fill_between(valid_iterations, valid_means - std_errors, valid_means + std_errors, alpha=0.2,
+                               label='Standard Error of Mean')
             
             # Add a trend line
             if len(valid_iterations) > 1:
@@ -216,7 +227,7 @@ def create_behavior_distribution_over_iterations_plot(behavior_stats: Dict[int,
                 'Mean': stats['mean'],
                 'Std': stats['std'],
                 'Target': TARGET_DISTRIBUTION.get(category, 0),
-                'Count': len(stats['values']) if 'values' in stats else 0
+                'Count': stats.get('n', 0)
             })
     
     df = pd.DataFrame(data)
@@ -363,19 +374,24 @@ def create_behavior_radar_chart(behavior_stats: Dict[int, Dict[str, Any]], outpu
     return plot_path
 
 
-def create_sankey_diagram(optimization_data: Dict[str, Any], output_dir: str) -> List[str]:
+def create_sankey_diagram(optimization_data: Dict[str, Any], output_dir: str,
+                          behavior_matrices: Optional[Dict[str, BehaviorMatrix]] = None) -> List[str]:
     """
     Create Sankey diagrams to visualize behavior transitions across iterations.
     
     Args:
         optimization_data: Dictionary containing optimization run data
         output_dir: Directory to save the diagrams
+        behavior_matrices: Behavior matrices of the runs (built from optimization_data if None)
         
     Returns:
         List of paths to saved Sankey diagrams
     """
     os.makedirs(output_dir, exist_ok=True)
     
+    if behavior_matrices is None:
+        behavior_matrices = build_behavior_matrices(optimization_data)
+    
     saved_files = []
     
     # Process each run separately
@@ -407,38 +423,14 @@ def create_sankey_diagram(optimization_data: Dict[str, Any], output_dir: str) ->
                 node_indices[(iteration, category)] = node_idx
                 node_idx += 1
         
-        # Track behavior transitions between consecutive iterations
-        for i in range(len(iterations) - 1):
-            current_iter = iterations[i]
-            next_iter = iterations[i + 1]
-            
-            # Get agent behaviors for both iterations
-            current_behaviors = run_data["iterations"][current_iter].get("agent_behaviors", {})
-            next_behaviors = run_data["iterations"][next_iter].get("agent_behaviors", {})
-            
-            # Count transitions
-            transitions = defaultdict(int)
-            
-            # Find agents present in both iterations
-            common_agents = set(current_behaviors.keys()) & set(next_behaviors.keys())
-            
-            for agent in common_agents:
-                from_behavior = current_behaviors[agent]
-                to_behavior = next_behaviors[agent]
-                if from_behavior != "UNKNOWN" and to_behavior != "UNKNOWN":
-                    transitions[(from_behavior, to_behavior)] += 1
-            
-            # Add links for each transition
-            for (from_behavior, to_behavior), count in transitions.items():
-                if count > 0:
-                    source_idx = node_indices.get((current_iter, from_behavior))
-                    target_idx = node_indices.get((next_iter, to_behavior))
-                    
-                    if source_idx is not None and target_idx is not None:
-                        links_source.append(source_idx)
-                        links_target.append(target_idx)
-                        links_value.append(count)
-                        links_color.append(PLOTLY_BEHAVIOR_COLORS[from_behavior])
+        # Count behavior transitions between consecutive iterations (UNKNOWN excluded)
+        transitions = behavior_matrices[run_name].transition_counts()
+        for i, from_code, to_code in zip(*np.nonzero(transitions)):
+            from_behavior = BEHAVIOR_CATEGORIES[from_code]
+            links_source.append(node_indices[(iterations[i], from_behavior)])
+            links_target.append(node_indices[(iterations[i + 1], BEHAVIOR_CATEGORIES[to_code])])
+            links_value.append(int(transitions[i, from_code, to_code]))
+            links_color.append(PLOTLY_BEHAVIOR_COLORS[from_behavior])
         
         # Create the Sankey diagram
         fig = go.Figure(data=[go.Sankey(
@@ -474,7 +466,9 @@ def create_sankey_diagram(optimization_data: Dict[str, Any], output_dir: str) ->
 
 
 def create_topk_distributions_plot(agent_results: Dict[str, Any], output_dir: str, 
-                                 k_values: List[int] = [1, 2, 3, 4, 5, 6]) -> str:
+                                 k_values: List[int] = [1, 2, 3, 4, 5, 6],
+                                 distributions: Optional[Dict[int, Dict[str, float]]] = None,
+                                 metrics: Optional[Dict[int, Dict[str, float]]] = None) -> str:
     """
     Create visualizations for different top-k credit sharing distributions.
     
@@ -482,22 +476,24 @@ def create_topk_distributions_plot(agent_results: Dict[str, Any], output_dir: st
         agent_results: Dictionary of agent classification results
         output_dir: Directory to save the plots
         k_values: List of k values to analyze
+        distributions: Optional precomputed top-k distributions by k (computed if None)
+        metrics: Optional precomputed distribution metrics by k (computed if None)
         
     Returns:
         Path to the saved plot
     """
-    from .metrics import calculate_topk_distribution, calculate_distribution_metrics
+    from .metrics import calculate_topk_distributions, calculate_distribution_metrics_many
     
     os.makedirs(output_dir, exist_ok=True)
     setup_matplotlib_style()
     
     # Calculate distributions for different k values
-    distributions = {}
-    metrics = {}
-    
-    for k in k_values:
-        distributions[k] = calculate_topk_distribution(agent_results, k=k)
-        metrics[k] = calculate_distribution_metrics(distributions[k], TARGET_DISTRIBUTION)
+    if distributions is None:
+        distributions = calculate_topk_distributions(agent_results, k_values)
+    if metrics is None:
+        metrics = dict(zip(k_values, calculate_distribution_metrics_many(
+            [distributions[k] for k in k_values], TARGET_DISTRIBUTION
+        )))
     
     # Create a figure with subplots for each k value
     fig, axes = plt.subplots(len(k_values), 2, figsize=(15, 5 * len(k_values)))
@@ -9,14 +9,19 @@ for different models. Each plot includes error bands showing standard error of t
 
 import os
 import sys
-import json
 import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
-from collections import defaultdict
 import pandas as pd
 
+# Add the peba_core package to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from peba_core.utils.data_loader import find_json_file, read_json_file, load_run_statistics_parallel
+from peba_core.utils.running_stats import StatisticsAccumulator
+from peba_core.utils.experiment_store import ExperimentStore
+
 # ======= SETTINGS =======
 # Base path where optimization runs are stored
 BASE_PATH = os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "...", "OptimizationRuns")
@@ -104,13 +109,12 @@ def load_optimization_data(model_name, optimization_runs):
             iteration_path = os.path.join(run_path, iteration_folder)
             analysis_path = os.path.join(iteration_path, "behavior_analysis.json")
             
-            if not os.path.exists(analysis_path):
+            if not find_json_file(analysis_path):
                 print(f"Warning: Behavior analysis file not found: {analysis_path}")
                 continue
             
             try:
-                with open(analysis_path, 'r', encoding='utf-8') as f:
-                    analysis_data = json.load(f)
+                analysis_data = read_json_file(analysis_path)
                 
                 # Extract iteration number
                 iteration_num = int(iteration_folder.split("_")[1])
@@ -133,38 +137,18 @@ def load_optimization_data(model_name, optimization_runs):
 
 def calculate_statistics(model_name, optimization_data):
     """Calculate statistics across multiple optimization runs for a specific model."""
-    # Find the maximum number of iterations across all runs
-    max_iterations = 0
-    for run_name, run_data in optimization_data.items():
-        if run_data["iterations"]:
-            max_iterations = max(max_iterations, max(run_data["iterations"].keys()))
-    
-    # Initialize data structures for statistics
-    metrics_by_iteration = defaultdict(lambda: defaultdict(list))
-    
-    # Collect data from all runs
-    for run_name, run_data in optimization_data.items():
+    # Statistics are accumulated run by run, without keeping the values of every run
+    metrics_accumulator = StatisticsAccumulator()
+    for run_data in optimization_data.values():
         for iteration_num, iteration_data in run_data["iterations"].items():
-            # Collect metrics
-            for metric_name, metric_value in iteration_data["metrics"].items():
-                metrics_by_iteration[iteration_num][metric_name].append(metric_value)
+            metrics_accumulator.update(iteration_num, iteration_data["metrics"])
     
-    # Calculate statistics for metrics
-    metrics_stats = {}
-    for iteration_num in range(1, max_iterations + 1):
-        metrics_stats[iteration_num] = {}
-        for metric_name in METRICS:
-            values = metrics_by_iteration[iteration_num][metric_name]
-            if values:
-                metrics_stats[iteration_num][metric_name] = {
-                    "mean": np.mean(values),
-                    "std": np.std(values),
-                    "sem": np.std(values) / np.sqrt(len(values)),  # Standard error of the mean
-                    "n": len(values),
-                    "values": values
-                }
-    
-    return metrics_stats
+    return summarize_metrics(metrics_accumulator)
+
+def summarize_metrics(metrics_accumulator):
+    """Get the statistics (mean, std, sem, n) of METRICS for iterations 1 to the last one seen."""
+    max_iterations = max(metrics_accumulator.groups, default=0)
+    return metrics_accumulator.summary(METRICS, range(1, max_iterations + 1))
 
 def plot_convergence_comparison(model_stats, output_dir):
     """Create a 2x2 subplot comparing convergence of metrics across models."""
@@ -303,6 +287,10 @@ def main():
     parser = argparse.ArgumentParser(description='Generate convergence comparison plots across models.')
     parser.add_argument('--output', type=str, default=os.path.join(EVAL_RESULTS_PATH, 'ModelComparison'),
                         help='Output directory for comparison plots')
+    parser.add_argument('--store', action='store_true', default=False,
+                        help='Load runs through the SQLite experiment store (ingesting only new or changed iterations)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Load the runs of all models in parallel worker processes (1 loads them one by one)')
     args = parser.parse_args()
     
     # Create output directory
@@ -311,11 +299,39 @@ def main():
     print(f"Generating convergence comparison plots for {len(MODEL_CONFIGS)} models")
     print(f"Output directory: {args.output}")
     
+    store = ExperimentStore() if args.store else None
+    if store:
+        ingested = store.ingest_runs([run for runs in MODEL_CONFIGS.values() for run in runs], BASE_PATH)
+        print(f"Experiment store: ingested {ingested} new or changed iterations")
+    
+    # Reduce every run of every model to running statistics in one process pool, then merge them per model
+    run_statistics = None
+    if not store and args.workers > 1:
+        run_statistics = load_run_statistics_parallel(
+            [run for runs in MODEL_CONFIGS.values() for run in runs], BASE_PATH, args.workers
+        )
+    
     # Load data and calculate statistics for each model
     model_stats = {}
     for model_name, runs in MODEL_CONFIGS.items():
         print(f"Processing data for {model_name}...")
-        optimization_data = load_optimization_data(model_name, runs)
+        if run_statistics is not None:
+            metrics_accumulator = StatisticsAccumulator()
+            for run in runs:
+                if run in run_statistics:
+                    metrics_accumulator.merge(run_statistics[run][0])
+            
+            if not metrics_accumulator.cells:
+                print(f"Warning: No valid optimization data found for {model_name}.")
+                continue
+            
+            model_stats[model_name] = summarize_metrics(metrics_accumulator)
+            continue
+        
+        if store:
+            optimization_data = store.get_optimization_run_data(runs)
+        else:
+            optimization_data = load_optimization_data(model_name, runs)
         
         if not optimization_data:
             print(f"Warning: No valid optimization data found for {model_name}.")
@@ -324,6 +340,9 @@ def main():
         # Calculate statistics
         model_stats[model_name] = calculate_statistics(model_name, optimization_data)
     
+    if store:
+        store.close()
+    
     if not model_stats:
         print("Error: No valid model data found.")
         return 1
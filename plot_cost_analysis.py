@@ -3,13 +3,12 @@
 Cost Analysis Plot Generator
 
 This script creates a 2x2 subplot analyzing token usage, costs, and efficiency
-of different models during optimization runs. It extracts data from simulation_metadata.json,
-optimization_log.json, and behavior_analysis.json files.
+of different models during optimization runs. Token usage comes from the usage table
+(simulation_metadata.json, optimization_log.json and behavior_analysis.json of every iteration).
 """
 
 import os
 import sys
-import json
 import argparse
 import numpy as np
 import matplotlib.pyplot as plt
@@ -18,6 +17,13 @@ import pandas as pd
 import glob
 from collections import defaultdict
 
+# Add the peba_core package to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from peba_core.config import CLASSIFICATION_OPENAI_CONFIG
+from peba_core.utils.usage_table import collect_usage
+from peba_core.utils.experiment_store import ExperimentStore
+
 # ======= SETTINGS =======
 # Base path where optimization runs are stored
 BASE_PATH = os.path.join(os.path.expanduser("~"), "AppData", "LocalLow", "...", "OptimizationRuns")
@@ -78,6 +84,12 @@ TOKEN_COSTS = {
         "prompt_tokens": 0.38,
         "cached_tokens": 0.0,
         "completion_tokens": 0.89
+    },
+    # Behavior classification model (CLASSIFICATION_OPENAI_CONFIG)
+    "gpt-4.1": {
+        "prompt_tokens": 2.0,
+        "cached_tokens": 0.5,
+        "completion_tokens": 8.0
     }
 }
 
@@ -89,9 +101,36 @@ MODEL_COLORS = {
     "DeepSeek V3": "#d62728"      # red
 }
 
+def calculate_token_cost(token_usage, api_name):
+    """Calculate the cost of a token usage record, pricing cached prompt tokens at the cached rate."""
+    if api_name not in TOKEN_COSTS:
+        return 0
+    
+    costs = TOKEN_COSTS[api_name]
+    cached_tokens = token_usage.get("cached_tokens", 0)
+    uncached_tokens = token_usage.get("prompt_tokens", 0) - cached_tokens
+    
+    prompt_cost = (uncached_tokens / 1000000) * costs["prompt_tokens"]
+    cached_cost = (cached_tokens / 1000000) * costs["cached_tokens"]
+    completion_cost = (token_usage.get("completion_tokens", 0) / 1000000) * costs["completion_tokens"]
+    return prompt_cost + cached_cost + completion_cost
+
+def calculate_stage_cost(usage, model_name):
+    """Calculate the cost of a usage table row of an iteration run with the given simulation model."""
+    # Simulations report their own cost
+    if usage["stage"] == "simulation":
+        return usage["cost_usd"] or 0
+    
+    # Analyses are priced at the rates of the classification model that produced them
+    if usage["stage"] == "analysis":
+        return calculate_token_cost(usage, usage["model"] or CLASSIFICATION_OPENAI_CONFIG["model"])
+    
+    # The optimizer runs on the simulated model
+    return calculate_token_cost(usage, MODEL_TO_API.get(model_name))
+
 def load_cost_data(model_name, optimization_runs):
     """Load cost and token usage data from optimization runs."""
-    all_data = []
+    all_data = {}
     
     for run_name in optimization_runs:
         run_path = os.path.join(BASE_PATH, run_name)
@@ -110,95 +149,82 @@ def load_cost_data(model_name, optimization_runs):
         # Sort iteration folders numerically
         iteration_folders.sort(key=lambda x: int(x.split("_")[1]))
         
-        # Process each iteration
         for iteration_folder in iteration_folders:
-            iteration_num = int(iteration_folder.split("_")[1])
-            iteration_path = os.path.join(run_path, iteration_folder)
-            
-            # Initialize data for this iteration
-            iteration_data = {
+            all_data[os.path.join(run_path, iteration_folder)] = {
                 "model": model_name,
                 "run_name": run_name,
-                "iteration": iteration_num,
+                "iteration": int(iteration_folder.split("_")[1]),
                 "simulation_prompt_tokens": 0,
                 "simulation_completion_tokens": 0,
                 "simulation_cached_tokens": 0,
                 "optimization_prompt_tokens": 0,
                 "optimization_completion_tokens": 0,
+                "optimization_cached_tokens": 0,
                 "analysis_prompt_tokens": 0,
                 "analysis_completion_tokens": 0,
+                "analysis_cached_tokens": 0,
                 "total_cost_usd": 0,
                 "kl_divergence": None
             }
-            
-            # Load simulation metadata
-            sim_metadata_path = os.path.join(iteration_path, "simulation_metadata.json")
-            if os.path.exists(sim_metadata_path):
-                try:
-                    with open(sim_metadata_path, 'r', encoding='utf-8') as f:
-                        sim_data = json.load(f)
-                    
-                    if "llm_usage" in sim_data:
-                        llm_usage = sim_data["llm_usage"]
-                        iteration_data["simulation_prompt_tokens"] = llm_usage.get("prompt_tokens", 0)
-                        iteration_data["simulation_completion_tokens"] = llm_usage.get("completion_tokens", 0)
-                        iteration_data["simulation_cached_tokens"] = llm_usage.get("cached_tokens", 0)
-                        iteration_data["total_cost_usd"] += llm_usage.get("total_cost_usd", 0)
-                except Exception as e:
-                    print(f"Error loading simulation metadata from {sim_metadata_path}: {e}")
-            
-            # Load optimization log
-            opt_log_path = os.path.join(iteration_path, "optimization_log.json")
-            if os.path.exists(opt_log_path):
-                try:
-                    with open(opt_log_path, 'r', encoding='utf-8') as f:
-                        opt_data = json.load(f)
-                    
-                    if "api_usage" in opt_data and "token_usage" in opt_data["api_usage"]:
-                        token_usage = opt_data["api_usage"]["token_usage"]
-                        iteration_data["optimization_prompt_tokens"] = token_usage.get("prompt_tokens", 0)
-                        iteration_data["optimization_completion_tokens"] = token_usage.get("completion_tokens", 0)
-                        
-                        # Calculate cost for optimization
-                        api_name = MODEL_TO_API.get(model_name)
-                        if api_name in TOKEN_COSTS:
-                            prompt_cost = (token_usage.get("prompt_tokens", 0) / 1000000) * TOKEN_COSTS[api_name]["prompt_tokens"]
-                            completion_cost = (token_usage.get("completion_tokens", 0) / 1000000) * TOKEN_COSTS[api_name]["completion_tokens"]
-                            iteration_data["total_cost_usd"] += prompt_cost + completion_cost
-                except Exception as e:
-                    print(f"Error loading optimization log from {opt_log_path}: {e}")
-            
-            # Load behavior analysis
-            analysis_path = os.path.join(iteration_path, "behavior_analysis.json")
-            if os.path.exists(analysis_path):
-                try:
-                    with open(analysis_path, 'r', encoding='utf-8') as f:
-                        analysis_data = json.load(f)
-                    
-                    # Get KL divergence
-                    if "statistics" in analysis_data and "distribution_metrics" in analysis_data["statistics"]:
-                        metrics = analysis_data["statistics"]["distribution_metrics"]
-                        iteration_data["kl_divergence"] = metrics.get("kl_divergence")
-                    
-                    # Get token usage
-                    if "api_usage" in analysis_data and "token_usage" in analysis_data["api_usage"]:
-                        token_usage = analysis_data["api_usage"]["token_usage"]
-                        iteration_data["analysis_prompt_tokens"] = token_usage.get("prompt_tokens", 0)
-                        iteration_data["analysis_completion_tokens"] = token_usage.get("completion_tokens", 0)
-                        
-                        # Calculate cost for analysis
-                        api_name = MODEL_TO_API.get(model_name)
-                        if api_name in TOKEN_COSTS:
-                            prompt_cost = (token_usage.get("prompt_tokens", 0) / 1000000) * TOKEN_COSTS[api_name]["prompt_tokens"]
-                            completion_cost = (token_usage.get("completion_tokens", 0) / 1000000) * TOKEN_COSTS[api_name]["completion_tokens"]
-                            iteration_data["total_cost_usd"] += prompt_cost + completion_cost
-                except Exception as e:
-                    print(f"Error loading behavior analysis from {analysis_path}: {e}")
-            
-            # Add to all data
-            all_data.append(iteration_data)
-    
-    return all_data
+    
+    # Token usage of every iteration (simulation metadata, optimization log, behavior analysis) and the
+    # KL divergence, read together with the analysis usage; per-agent chat logs are not needed
+    for usage in collect_usage(list(all_data), include_agents=False, metrics=("kl_divergence",)):
+        iteration_data = all_data[usage["simulation"]]
+        stage = usage["stage"]
+        # Analyses have one row per classification model (both cascade tiers with --cascade)
+        iteration_data[f"{stage}_prompt_tokens"] += usage["prompt_tokens"]
+        iteration_data[f"{stage}_completion_tokens"] += usage["completion_tokens"]
+        iteration_data[f"{stage}_cached_tokens"] += usage["cached_tokens"]
+        iteration_data["total_cost_usd"] += calculate_stage_cost(usage, model_name)
+        
+        if stage == "analysis":
+            iteration_data["kl_divergence"] = usage["kl_divergence"]
+    
+    return list(all_data.values())
+
+def load_cost_data_from_store(store, model_name, optimization_runs):
+    """Load cost and token usage data of optimization runs from the experiment store."""
+    all_data = {}
+    
+    for run_name, iteration in store.query(
+        f"SELECT run_name, iteration FROM iterations WHERE run_name IN ({', '.join('?' * len(optimization_runs))}) "
+        "ORDER BY run_name, iteration", tuple(optimization_runs)
+    ):
+        all_data[(run_name, iteration)] = {
+            "model": model_name,
+            "run_name": run_name,
+            "iteration": iteration,
+            "simulation_prompt_tokens": 0,
+            "simulation_completion_tokens": 0,
+            "simulation_cached_tokens": 0,
+            "optimization_prompt_tokens": 0,
+            "optimization_completion_tokens": 0,
+            "optimization_cached_tokens": 0,
+            "analysis_prompt_tokens": 0,
+            "analysis_completion_tokens": 0,
+            "analysis_cached_tokens": 0,
+            "total_cost_usd": 0,
+            "kl_divergence": None
+        }
+    
+    for usage in store.get_token_usage(optimization_runs):
+        iteration_data = all_data.get((usage["run_name"], usage["iteration"]))
+        if iteration_data is None:
+            continue
+        
+        stage = usage["stage"]
+        iteration_data[f"{stage}_prompt_tokens"] = usage["prompt_tokens"]
+        iteration_data[f"{stage}_completion_tokens"] = usage["completion_tokens"]
+        iteration_data[f"{stage}_cached_tokens"] = usage["cached_tokens"]
+        iteration_data["total_cost_usd"] += calculate_stage_cost(usage, model_name)
+    
+    for run_name, by_iteration in store.get_metric_by_iteration("kl_divergence", optimization_runs).items():
+        for iteration, value in by_iteration.items():
+            if (run_name, iteration) in all_data:
+                all_data[(run_name, iteration)]["kl_divergence"] = value
+    
+    return list(all_data.values())
 
 def calculate_improvement(data):
     """Calculate KL divergence improvement for each run."""
@@ -421,6 +447,8 @@ def main():
     parser = argparse.ArgumentParser(description='Generate cost analysis plots across models.')
     parser.add_argument('--output', type=str, default=os.path.join(EVAL_RESULTS_PATH, 'CostAnalysis'),
                         help='Output directory for cost analysis plots')
+    parser.add_argument('--store', action='store_true', default=False,
+                        help='Load runs through the SQLite experiment store (ingesting only new or changed iterations)')
     args = parser.parse_args()
     
     # Create output directory
@@ -429,13 +457,24 @@ def main():
     print(f"Generating cost analysis plots for {len(MODEL_CONFIGS)} models")
     print(f"Output directory: {args.output}")
     
+    store = ExperimentStore() if args.store else None
+    if store:
+        ingested = store.ingest_runs([run for runs in MODEL_CONFIGS.values() for run in runs], BASE_PATH)
+        print(f"Experiment store: ingested {ingested} new or changed iterations")
+    
     # Load data for each model
     all_data = []
     for model_name, runs in MODEL_CONFIGS.items():
         print(f"Processing data for {model_name}...")
-        model_data = load_cost_data(model_name, runs)
+        if store:
+            model_data = load_cost_data_from_store(store, model_name, runs)
+        else:
+            model_data = load_cost_data(model_name, runs)
         all_data.extend(model_data)
     
+    if store:
+        store.close()
+    
     if not all_data:
         print("Error: No valid cost data found.")
         return 1
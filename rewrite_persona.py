@@ -23,10 +23,12 @@ from peba_core.config import (
     BASE_OPTIMIZATION_PATH,
     TARGET_DISTRIBUTION,
     BEHAVIOR_CATEGORIES,
-    DEFAULT_MAX_WORKERS
+    DEFAULT_MAX_WORKERS,
+    AGENT_LOG_CLASSIFICATION_FIELDS
 )
 from peba_core.utils.data_loader import (
     load_json_file,
+    load_json_fields,
     load_agent_data
 )
 from peba_core.utils.metrics import analyze_distribution_gap
@@ -110,7 +112,7 @@ class PersonaOptimizer:
         
         # Track errors and token usage
         errors = []
-        total_token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        total_token_usage = {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
         total_requests = 0
         
         # Load agent data from the original simulation for context
@@ -182,6 +184,7 @@ class PersonaOptimizer:
                     # Track token usage if available
                     if token_usage:
                         total_token_usage["prompt_tokens"] += token_usage.get("prompt_tokens", 0)
+                        total_token_usage["cached_tokens"] += token_usage.get("cached_tokens", 0)
                         total_token_usage["completion_tokens"] += token_usage.get("completion_tokens", 0)
                         total_token_usage["total_tokens"] += token_usage.get("total_tokens", 0)
                         total_requests += 1
@@ -270,7 +273,7 @@ class PersonaOptimizer:
         agent_data_cache = {}
         for agent_name in agent_names:
             agent_file_path = os.path.join(agent_logs_folder, f"{agent_name}.json")
-            agent_data = load_json_file(agent_file_path)
+            agent_data = load_json_fields(agent_file_path, AGENT_LOG_CLASSIFICATION_FIELDS)
             
             if agent_data:
                 agent_data_cache[agent_name] = agent_data
@@ -302,7 +305,8 @@ def main():
     parser.add_argument('--iteration', type=str, default="Iteration_1",
                         help='Iteration folder name within the optimization run')
     parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS,
-                        help='Maximum number of parallel workers for optimization')
+                        help='Maximum number of parallel workers for optimization '
+                             '(requests are queued by the shared LLM rate limiter)')
     args = parser.parse_args()
     
     try:
@@ -0,0 +1,64 @@
+"""Tests for the dictionary-compatible agent log records."""
+
+import json
+
+import pytest
+
+from peba_core.utils.agent_records import AgentLog, LoggedAction, json_default, to_agent_log
+from peba_core.utils.data_loader import get_agent_context
+
+
+AGENT_LOG = {
+    "persona": {"name": "Dana Reyes", "role": "Receptionist"},
+    "traits": {"training_level": "None"},
+    "observations": [
+        {"time": 1.0, "observation": {"mood": "calm"}},
+        {"time": 2.0, "observation": {"mood": "panicked"}}
+    ],
+    "actions": [
+        {"time": 1.5, "action_type": "Run", "movement_state": "Running", "dialog_text": None,
+         "plan": "Leave through the back door", "target_location": {"x": 1.0, "y": 0.0, "z": 2.0}},
+        # Partial entry with a field the record class does not know
+        {"time": 2.5, "action_type": "Hide", "cover_object": "Desk"}
+    ],
+    "memories": [{"time": 0.5, "description": "Heard shots"}],
+    "trajectory": [{"time": 0.0, "x": 0.0, "y": 0.0, "z": 0.0, "health": 100, "health_status": "Healthy"}],
+    "final_status": "Escaped",
+    "unity_version": "2022.3"
+}
+
+
+def test_to_dict_round_trips_the_json_object():
+    record = to_agent_log(AGENT_LOG)
+
+    assert record.to_dict() == AGENT_LOG
+    assert json.loads(json.dumps(record, default=json_default)) == AGENT_LOG
+    assert record == AGENT_LOG
+    assert list(record.to_dict()["actions"][1]) == ["time", "action_type", "cover_object"]
+
+
+def test_records_behave_like_dicts():
+    record = to_agent_log(AGENT_LOG)
+    action = record["actions"][1]
+
+    assert isinstance(action, LoggedAction)
+    assert action["cover_object"] == "Desk"
+    assert action.get("plan", "") == AGENT_LOG["actions"][1].get("plan", "")
+    assert ("plan" in action) == ("plan" in AGENT_LOG["actions"][1])
+    assert len(action) == len(AGENT_LOG["actions"][1])
+    assert action.items() == list(AGENT_LOG["actions"][1].items())
+    with pytest.raises(KeyError):
+        action["plan"]
+
+    assert set(record.keys()) == set(AGENT_LOG)
+    assert record.get("missing", "default") == "default"
+
+
+def test_agent_context_matches_for_records_and_dicts():
+    assert get_agent_context(to_agent_log(AGENT_LOG)) == get_agent_context(AGENT_LOG)
+
+
+def test_to_agent_log_rejects_non_objects():
+    assert to_agent_log(None) is None
+    assert to_agent_log([AGENT_LOG]) is None
+    assert AgentLog.from_dict({}).to_dict() == {}
@@ -0,0 +1,61 @@
+"""Tests for parsing Batch API output."""
+
+import json
+import types
+
+from peba_core.utils.llm_client import LLMClient
+
+
+def output_line(custom_id, content, status_code=200):
+    body = {
+        "choices": [{"message": {"content": content}}],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 20, "prompt_tokens_details": {"cached_tokens": 40}}
+    }
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": status_code, "body": body}})
+
+
+def make_batch_client(tmp_path, output_text):
+    """LLMClient whose Batch API immediately completes with the given output file."""
+    client = LLMClient("test-key", use_cache=False)
+    batch = types.SimpleNamespace(id="batch_1", status="completed", output_file_id="file_out", request_counts=None)
+    client.client = types.SimpleNamespace(
+        files=types.SimpleNamespace(
+            create=lambda file, purpose: types.SimpleNamespace(id="file_in"),
+            content=lambda file_id: types.SimpleNamespace(text=output_text)
+        ),
+        batches=types.SimpleNamespace(
+            create=lambda **kwargs: batch,
+            retrieve=lambda batch_id: batch
+        )
+    )
+    
+    batch_file = tmp_path / "batch.jsonl"
+    batch_file.write_text("{}\n")
+    return client, str(batch_file)
+
+
+def test_run_batch_parses_usage(tmp_path):
+    client, batch_file = make_batch_client(tmp_path, output_line("a", '{"classification": "FREEZE"}'))
+    
+    responses = client._run_batch(batch_file, poll_interval=0)
+    
+    content, usage = responses["a"]
+    assert content == '{"classification": "FREEZE"}'
+    assert usage == {"prompt_tokens": 100, "cached_tokens": 40, "completion_tokens": 20,
+                     "total_tokens": 120, "batch": True}
+
+
+def test_run_batch_skips_malformed_lines(tmp_path):
+    output_text = "\n".join([
+        output_line("a", '{"classification": "FREEZE"}'),
+        '{"custom_id": "b", "response": {"status_code": 200, "bo',
+        json.dumps({"custom_id": "c", "response": {"status_code": 200, "body": {"choices": []}}}),
+        json.dumps(["not", "a", "record"]),
+        output_line("d", '{"classification": "FIGHT"}', status_code=500),
+        output_line("e", '{"classification": "FIGHT"}')
+    ])
+    client, batch_file = make_batch_client(tmp_path, output_text)
+    
+    responses = client._run_batch(batch_file, poll_interval=0)
+    
+    assert set(responses) == {"a", "e"}
@@ -0,0 +1,112 @@
+"""Tests for the agent x iteration behavior matrices."""
+
+import random
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from peba_core.config import BEHAVIOR_CATEGORIES
+from peba_core.utils.behavior_matrix import (
+    UNOBSERVED,
+    BehaviorMatrix,
+    adjustment_outcomes,
+    build_behavior_matrices,
+    encode_behaviors
+)
+
+
+def reference_transitions(run_data):
+    """Set-intersection counts of the original Sankey diagram, per consecutive iteration pair."""
+    iterations = sorted(run_data["iterations"])
+    all_transitions = []
+    for current_iter, next_iter in zip(iterations, iterations[1:]):
+        current_behaviors = run_data["iterations"][current_iter].get("agent_behaviors", {})
+        next_behaviors = run_data["iterations"][next_iter].get("agent_behaviors", {})
+        transitions = defaultdict(int)
+        for agent in set(current_behaviors) & set(next_behaviors):
+            from_behavior, to_behavior = current_behaviors[agent], next_behaviors[agent]
+            if from_behavior != "UNKNOWN" and to_behavior != "UNKNOWN":
+                transitions[(from_behavior, to_behavior)] += 1
+        all_transitions.append(transitions)
+    return all_transitions
+
+
+def make_run(rng, num_agents=30):
+    agents = [f"Agent_{i}" for i in range(num_agents)]
+    iteration_numbers = sorted(rng.sample(range(1, 12), rng.randint(1, 6)))
+    iterations = {}
+    for iteration in iteration_numbers:
+        labels = BEHAVIOR_CATEGORIES + ["ERROR"]
+        # Agents go missing from some iterations and new ones appear
+        iterations[iteration] = {"agent_behaviors": {
+            agent: rng.choice(labels) for agent in agents + [f"Late_{iteration}"] if rng.random() < 0.85
+        }}
+    return {"iterations": iterations}
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_transition_counts_match_set_intersection_counts(seed):
+    run_data = make_run(random.Random(seed))
+    matrix = BehaviorMatrix.from_run(run_data)
+
+    counts = matrix.transition_counts()
+    expected = reference_transitions(run_data)
+
+    assert counts.shape[0] == len(expected)
+    for pair, transitions in enumerate(expected):
+        # Labels outside the categories never become Sankey links
+        valid = {key: count for key, count in transitions.items()
+                 if key[0] in BEHAVIOR_CATEGORIES and key[1] in BEHAVIOR_CATEGORIES}
+        observed = {
+            (BEHAVIOR_CATEGORIES[i], BEHAVIOR_CATEGORIES[j]): int(counts[pair, i, j])
+            for i, j in zip(*np.nonzero(counts[pair]))
+        }
+        assert observed == valid
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_flip_rates_match_reference(seed):
+    run_data = make_run(random.Random(seed + 100))
+    iterations = sorted(run_data["iterations"])
+
+    flip_rates = BehaviorMatrix.from_run(run_data).flip_rates()
+
+    for pair, (current_iter, next_iter) in enumerate(zip(iterations, iterations[1:])):
+        current_behaviors = run_data["iterations"][current_iter]["agent_behaviors"]
+        next_behaviors = run_data["iterations"][next_iter]["agent_behaviors"]
+        both = [agent for agent in current_behaviors if agent in next_behaviors
+                and current_behaviors[agent] in BEHAVIOR_CATEGORIES and next_behaviors[agent] in BEHAVIOR_CATEGORIES]
+        if not both:
+            assert np.isnan(flip_rates[pair])
+            continue
+        flips = sum(current_behaviors[agent] != next_behaviors[agent] for agent in both)
+        assert flip_rates[pair] == pytest.approx(flips / len(both))
+
+
+def test_single_iteration_and_empty_runs_have_no_transitions():
+    matrices = build_behavior_matrices({
+        "single": {"iterations": {1: {"agent_behaviors": {"Agent_0": BEHAVIOR_CATEGORIES[0]}}}},
+        "empty": {"iterations": {1: {}, 2: {}}}
+    })
+
+    assert matrices["single"].transition_counts().shape == (0, len(BEHAVIOR_CATEGORIES), len(BEHAVIOR_CATEGORIES))
+    assert matrices["empty"].transition_counts().sum() == 0
+
+
+def test_behaviors_at_and_adjustment_outcomes():
+    first, second = BEHAVIOR_CATEGORIES[0], BEHAVIOR_CATEGORIES[1]
+    matrix = BehaviorMatrix.from_run({"iterations": {
+        1: {"agent_behaviors": {"Agent_0": first, "Agent_1": first}},
+        2: {"agent_behaviors": {"Agent_0": second, "Agent_1": first}}
+    }})
+
+    actual = matrix.behaviors_at(2, ["Agent_0", "Agent_1", "Ghost"])
+    assert actual.tolist() == [1, 0, UNOBSERVED]
+    assert matrix.behaviors_at(3, ["Agent_0"]).tolist() == [UNOBSERVED]
+
+    totals, successes = adjustment_outcomes(
+        encode_behaviors([first, first, None]), encode_behaviors([second, second, second]), actual
+    )
+    assert totals[0, 1] == 2 and successes[0, 1] == 1
+    assert totals.sum() == 2 and successes.sum() == 1
@@ -0,0 +1,20 @@
+"""Tests for the fingerprint that decides whether previous classifications can be reused."""
+
+from classify_behavior import BehaviorClassifier
+
+
+def fingerprint(**settings):
+    return BehaviorClassifier(api_key="test-key", use_cache=False, **settings).classifier_fingerprint
+
+
+def test_fingerprint_is_stable():
+    assert fingerprint(pack_size=1) == fingerprint(pack_size=1)
+
+
+def test_fingerprint_separates_packed_and_single_agent_runs():
+    assert fingerprint(pack_size=1) != fingerprint(pack_size=4)
+    assert fingerprint(pack_size=4) != fingerprint(pack_size=8)
+
+
+def test_fingerprint_separates_cascade_runs():
+    assert fingerprint(cascade=False) != fingerprint(cascade=True)
@@ -0,0 +1,86 @@
+"""Tests for rebuilding agent logs from the columnar simulation tables."""
+
+import json
+
+import pytest
+
+from peba_core.utils import columnar_cache
+from peba_core.utils.columnar_cache import SimulationTables, write_columnar_cache
+from peba_core.utils.data_loader import load_agent_data, load_simulation_data
+
+
+def make_agent_log(index):
+    return {
+        "persona": {"name": f"Agent {index}", "role": "Analyst", "age": str(30 + index)},
+        "traits": {"training_level": "None", "familiarity_level": "High", "shooter_perception_level": "Low"},
+        "observations": [
+            {"time": 1.0, "observation": {"mood": "calm", "nearby_agents": ["A", "B"]}},
+            {"time": 2.5, "observation": {"mood": "panicked", "nearby_agents": []}}
+        ],
+        "actions": [
+            {"time": 1.5, "action_type": "Run", "movement_state": "Running", "dialog_text": None,
+             "plan": "Get out", "target_location": {"x": 1.0, "y": 0.0, "z": -2.5}},
+            {"time": 3.0, "action_type": "Hide", "movement_state": "Idle", "dialog_text": "Quiet!",
+             "plan": None, "target_location": None}
+        ],
+        "memories": [{"time": 0.5, "description": "Heard shots"}],
+        "trajectory": [
+            {"time": 0.0, "x": 0.0, "y": 0.0, "z": 0.0, "rotation_x": 0.0, "rotation_y": 90.0,
+             "rotation_z": 0.0, "health": 100, "health_status": "Healthy"},
+            {"time": 0.5, "x": 1.0, "y": 0.0, "z": 0.5, "rotation_x": 0.0, "rotation_y": 45.0,
+             "rotation_z": 0.0, "health": 100, "health_status": "Healthy"}
+        ],
+        "final_status": "Escaped" if index % 2 else "Alive"
+    }
+
+
+@pytest.fixture
+def simulation_dir(tmp_path):
+    agent_logs = tmp_path / "AgentLogs"
+    agent_logs.mkdir()
+    for index in range(3):
+        (agent_logs / f"Agent_{index}.json").write_text(json.dumps(make_agent_log(index)), encoding="utf-8")
+    (tmp_path / "shooter_traj.json").write_text(json.dumps([
+        {"time": 0.0, "x": 5.0, "y": 0.0, "z": 5.0, "health": 100, "health_status": "Healthy"}
+    ]), encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_agent_logs_rebuild_the_json_logs(simulation_dir):
+    expected = load_agent_data(f"{simulation_dir}/AgentLogs")
+    rebuilt = SimulationTables(simulation_dir).agent_logs()
+
+    assert set(rebuilt) == set(expected)
+    for agent_name, data in expected.items():
+        assert rebuilt[agent_name] == data
+
+
+def test_agent_logs_only_rebuild_selected_fields(simulation_dir):
+    rebuilt = SimulationTables(simulation_dir).agent_logs(["persona", "memories", "final_status"])
+
+    assert rebuilt["Agent_1"] == {
+        "persona": {"name": "Agent 1", "role": "Analyst", "age": "31"},
+        "memories": [{"time": 0.5, "description": "Heard shots"}],
+        "final_status": "Escaped"
+    }
+
+
+def test_trajectories_include_players(simulation_dir):
+    trajectories = SimulationTables(simulation_dir).trajectories()
+
+    assert trajectories["Agent_0"][1]["x"] == 1.0
+    assert trajectories["shooter"][0]["z"] == 5.0
+    assert set(SimulationTables(simulation_dir).trajectories(source="agent")) == {"Agent_0", "Agent_1", "Agent_2"}
+
+
+def test_load_simulation_data_reads_fresh_cache(simulation_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    write_columnar_cache(simulation_dir)
+
+    # With a fresh cache the JSON logs are not parsed
+    monkeypatch.setattr("peba_core.utils.data_loader.load_agent_data",
+                        lambda *args, **kwargs: pytest.fail("JSON logs were parsed"))
+    _, agent_data = load_simulation_data(simulation_dir, direct_path=True)
+
+    assert agent_data["Agent_2"] == make_agent_log(2)
+    assert columnar_cache.is_cache_fresh(simulation_dir)
@@ -0,0 +1,51 @@
+"""Tests for selective decoding of top-level JSON fields."""
+
+import json
+
+import pytest
+
+from peba_core.utils.data_loader import parse_json_fields
+
+
+DOCUMENT = {
+    "agent_name": "Agent_3",
+    "trajectory": [[1.5, -2.25, {"t": 0}], [3, 4, None], []],
+    "persona": "Careful \"shopper\" with a \\ in the name and unicode é中",
+    "nested": {"a": {"b": [True, False, None]}, "": "empty key"},
+    "score": -1.25e-3,
+    "count": 0,
+    "flag": False,
+    "missing_value": None,
+    "text_with_braces": "}{][,:",
+}
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("fields", [
+    ["agent_name"],
+    ["persona", "score"],
+    ["text_with_braces", "flag", "missing_value"],
+    ["nested", "count", "trajectory"],
+    list(DOCUMENT),
+])
+def test_parse_json_fields_matches_json_loads(fields, indent):
+    text = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False)
+    expected = {field: value for field, value in json.loads(text).items() if field in fields}
+    assert parse_json_fields(text, fields) == expected
+
+
+def test_parse_json_fields_omits_absent_fields():
+    text = json.dumps(DOCUMENT)
+    assert parse_json_fields(text, ["score", "not_there"]) == {"score": DOCUMENT["score"]}
+    assert parse_json_fields("  { }  ", ["score"]) == {}
+
+
+def test_parse_json_fields_stops_after_last_wanted_field():
+    # Content after the selected field is never scanned
+    assert parse_json_fields('{"a": 1, "b": [1, 2', ["a"]) == {"a": 1}
+
+
+@pytest.mark.parametrize("text", ["[1, 2]", '{"a" 1}', '{"a": 1 "b": 2}', ""])
+def test_parse_json_fields_rejects_malformed_documents(text):
+    with pytest.raises(ValueError):
+        parse_json_fields(text, ["b"])
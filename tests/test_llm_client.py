@@ -0,0 +1,50 @@
+"""Tests for the token usage bookkeeping of the LLM client."""
+
+from peba_core.utils.llm_client import merge_token_usage
+
+
+CACHED_USAGE = {
+    "prompt_tokens": 0,
+    "cached_tokens": 0,
+    "completion_tokens": 0,
+    "total_tokens": 0,
+    "cache_hit": True
+}
+
+FRESH_USAGE = {
+    "prompt_tokens": 900,
+    "cached_tokens": 0,
+    "completion_tokens": 100,
+    "total_tokens": 1000,
+    "attempts": 1
+}
+
+
+def test_merge_cached_with_fresh_usage_is_not_a_cache_hit():
+    # A cached small-model result escalated to a fresh large-model request
+    for merged in (merge_token_usage(CACHED_USAGE, FRESH_USAGE), merge_token_usage(FRESH_USAGE, CACHED_USAGE)):
+        assert merged["cache_hit"] is False
+        assert merged["total_tokens"] == 1000
+        assert merged["request_share"] == 1
+
+
+def test_merge_cached_packed_share_with_fresh_fallback():
+    share = dict(CACHED_USAGE, packed_request_size=4, request_share=0)
+    merged = merge_token_usage(share, FRESH_USAGE)
+    assert merged["cache_hit"] is False
+    assert merged["total_tokens"] == 1000
+    assert merged["request_share"] == 1
+
+
+def test_merge_two_cache_hits_stays_a_cache_hit():
+    merged = merge_token_usage(CACHED_USAGE, dict(CACHED_USAGE))
+    assert merged["cache_hit"] is True
+    assert merged["request_share"] == 0
+
+
+def test_merge_failed_share_with_successful_fallback():
+    failed = {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "total_tokens": 0,
+              "attempts": 3, "failed": True}
+    merged = merge_token_usage(failed, FRESH_USAGE)
+    assert merged["failed"] is False
+    assert merged["attempts"] == 4
@@ -0,0 +1,37 @@
+"""Tests for compressing simulation logs."""
+
+import json
+
+from peba_core.utils.data_loader import load_json_file
+from peba_core.utils.log_compression import compress_tree
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_compress_tree_only_compresses_python_only_logs(tmp_path):
+    simulation = tmp_path / "iteration_1" / "Sim0"
+    write_json(simulation / "AgentLogs" / "Agent_0.json", {"final_status": "Alive", "trajectory": []})
+    write_json(simulation / "shooter_traj.json", [{"time": 0.0, "x": 1.0}])
+    write_json(simulation / "map_data.json", {"rooms": []})
+    write_json(simulation / "simulation_metadata.json", {"agents": 1})
+    # Read by BehaviorOptimizer.cs and BehaviorEvaluator.cs
+    write_json(tmp_path / "iteration_1" / "personas_updated.json", {"personas": []})
+    write_json(tmp_path / "iteration_1" / "behavior_analysis.json", {"statistics": {}})
+
+    stats = compress_tree(str(tmp_path), "gz", max_workers=2)
+
+    assert stats["files"] == 3 and stats["failed"] == 0
+    for name in ("AgentLogs/Agent_0.json", "shooter_traj.json", "map_data.json"):
+        assert not (simulation / name).exists()
+        assert (simulation / f"{name}.gz").exists()
+    for path in (simulation / "simulation_metadata.json",
+                 tmp_path / "iteration_1" / "personas_updated.json",
+                 tmp_path / "iteration_1" / "behavior_analysis.json"):
+        assert path.exists()
+        assert not path.with_name(path.name + ".gz").exists()
+
+    # Loaders keep using the plain paths
+    assert load_json_file(str(simulation / "AgentLogs" / "Agent_0.json")) == {"final_status": "Alive", "trajectory": []}
@@ -0,0 +1,68 @@
+"""Tests for the bootstrap confidence intervals of alignment metrics."""
+
+import numpy as np
+
+from peba_core.config import BEHAVIOR_CATEGORIES, GROUND_TRUTH_DISTRIBUTION, BOOTSTRAP_METRICS
+from peba_core.utils.metrics import calculate_distribution_metrics, calculate_statistics
+
+
+def make_iteration(counts):
+    """Build the loaded data of one iteration from behavior counts, scored as classify_behavior does."""
+    agent_behaviors = {}
+    for category, count in zip(BEHAVIOR_CATEGORIES, counts):
+        for i in range(count):
+            agent_behaviors[f"{category}_{i}"] = category
+    
+    total = sum(counts)
+    distribution = {category: count / total for category, count in zip(BEHAVIOR_CATEGORIES, counts)}
+    return {
+        "metrics": calculate_distribution_metrics(distribution, GROUND_TRUTH_DISTRIBUTION),
+        "behavior_distribution": distribution,
+        "total_agents": total,
+        "agent_behaviors": agent_behaviors
+    }
+
+
+def test_bootstrap_intervals_contain_reported_mean():
+    # 50 agents matching the ground truth exactly, then a shifted distribution
+    matching = [14, 13, 6, 6, 6, 5, 0]
+    rng = np.random.default_rng(0)
+    optimization_data = {}
+    for run in range(5):
+        shifted = rng.multinomial(50, [0.4, 0.2, 0.1, 0.1, 0.1, 0.1, 0.0]).tolist()
+        optimization_data[f"run_{run}"] = {
+            "iterations": {1: make_iteration(matching), 2: make_iteration(shifted)}
+        }
+    
+    metrics_stats, _ = calculate_statistics(optimization_data, bootstrap_resamples=500)
+    
+    for iteration in (1, 2):
+        for metric_name in BOOTSTRAP_METRICS:
+            stats = metrics_stats[iteration][metric_name]
+            assert stats["ci_lower"] >= 0
+            assert stats["ci_lower"] <= stats["mean"] <= stats["ci_upper"], (iteration, metric_name, stats)
+    
+    for metric_name in BOOTSTRAP_METRICS:
+        assert metrics_stats[1][metric_name]["ci_lower"] == 0
+        assert metrics_stats[2][metric_name]["ci_upper"] > metrics_stats[2][metric_name]["ci_lower"]
+
+
+def test_bootstrap_intervals_are_reproducible():
+    rng = np.random.default_rng(1)
+    optimization_data = {
+        f"run_{run}": {"iterations": {1: make_iteration(rng.multinomial(40, [0.3, 0.3, 0.1, 0.1, 0.1, 0.1, 0.0]).tolist())}}
+        for run in range(3)
+    }
+    
+    first, _ = calculate_statistics(optimization_data, bootstrap_resamples=200)
+    
+    # A new iteration (as in watch mode) leaves the intervals of earlier iterations unchanged
+    for run_data in optimization_data.values():
+        run_data["iterations"][2] = make_iteration(rng.multinomial(40, [0.2, 0.2, 0.2, 0.1, 0.1, 0.2, 0.0]).tolist())
+    second, _ = calculate_statistics(optimization_data, bootstrap_resamples=200)
+    
+    reseeded, _ = calculate_statistics(optimization_data, bootstrap_resamples=200, seed=7)
+    
+    for metric_name in BOOTSTRAP_METRICS:
+        assert first[1][metric_name] == second[1][metric_name]
+        assert reseeded[1][metric_name]["ci_upper"] != second[1][metric_name]["ci_upper"]
@@ -0,0 +1,129 @@
+"""Tests for classifying several agents per request."""
+
+import json
+import types
+import asyncio
+
+from peba_core.config import CLASSIFICATION_OPENAI_CONFIG, PACKED_CLASSIFICATION_TOKENS_PER_AGENT
+from peba_core.utils.llm_client import (
+    LLMClient,
+    CLASSIFICATION_SYSTEM_PROMPT,
+    PACKED_CLASSIFICATION_SYSTEM_PROMPT
+)
+
+
+RANKING = ["FREEZE", "HIDE_IN_PLACE", "FIGHT", "RUN_INDEPENDENTLY", "HIDE_AFTER_RUNNING", "RUN_FOLLOWING_CROWD"]
+
+
+def classification(category):
+    return {"reasoning": "r", "classification": category, "ranking": [category] + [c for c in RANKING if c != category]}
+
+
+def make_response(content, prompt_tokens, completion_tokens):
+    usage = types.SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                  prompt_tokens_details=None)
+    message = types.SimpleNamespace(content=content)
+    response = types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+    return types.SimpleNamespace(headers={}, parse=lambda: response)
+
+
+class ScriptedCompletions:
+    """Answers packed requests with a fixed response and single-agent requests with FIGHT."""
+    
+    def __init__(self, packed_content):
+        self.packed_content = packed_content
+        self.requests = []
+        self.with_raw_response = self
+    
+    def create(self, messages, **config):
+        self.requests.append((messages, config))
+        if messages[0]["content"] == PACKED_CLASSIFICATION_SYSTEM_PROMPT:
+            return make_response(self.packed_content, 1000, 300)
+        assert messages[0]["content"] == CLASSIFICATION_SYSTEM_PROMPT
+        return make_response(json.dumps(classification("FIGHT")), 400, 100)
+
+
+class AsyncScriptedCompletions(ScriptedCompletions):
+    async def create(self, messages, **config):
+        return super().create(messages, **config)
+
+
+def make_client(completions):
+    client = LLMClient("test-key", use_cache=False)
+    namespace = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+    client.client = namespace
+    client.async_client = namespace
+    return client
+
+
+def make_agents(count):
+    return [({"persona": {"name": f"Agent {i}"}, "final_status": "Alive"},
+             {"memories": f"memory {i}", "timeline": f"timeline {i}"})
+            for i in range(count)]
+
+
+def test_packed_request_lists_every_agent_once():
+    completions = ScriptedCompletions(json.dumps({f"agent_{i}": classification("FREEZE") for i in range(1, 4)}))
+    client = make_client(completions)
+    
+    results = client.classify_agents_packed(make_agents(3))
+    
+    assert len(completions.requests) == 1
+    messages, config = completions.requests[0]
+    for i in range(3):
+        assert messages[1]["content"].count(f"memory {i}") == 1
+    assert config["max_tokens"] >= PACKED_CLASSIFICATION_TOKENS_PER_AGENT * 3
+    
+    assert [result["classification"] for result in results] == ["FREEZE"] * 3
+    assert all(result["packed"] for result in results)
+    assert [result["persona"]["name"] for result in results] == ["Agent 0", "Agent 1", "Agent 2"]
+
+
+def test_packed_usage_is_split_across_agents():
+    completions = ScriptedCompletions(json.dumps({f"agent_{i}": classification("FREEZE") for i in range(1, 4)}))
+    results = make_client(completions).classify_agents_packed(make_agents(3))
+    
+    usages = [result["token_usage"] for result in results]
+    assert sum(usage["prompt_tokens"] for usage in usages) == 1000
+    assert sum(usage["completion_tokens"] for usage in usages) == 300
+    assert sum(usage["request_share"] for usage in usages) == 1
+    assert all(usage["packed_request_size"] == 3 for usage in usages)
+
+
+def test_missing_and_malformed_agents_fall_back_to_single_requests():
+    # agent_2 is missing and agent_3 has no classification
+    packed = {"agent_1": classification("FREEZE"), "agent_3": {"reasoning": "r"}}
+    completions = ScriptedCompletions(json.dumps(packed))
+    
+    results = make_client(completions).classify_agents_packed(make_agents(3))
+    
+    assert len(completions.requests) == 3
+    assert [result["classification"] for result in results] == ["FREEZE", "FIGHT", "FIGHT"]
+    assert "packed" not in results[1]
+    
+    # Fallbacks are charged their share of the packed request plus their own request
+    usage = results[1]["token_usage"]
+    assert usage["total_tokens"] == 1300 // 3 + 500
+    assert usage["request_share"] == 1 / 3 + 1
+    assert sum(result["token_usage"]["total_tokens"] for result in results) == 1300 + 2 * 500
+
+
+def test_truncated_packed_response_falls_back_for_every_agent():
+    completions = AsyncScriptedCompletions('{"agent_1": {"reasoning": "cut o')
+    
+    results = asyncio.run(make_client(completions).classify_agents_packed_async(make_agents(2)))
+    
+    assert len(completions.requests) == 3
+    assert [result["classification"] for result in results] == ["FIGHT", "FIGHT"]
+
+
+def test_agents_without_data_are_not_sent():
+    completions = ScriptedCompletions(json.dumps({"agent_1": classification("FREEZE"), "agent_2": classification("FREEZE")}))
+    agents = make_agents(3)
+    agents[1] = (agents[1][0], {"memories": "", "timeline": ""})
+    
+    results = make_client(completions).classify_agents_packed(agents, CLASSIFICATION_OPENAI_CONFIG)
+    
+    assert len(completions.requests) == 1
+    assert "memory 1" not in completions.requests[0][0][1]["content"]
+    assert [result["classification"] for result in results] == ["FREEZE", "UNKNOWN", "FREEZE"]
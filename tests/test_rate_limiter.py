@@ -0,0 +1,104 @@
+"""Tests for the RPM/TPM token-bucket rate limiter."""
+
+import time
+
+import pytest
+
+from peba_core.utils.rate_limiter import (
+    TokenBucket,
+    RateLimiter,
+    estimate_request_tokens,
+    parse_reset_duration
+)
+
+
+def test_parse_reset_duration():
+    assert parse_reset_duration("1s") == 1
+    assert parse_reset_duration("6m0s") == 360
+    assert parse_reset_duration("20ms") == pytest.approx(0.02)
+    assert parse_reset_duration("1h2m3.5s") == pytest.approx(3723.5)
+    assert parse_reset_duration("") is None
+    assert parse_reset_duration(None) is None
+
+
+def test_estimate_counts_prompt_and_max_tokens():
+    messages = [{"role": "system", "content": "x" * 400}, {"role": "user", "content": None}]
+    assert estimate_request_tokens(messages, {"max_tokens": 50}) == (100 + 4) + 4 + 50
+
+
+def test_bucket_reserve_waits_for_refill():
+    bucket = TokenBucket(60)  # one unit per second
+    assert bucket.reserve(60, now=bucket.updated) == 0
+    assert bucket.reserve(3, now=bucket.updated) == pytest.approx(3)
+    
+    # Two seconds later two units have been refilled, so the debt is one unit
+    assert bucket.reserve(0, now=bucket.updated + 2) == pytest.approx(1)
+
+
+def test_bucket_refill_is_capped_at_capacity():
+    bucket = TokenBucket(60)
+    bucket.refill(bucket.updated + 3600)
+    assert bucket.level == 60
+
+
+def test_bucket_reservation_larger_than_capacity_does_not_wait_forever():
+    bucket = TokenBucket(60)
+    assert bucket.reserve(10_000, now=bucket.updated) == 0
+    assert bucket.level == 0
+
+
+def test_reserve_waits_for_tightest_quota():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+    assert limiter.reserve(600) == 0
+    # The token bucket is empty: 300 tokens take 30 seconds, the request bucket has room
+    assert limiter.reserve(300) == pytest.approx(30, abs=0.1)
+
+
+def test_settle_refunds_and_charges_the_difference():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1000)
+    limiter.reserve(800)
+    limiter.settle(estimated_tokens=800, actual_tokens=300)
+    assert limiter.tokens.level == pytest.approx(700, abs=1)
+    
+    limiter.settle(estimated_tokens=0, actual_tokens=900)
+    assert limiter.tokens.level == pytest.approx(-200, abs=1)
+    
+    # Refunds never fill the bucket above its capacity
+    limiter.settle(estimated_tokens=5000, actual_tokens=0)
+    assert limiter.tokens.level == 1000
+
+
+def test_headers_lower_capacity_and_level():
+    limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=200000)
+    limiter.update_from_headers({
+        "x-ratelimit-limit-requests": "100",
+        "x-ratelimit-remaining-requests": "40",
+        "x-ratelimit-limit-tokens": "30000",
+        "x-ratelimit-remaining-tokens": "not a number"
+    })
+    
+    status = limiter.get_status()
+    assert status["requests_per_minute"] == 100
+    assert status["available_requests"] == pytest.approx(40, abs=1)
+    assert status["tokens_per_minute"] == 30000
+    assert status["available_tokens"] == 30000
+
+
+def test_headers_never_raise_the_level():
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1000)
+    limiter.reserve(900)
+    limiter.update_from_headers({"x-ratelimit-remaining-tokens": "1000"})
+    assert limiter.get_status()["available_tokens"] < 200
+
+
+def test_exhausted_quota_pauses_until_reset():
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1000)
+    limiter.update_from_headers({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s"})
+    assert limiter.paused_until - time.monotonic() == pytest.approx(2, abs=0.1)
+    assert limiter.reserve(0) >= 1.5
+
+
+def test_pause_holds_back_callers():
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1000)
+    limiter.pause(5)
+    assert limiter.reserve(1) == pytest.approx(5, abs=0.1)
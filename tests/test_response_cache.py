@@ -0,0 +1,136 @@
+"""Tests for the persistent LLM response cache."""
+
+import json
+import time
+import types
+
+from peba_core.utils.response_cache import ResponseCache, compute_cache_key, is_cacheable
+from peba_core.utils.llm_client import LLMClient
+
+
+CONFIG = {"model": "gpt-4.1", "temperature": 0, "response_format": {"type": "json_object"}}
+MESSAGES = [{"role": "user", "content": "classify"}]
+USAGE = {"prompt_tokens": 100, "cached_tokens": 0, "completion_tokens": 20, "total_tokens": 120}
+
+
+def make_response(content):
+    usage = types.SimpleNamespace(prompt_tokens=100, completion_tokens=20,
+                                  prompt_tokens_details=types.SimpleNamespace(cached_tokens=0))
+    message = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+
+class FakeCompletions:
+    """Chat completions endpoint returning a fixed content and counting calls."""
+    
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+        self.with_raw_response = self
+    
+    def create(self, messages, **config):
+        self.calls += 1
+        response = make_response(self.content)
+        return types.SimpleNamespace(headers={}, parse=lambda: response)
+
+
+def make_client(tmp_path, content):
+    client = LLMClient("test-key", cache_path=str(tmp_path / "cache.sqlite"))
+    completions = FakeCompletions(content)
+    client.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+    return client, completions
+
+
+def test_cache_key_depends_on_messages_and_config():
+    key = compute_cache_key(MESSAGES, CONFIG)
+    assert key == compute_cache_key(list(MESSAGES), dict(CONFIG))
+    assert key != compute_cache_key([{"role": "user", "content": "other"}], CONFIG)
+    assert key != compute_cache_key(MESSAGES, dict(CONFIG, model="gpt-4.1-mini"))
+
+
+def test_only_deterministic_configs_are_cacheable():
+    assert is_cacheable(CONFIG)
+    assert not is_cacheable(dict(CONFIG, temperature=0.7))
+    assert not is_cacheable({"model": "gpt-4.1"})
+
+
+def test_put_get_and_delete(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("missing") is None
+    
+    cache.put("key", '{"classification": "FREEZE"}', USAGE, "gpt-4.1")
+    assert cache.get("key") == ('{"classification": "FREEZE"}', USAGE)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["entries"] == 1
+    
+    cache.delete("key")
+    assert cache.get("key") is None
+    cache.close()
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path)
+    cache.put("key", "{}", None)
+    cache.close()
+    
+    reopened = ResponseCache(path)
+    assert reopened.get("key") == ("{}", None)
+    reopened.close()
+
+
+def test_evict_removes_expired_then_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_size_mb=1, max_age_days=1)
+    cache.put("expired", "{}", None)
+    cache._conn.execute("UPDATE responses SET created_at = ? WHERE key = 'expired'", (time.time() - 2 * 24 * 3600,))
+    assert cache.get("expired") is None
+    
+    # Three entries of ~400 KB do not fit into 1 MB; the least recently used one goes first
+    content = json.dumps({"text": "x" * 400 * 1024})
+    for key in ("old", "middle", "new"):
+        cache.put(key, content, None)
+        time.sleep(0.01)
+    cache.get("old")
+    
+    assert cache.evict() == 2
+    assert cache.get("middle") is None
+    assert cache.get("old") is not None
+    assert cache.get("new") is not None
+    cache.close()
+
+
+def test_responses_are_served_from_cache(tmp_path):
+    client, completions = make_client(tmp_path, '{"classification": "FREEZE"}')
+    
+    content, usage = client._make_api_call(MESSAGES, CONFIG)
+    assert usage["total_tokens"] == 120
+    cached_content, cached_usage = client._make_api_call(MESSAGES, CONFIG)
+    
+    assert cached_content == content
+    assert cached_usage["cache_hit"] is True
+    assert cached_usage["total_tokens"] == 0
+    assert completions.calls == 1
+
+
+def test_truncated_responses_are_not_cached(tmp_path):
+    client, completions = make_client(tmp_path, '{"reasoning": "cut off at max_tok')
+    
+    client._make_api_call(MESSAGES, CONFIG)
+    client._make_api_call(MESSAGES, CONFIG)
+    
+    assert completions.calls == 2
+    assert client.cache.stats()["entries"] == 0
+
+
+def test_truncated_entries_from_earlier_versions_are_dropped(tmp_path):
+    client, completions = make_client(tmp_path, '{"classification": "FREEZE"}')
+    key = compute_cache_key(MESSAGES, CONFIG)
+    client.cache.put(key, '{"reasoning": "cut off', USAGE)
+    
+    content, usage = client._make_api_call(MESSAGES, CONFIG)
+    
+    assert content == '{"classification": "FREEZE"}'
+    assert "cache_hit" not in usage
+    assert completions.calls == 1
+    assert client.cache.get(key)[0] == content
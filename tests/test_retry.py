@@ -0,0 +1,165 @@
+"""Tests for retrying API calls with backoff and the circuit breaker."""
+
+import time
+import types
+import asyncio
+
+import openai
+import pytest
+
+import peba_core.utils.llm_client as llm_client
+from peba_core.config import LLM_MAX_RETRIES
+from peba_core.utils.retry import (
+    CircuitBreaker,
+    compute_backoff_delay,
+    is_provider_failure,
+    is_retryable_error
+)
+
+
+# The OpenAI errors only read these attributes of the underlying HTTP request and response
+REQUEST = types.SimpleNamespace(method="POST", url="https://api.openai.com/v1/chat/completions")
+CONFIG = {"model": "test-model", "temperature": 0.5}
+MESSAGES = [{"role": "user", "content": "classify"}]
+
+
+def status_error(error_class, status_code, body=None):
+    response = types.SimpleNamespace(status_code=status_code, request=REQUEST, headers={"retry-after": "0"})
+    return error_class("error", response=response, body=body)
+
+
+def make_response(content):
+    usage = types.SimpleNamespace(prompt_tokens=100, completion_tokens=20, prompt_tokens_details=None)
+    message = types.SimpleNamespace(content=content)
+    response = types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+    return types.SimpleNamespace(headers={}, parse=lambda: response)
+
+
+class FlakyCompletions:
+    """Chat completions endpoint raising the given errors before it succeeds."""
+    
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+        self.with_raw_response = self
+    
+    def create(self, messages, **config):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return make_response('{"classification": "FREEZE"}')
+
+
+class AsyncFlakyCompletions(FlakyCompletions):
+    async def create(self, messages, **config):
+        return super().create(messages, **config)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """LLMClient without backoff delays and with a fresh circuit breaker."""
+    breaker = CircuitBreaker(failure_threshold=100, cooldown_seconds=0)
+    monkeypatch.setattr(llm_client, "compute_backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(llm_client, "get_circuit_breaker", lambda model: breaker)
+    return llm_client.LLMClient("test-key", use_cache=False)
+
+
+def use_completions(client, completions):
+    namespace = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+    if isinstance(completions, AsyncFlakyCompletions):
+        client.async_client = namespace
+    else:
+        client.client = namespace
+
+
+def test_error_classification():
+    assert is_retryable_error(status_error(openai.InternalServerError, 500))
+    assert is_retryable_error(status_error(openai.RateLimitError, 429))
+    assert is_retryable_error(openai.APITimeoutError(REQUEST))
+    assert not is_retryable_error(status_error(openai.BadRequestError, 400))
+    assert not is_retryable_error(status_error(openai.RateLimitError, 429, body={"code": "insufficient_quota"}))
+    assert not is_retryable_error(ValueError("bug"))
+    
+    # Throttling is retried but does not count against the provider's health
+    assert is_provider_failure(status_error(openai.InternalServerError, 503))
+    assert not is_provider_failure(status_error(openai.RateLimitError, 429))
+
+
+def test_backoff_is_bounded():
+    for attempt in range(1, 10):
+        delay = compute_backoff_delay(attempt, base_delay=1, max_delay=8)
+        assert 0 <= delay <= min(8, 2 ** (attempt - 1))
+
+
+def test_transient_errors_are_retried(client):
+    completions = FlakyCompletions([openai.APITimeoutError(REQUEST), status_error(openai.InternalServerError, 502)])
+    use_completions(client, completions)
+    
+    content, usage = client._make_api_call(MESSAGES, CONFIG)
+    
+    assert content == '{"classification": "FREEZE"}'
+    assert usage["attempts"] == 3
+    assert completions.calls == 3
+
+
+def test_retries_give_up_after_max_retries(client):
+    completions = FlakyCompletions([openai.APITimeoutError(REQUEST)] * (LLM_MAX_RETRIES + 5))
+    use_completions(client, completions)
+    
+    content, usage = client._make_api_call(MESSAGES, CONFIG)
+    
+    assert content is None
+    assert usage["failed"] is True
+    assert usage["attempts"] == LLM_MAX_RETRIES + 1
+    assert usage["total_tokens"] == 0
+    assert completions.calls == LLM_MAX_RETRIES + 1
+
+
+def test_async_retries_give_up_after_max_retries(client):
+    completions = AsyncFlakyCompletions([openai.APITimeoutError(REQUEST)] * (LLM_MAX_RETRIES + 5))
+    use_completions(client, completions)
+    
+    content, usage = asyncio.run(client._make_api_call_async(MESSAGES, CONFIG))
+    
+    assert content is None
+    assert usage["attempts"] == LLM_MAX_RETRIES + 1
+    assert completions.calls == LLM_MAX_RETRIES + 1
+
+
+def test_permanent_errors_are_not_retried(client):
+    completions = FlakyCompletions([status_error(openai.BadRequestError, 400)])
+    use_completions(client, completions)
+    
+    content, usage = client._make_api_call(MESSAGES, CONFIG)
+    
+    assert content is None
+    assert usage["attempts"] == 1
+    assert completions.calls == 1
+
+
+def test_circuit_breaker_opens_after_threshold_and_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.wait_time() == 0
+    
+    breaker.record_failure()
+    assert breaker.wait_time() == pytest.approx(10, abs=0.1)
+    
+    breaker.record_success()
+    assert breaker.consecutive_failures == 0
+
+
+def test_circuit_breaker_reopens_only_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0.05)
+    breaker.record_failure()
+    open_until = breaker.open_until
+    
+    # Failures while open do not extend the pause
+    breaker.record_failure()
+    assert breaker.open_until == open_until
+    
+    time.sleep(0.06)
+    assert breaker.wait_time() == 0
+    breaker.record_failure()
+    assert breaker.open_until > open_until
@@ -0,0 +1,84 @@
+"""Tests for the streaming statistics accumulators."""
+
+import math
+import pickle
+
+import numpy as np
+import pytest
+
+from peba_core.utils.running_stats import RunningStats, StatisticsAccumulator
+
+
+def stats_of(values):
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    return stats
+
+
+def assert_matches_numpy(stats, values):
+    values = np.asarray(values, dtype=float)
+    assert stats.n == len(values)
+    assert stats.mean == pytest.approx(np.mean(values), rel=1e-12, abs=1e-12)
+    assert stats.std == pytest.approx(np.std(values), rel=1e-6, abs=1e-12)
+    assert stats.sem == pytest.approx(np.std(values) / np.sqrt(len(values)), rel=1e-6, abs=1e-12)
+    assert stats.min == np.min(values)
+    assert stats.max == np.max(values)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merged_stats_match_numpy(seed):
+    rng = np.random.default_rng(seed)
+    # Large offset with small spread, where a naive sum-of-squares variance loses precision
+    values = 1e6 + rng.normal(0, 0.01, size=rng.integers(2, 200))
+    splits = np.sort(rng.choice(np.arange(1, len(values)), size=min(3, len(values) - 1), replace=False))
+    parts = np.split(values, splits)
+
+    merged = RunningStats()
+    for part in parts:
+        merged.merge(stats_of(part))
+
+    assert_matches_numpy(stats_of(values), values)
+    assert_matches_numpy(merged, values)
+
+
+def test_merge_with_empty_accumulators():
+    values = [0.5, 2.0, -1.0]
+
+    assert_matches_numpy(RunningStats().merge(stats_of(values)), values)
+    assert_matches_numpy(stats_of(values).merge(RunningStats()), values)
+    assert math.isnan(RunningStats().std) and math.isnan(RunningStats().sem)
+
+
+def test_single_value_has_zero_spread():
+    stats = stats_of([3.0])
+
+    assert stats.to_dict() == {"mean": 3.0, "std": 0.0, "sem": 0.0, "min": 3.0, "max": 3.0, "n": 1}
+
+
+def test_accumulators_merge_per_cell_like_numpy():
+    rng = np.random.default_rng(3)
+    values = {(iteration, metric): rng.random(12) for iteration in (1, 2, 3) for metric in ("kl_divergence", "tvd")}
+
+    # Each worker sees a different share of the runs; one worker never sees iteration 3
+    workers = [StatisticsAccumulator() for _ in range(3)]
+    for (iteration, metric), cell_values in values.items():
+        for run, value in enumerate(cell_values):
+            worker = workers[run % 3] if iteration < 3 else workers[run % 2]
+            worker.add(iteration, metric, value)
+    workers[0].add(1, "kl_divergence", None)
+
+    combined = StatisticsAccumulator()
+    for worker in workers:
+        # Accumulators travel between processes by pickling
+        combined.merge(pickle.loads(pickle.dumps(worker)))
+
+    summary = combined.summary(["kl_divergence", "tvd", "missing"], groups=[1, 2, 3, 4])
+    assert summary[4] == {}
+    assert combined.groups == [1, 2, 3]
+    for (iteration, metric), cell_values in values.items():
+        cell = summary[iteration][metric]
+        assert cell["n"] == len(cell_values)
+        assert cell["mean"] == pytest.approx(np.mean(cell_values))
+        assert cell["std"] == pytest.approx(np.std(cell_values))
+        assert (cell["min"], cell["max"]) == (np.min(cell_values), np.max(cell_values))
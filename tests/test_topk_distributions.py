@@ -0,0 +1,75 @@
+"""Tests for the rank-matrix top-k credit sharing distributions."""
+
+import random
+
+import pytest
+
+from peba_core.config import BEHAVIOR_CATEGORIES
+from peba_core.utils.metrics import (
+    build_rank_matrix,
+    calculate_topk_distribution,
+    calculate_topk_distributions
+)
+
+
+def reference_topk_distribution(agent_results, k):
+    """Per-agent loop of the original calculate_topk_distribution."""
+    category_credits = {category: 0.0 for category in BEHAVIOR_CATEGORIES}
+    valid_agents = 0
+    for agent_data in agent_results.values():
+        ranking = agent_data.get("behavior", {}).get("ranking", [])
+        if not ranking:
+            continue
+        valid_agents += 1
+        for i in range(min(k, len(ranking))):
+            if ranking[i] in BEHAVIOR_CATEGORIES:
+                category_credits[ranking[i]] += 1.0 / k
+    if valid_agents == 0:
+        return {category: 0.0 for category in BEHAVIOR_CATEGORIES}
+    return {category: credit / valid_agents for category, credit in category_credits.items()}
+
+
+def make_agent_results(num_agents, seed):
+    rng = random.Random(seed)
+    agent_results = {}
+    for index in range(num_agents):
+        ranking = rng.sample(BEHAVIOR_CATEGORIES, rng.randint(0, len(BEHAVIOR_CATEGORIES)))
+        if ranking and rng.random() < 0.2:
+            # Labels outside the categories get no credit but still count the agent
+            ranking.insert(rng.randrange(len(ranking) + 1), "NOT_A_CATEGORY")
+        behavior = {"ranking": ranking} if rng.random() < 0.9 else {}
+        agent_results[f"Agent_{index}"] = {"behavior": behavior}
+    agent_results["Agent_without_behavior"] = {}
+    return agent_results
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_topk_distributions_match_reference_loop(seed):
+    agent_results = make_agent_results(60, seed)
+    k_values = [1, 2, 3, 4, 5, 6, 8]
+
+    distributions = calculate_topk_distributions(agent_results, k_values)
+
+    for k in k_values:
+        expected = reference_topk_distribution(agent_results, k)
+        assert distributions[k] == pytest.approx(expected, abs=1e-12)
+        assert calculate_topk_distribution(agent_results, k) == pytest.approx(expected, abs=1e-12)
+
+
+def test_topk_distributions_without_rankings():
+    agent_results = {"Agent_0": {"behavior": {"ranking": []}}, "Agent_1": {}}
+
+    assert calculate_topk_distributions(agent_results, [1, 3]) == {
+        k: {category: 0.0 for category in BEHAVIOR_CATEGORIES} for k in (1, 3)
+    }
+    assert build_rank_matrix(agent_results).shape == (0, 0)
+
+
+def test_rank_matrix_codes():
+    agent_results = {
+        "Agent_0": {"behavior": {"ranking": [BEHAVIOR_CATEGORIES[2], "NOT_A_CATEGORY", BEHAVIOR_CATEGORIES[0]]}},
+        "Agent_1": {"behavior": {"ranking": [BEHAVIOR_CATEGORIES[1]]}}
+    }
+
+    assert build_rank_matrix(agent_results).tolist() == [[2, -1, 0], [1, -1, -1]]
+    assert build_rank_matrix(agent_results, max_rank=1).tolist() == [[2], [1]]
@@ -0,0 +1,82 @@
+"""Tests for collecting token usage into the usage table."""
+
+import json
+
+from classify_behavior import BehaviorClassifier
+from peba_core.config import CASCADE_CLASSIFICATION_OPENAI_CONFIG, CLASSIFICATION_OPENAI_CONFIG
+from peba_core.utils.llm_client import merge_token_usage
+from peba_core.utils.usage_table import collect_simulation_usage, collect_usage
+
+
+SMALL_MODEL = CASCADE_CLASSIFICATION_OPENAI_CONFIG["model"]
+LARGE_MODEL = CLASSIFICATION_OPENAI_CONFIG["model"]
+
+
+def write_iteration(folder, api_usage, statistics=None):
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "simulation_metadata.json").write_text(json.dumps({"llm_usage": {
+        "model": "gpt-4o-mini", "prompt_tokens": 1000.0, "cached_tokens": 0.0, "completion_tokens": 100.0,
+        "total_requests": 4, "total_cost_usd": 0.01
+    }}), encoding="utf-8")
+    chat_logs = folder / "AgentChatLogs"
+    chat_logs.mkdir()
+    (chat_logs / "Agent_0_ChatLogs.txt").write_text("USER:\nhello\nASSISTANT:\nhi\n" + "-" * 40 + "\n", encoding="utf-8")
+    statistics = dict(statistics or {}, api_usage=api_usage,
+                      distribution_metrics={"kl_divergence": 0.25, "js_divergence": 0.1})
+    (folder / "behavior_analysis.json").write_text(json.dumps({"statistics": statistics}), encoding="utf-8")
+    return str(folder)
+
+
+def test_analysis_rows_are_split_by_model(tmp_path):
+    folder = write_iteration(tmp_path / "Iteration_1", {
+        "total_requests": 5,
+        "token_usage": {"prompt_tokens": 700, "cached_tokens": 100, "completion_tokens": 70},
+        "token_usage_by_model": {
+            SMALL_MODEL: {"requests": 4, "prompt_tokens": 400, "cached_tokens": 100, "completion_tokens": 40},
+            LARGE_MODEL: {"requests": 1, "prompt_tokens": 300, "cached_tokens": 0, "completion_tokens": 30}
+        }
+    })
+
+    rows = [row for row in collect_simulation_usage(folder) if row["stage"] == "analysis"]
+
+    assert {row["model"]: (row["requests"], row["prompt_tokens"]) for row in rows} == {
+        SMALL_MODEL: (4, 400), LARGE_MODEL: (1, 300)
+    }
+
+
+def test_older_analyses_are_attributed_to_the_classification_model(tmp_path):
+    api_usage = {"total_requests": 2, "token_usage": {"prompt_tokens": 200, "cached_tokens": 0, "completion_tokens": 20}}
+    plain = write_iteration(tmp_path / "plain", api_usage)
+    small_only = write_iteration(tmp_path / "small_only", api_usage, {"cascade": {
+        "models": {"small": SMALL_MODEL}, "decided_by_small_model": 2, "escalated_to_large_model": 0
+    }})
+
+    models = {row["simulation"]: row["model"] for row in collect_usage([plain, small_only], stages=("analysis",))}
+
+    assert models == {plain: LARGE_MODEL, small_only: SMALL_MODEL}
+
+
+def test_collect_usage_without_agents_returns_metrics(tmp_path):
+    folder = write_iteration(tmp_path / "Iteration_1", {
+        "total_requests": 1, "token_usage": {"prompt_tokens": 10, "cached_tokens": 0, "completion_tokens": 1}
+    })
+
+    with_agents = collect_usage([folder])
+    rows = collect_usage([folder], include_agents=False, metrics=("kl_divergence",))
+
+    assert any(row["agent"] == "Agent_0" for row in with_agents)
+    assert all(row["agent"] is None for row in rows)
+    assert [row["stage"] for row in rows] == ["simulation", "analysis"]
+    assert rows[1]["kl_divergence"] == 0.25
+
+
+def test_escalated_usage_is_split_between_cascade_tiers():
+    small_usage = {"prompt_tokens": 400, "cached_tokens": 100, "completion_tokens": 40, "total_tokens": 440}
+    large_usage = {"prompt_tokens": 300, "cached_tokens": 0, "completion_tokens": 30, "total_tokens": 330}
+    behavior = {"cascade": {"tier": "large", "model": LARGE_MODEL, "small_model_token_usage": small_usage}}
+
+    split = BehaviorClassifier._split_token_usage_by_model(behavior, merge_token_usage(small_usage, large_usage))
+
+    assert split[SMALL_MODEL]["prompt_tokens"] == 400 and split[SMALL_MODEL]["request_share"] == 1
+    assert split[LARGE_MODEL] == {**large_usage, "request_share": 1}
+    assert BehaviorClassifier._split_token_usage_by_model({}, large_usage) == {LARGE_MODEL: large_usage}